@@ -0,0 +1,5 @@
+"""
+Micro benchmarks for the Python side of Holodeck. They run against the stand-in engine in
+``tests/utils`` so they do not need a world binary. Run them from the root of the repo, e.g.
+``python -m benchmarks.bench_semaphore_wait``.
+"""
@@ -0,0 +1,87 @@
+"""Cost of a tick of a swarm, batching every sensor across agents for a policy, with the
+default state per agent versus the columnar state.
+
+With the default state the learner stacks the copied sensors of every agent itself. The
+stand-in engine runs in a separate process and does no work per tick, so the time measured is
+the Python side of the tick.
+"""
+import argparse
+import copy
+import time
+
+import numpy as np
+
+from holodeck.environments import HolodeckEnvironment
+from tests.client.conftest import stand_in_config
+from tests.utils.stand_in_engine import StandInEngine
+
+SENSORS = ["LocationSensor", "VelocitySensor", "IMUSensor", "RotationSensor"]
+
+
+def swarm_config(num_agents):
+    scenario = copy.deepcopy(stand_in_config)
+    scenario["main_agent"] = None
+    template = scenario["agents"][0]
+    template["sensors"] = [{"sensor_type": sensor_type} for sensor_type in SENSORS]
+    scenario["agents"] = []
+    for i in range(num_agents):
+        agent = copy.deepcopy(template)
+        agent["agent_name"] = "sphere{}".format(i)
+        scenario["agents"].append(agent)
+    return scenario
+
+
+def stack_per_agent(env):
+    state = env.tick()
+    return {
+        name: np.stack([agent_state[name] for agent_state in state.values()])
+        for name in SENSORS
+    }
+
+
+def columnar(env):
+    return env.tick()
+
+
+def measure(batch, columnar_state, num_agents, ticks, **kwargs):
+    """Returns the duration of every tick in milliseconds"""
+    with StandInEngine(use_process=True) as engine:
+        env = HolodeckEnvironment(
+            scenario=swarm_config(num_agents),
+            start_world=False,
+            uuid=engine.uuid,
+            columnar_state=columnar_state,
+            **kwargs
+        )
+        durations = np.empty(ticks)
+        for i in range(ticks):
+            start = time.perf_counter()
+            batch(env)
+            durations[i] = (time.perf_counter() - start) * 1000
+        env.__on_exit__()
+    return durations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ticks", type=int, default=1000)
+    parser.add_argument("--agents", type=int, default=50)
+    args = parser.parse_args()
+
+    modes = {
+        "per agent": (stack_per_agent, False, {}),
+        "columnar": (columnar, True, {}),
+        "columnar pool": (columnar, True, {"state_pool_size": 2}),
+    }
+    print("{:>14} {:>9} {:>9}".format("", "mean ms", "p90 ms"))
+    for name, (batch, columnar_state, kwargs) in modes.items():
+        durations = measure(batch, columnar_state, args.agents, args.ticks, **kwargs)
+        print(
+            "{:>14} {:>9.3f} {:>9.3f}".format(
+                name, durations.mean(), np.percentile(durations, 90)
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
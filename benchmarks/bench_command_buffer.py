@@ -0,0 +1,71 @@
+"""Time to write a batch of commands into the shared command buffer, by payload size.
+
+Compares the byte by byte copy the command center used to do with its current single bulk copy.
+"""
+import argparse
+import timeit
+import uuid
+
+import numpy as np
+
+from holodeck.shmem import Shmem
+
+BUFFER_SIZE = 1048576
+
+
+def _byte_loop(buffer, input_bytes):
+    for index, val in enumerate(input_bytes):
+        buffer[index] = val
+
+
+def _bulk_copy(view, input_bytes):
+    view[: len(input_bytes)] = input_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[100, 1000, 10000, 100000, 1000000]
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    shmem = Shmem("command_buffer", [BUFFER_SIZE], np.byte, str(uuid.uuid4()))
+    buffer = shmem.np_array
+    view = memoryview(buffer).cast("B")
+
+    print(
+        "{:>9} {:>14} {:>14} {:>9}".format("bytes", "loop (us)", "bulk (us)", "speedup")
+    )
+    for size in args.sizes:
+        input_bytes = b"x" * (size - 1) + b"0"
+        # The loop is slow enough that fewer runs give a stable number
+        number = max(1, 100000 // size)
+        loop = min(
+            timeit.repeat(
+                lambda: _byte_loop(buffer, input_bytes),
+                number=number,
+                repeat=args.repeat,
+            )
+        )
+        bulk = min(
+            timeit.repeat(
+                lambda: _bulk_copy(view, input_bytes),
+                number=number * 100,
+                repeat=args.repeat,
+            )
+        )
+        loop_us = loop / number * 1e6
+        bulk_us = bulk / (number * 100) * 1e6
+        print(
+            "{:>9} {:>14.2f} {:>14.2f} {:>8.0f}x".format(
+                size, loop_us, bulk_us, loop_us / bulk_us
+            )
+        )
+
+    view.release()
+    shmem.unlink()
+
+
+if __name__ == "__main__":
+    main()
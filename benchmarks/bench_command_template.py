@@ -0,0 +1,32 @@
+"""Cost of building and serializing a per tick world command, with and without a template."""
+import argparse
+import timeit
+
+from holodeck.command import CommandTemplate, CustomCommand
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--numbers", type=int, default=12)
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    numbers = [i * 0.5 for i in range(args.numbers)]
+    strings = ["controller", "left_arm"]
+    template = CommandTemplate(CustomCommand("SetTargets", numbers, strings))
+
+    cases = {
+        "json": lambda: CustomCommand("SetTargets", numbers, strings).to_json(),
+        "json template": lambda: template.fill(numbers).to_json(),
+        "binary": lambda: CustomCommand("SetTargets", numbers, strings).to_binary(),
+        "binary template": lambda: template.fill(numbers).to_binary(),
+    }
+
+    print("{:>16} {:>12}".format("", "us/command"))
+    for name, case in cases.items():
+        seconds = min(timeit.repeat(case, number=args.number, repeat=3))
+        print("{:>16} {:>12.2f}".format(name, seconds / args.number * 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Cost of queuing and serializing a point cloud drawn one point at a time versus in a batch."""
+import argparse
+import timeit
+
+import numpy as np
+
+from holodeck import util
+from holodeck.command import CommandsGroup
+
+
+class _Recorder:
+    """Stands in for an environment, collecting the commands it is sent"""
+
+    def __init__(self):
+        self.group = CommandsGroup()
+
+    def _enqueue_command(self, command):
+        self.group.add_command(command)
+
+
+def _per_call(points, binary):
+    env = _Recorder()
+    for point in points:
+        util.draw_point(env, point.tolist())
+    return env.group.to_binary() if binary else env.group.to_json()
+
+
+def _batched(points, binary):
+    env = _Recorder()
+    util.draw_points(env, points)
+    return env.group.to_binary() if binary else env.group.to_json()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--points", type=int, default=5000)
+    parser.add_argument("--number", type=int, default=10)
+    args = parser.parse_args()
+
+    points = np.random.uniform(-1000, 1000, (args.points, 3))
+
+    print("{:>16} {:>12} {:>12}".format("", "ms/tick", "us/point"))
+    for binary in (False, True):
+        for name, case in (("per call", _per_call), ("batched", _batched)):
+            seconds = min(
+                timeit.repeat(
+                    lambda: case(points, binary), number=args.number, repeat=3
+                )
+            )
+            per_tick = seconds / args.number
+            print(
+                "{:>16} {:>12.3f} {:>12.3f}".format(
+                    "{} {}".format("binary" if binary else "json", name),
+                    per_tick * 1e3,
+                    per_tick / args.points * 1e6,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Cost of frame skipping with a camera, copying the state every tick versus only on the last.
+
+"per tick" steps one tick at a time and keeps the last state, which is what
+``step(action, ticks=N)`` used to cost. The stand-in engine runs in a separate process and
+does no work per tick, so the time measured is the Python side of the step.
+"""
+import argparse
+import copy
+import time
+
+import numpy as np
+
+from holodeck.environments import HolodeckEnvironment
+from tests.client.conftest import stand_in_config
+from tests.utils.stand_in_engine import StandInEngine
+
+
+def _per_tick(env, action, ticks):
+    total = 0
+    for _ in range(ticks):
+        state, reward, terminal, info = env.step(action)
+        total += reward
+    return state, total, terminal, info
+
+
+CASES = {
+    "per tick": _per_tick,
+    "frame_skip": lambda env, action, ticks: env.step(action, ticks, frame_skip=True),
+    "frame_skip + pool": lambda env, action, ticks: env.step(
+        action, ticks, frame_skip=True, max_pool=["RGBCamera"]
+    ),
+}
+
+
+def measure(case, steps, ticks, camera_size):
+    """Returns the duration of every step in milliseconds"""
+    scenario = copy.deepcopy(stand_in_config)
+    scenario["agents"][0]["sensors"].append(
+        {
+            "sensor_type": "RGBCamera",
+            "configuration": {
+                "CaptureWidth": camera_size,
+                "CaptureHeight": camera_size,
+            },
+        }
+    )
+    with StandInEngine(use_process=True) as engine:
+        env = HolodeckEnvironment(
+            scenario=scenario, start_world=False, uuid=engine.uuid
+        )
+        action = np.zeros(2)
+        durations = np.empty(steps)
+        for i in range(steps):
+            start = time.perf_counter()
+            case(env, action, ticks)
+            durations[i] = (time.perf_counter() - start) * 1000
+        env.__on_exit__()
+    return durations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--steps", type=int, default=500)
+    parser.add_argument("--ticks", type=int, default=4)
+    parser.add_argument("--camera-size", type=int, default=512)
+    args = parser.parse_args()
+
+    print("{:>18} {:>9} {:>9}".format("", "mean", "p90"))
+    for name, case in CASES.items():
+        durations = measure(case, args.steps, args.ticks, args.camera_size)
+        print(
+            "{:>18} {:>9.3f} {:>9.3f}".format(
+                name, durations.mean(), np.percentile(durations, 90)
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
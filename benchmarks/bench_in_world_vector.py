@@ -0,0 +1,61 @@
+"""Throughput of an InWorldVecEnv as the number of agent copies in the world grows.
+
+The stand-in engine takes ``--engine-ms`` per tick whatever the number of agents, imitating a
+world whose cost is dominated by rendering and physics set up rather than by each agent. The
+shared memory used is reported as well, since every copy only adds its own small buffers.
+"""
+import argparse
+import functools
+import time
+
+import numpy as np
+
+from holodeck.environments import HolodeckEnvironment
+from holodeck.vector import InWorldVecEnv, replicate_main_agent
+from tests.client.conftest import stand_in_config
+from tests.utils.stand_in_engine import StandInEngine
+
+
+def _busy_tick(seconds, engine):
+    time.sleep(seconds)
+
+
+def measure(num_copies, steps, engine_ms):
+    """Returns the copy steps per second and the bytes of shared memory mapped"""
+    scenario, names = replicate_main_agent(stand_in_config, num_copies, [2, 0, 0])
+    with StandInEngine(
+        on_tick=functools.partial(_busy_tick, engine_ms / 1000), use_process=True
+    ) as engine:
+        env = HolodeckEnvironment(
+            scenario=scenario,
+            start_world=False,
+            uuid=engine.uuid,
+            pre_start_steps=0,
+            copy_state=False,
+        )
+        with InWorldVecEnv(env, names) as envs:
+            envs.reset()
+            actions = np.zeros((num_copies, 2))
+            start = time.perf_counter()
+            for _ in range(steps):
+                envs.step(actions)
+            duration = time.perf_counter() - start
+            mapped = env._client.mapped_bytes
+    return num_copies * steps / duration, mapped
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--steps", type=int, default=300)
+    parser.add_argument("--engine-ms", type=float, default=5.0)
+    parser.add_argument("--copies", type=int, nargs="+", default=[1, 4, 16, 64])
+    args = parser.parse_args()
+
+    print("{:>7} {:>12} {:>14}".format("copies", "steps/s", "shared bytes"))
+    for num_copies in args.copies:
+        rate, mapped = measure(num_copies, args.steps, args.engine_ms)
+        print("{:>7} {:>12.0f} {:>14}".format(num_copies, rate, mapped))
+
+
+if __name__ == "__main__":
+    main()
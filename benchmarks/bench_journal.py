@@ -0,0 +1,100 @@
+"""Overhead of journaling an episode, and speed of replaying it.
+
+Steps ``--agents`` agents for ``--ticks`` ticks with random actions, with and without a
+journal, then replays the journal against a fresh environment. The stand-in engine runs in a
+separate process and does no work per tick, so the rates are the most the client can drive.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from holodeck.environments import HolodeckEnvironment
+from holodeck.journal import read_journal, replay
+from tests.utils.stand_in_engine import StandInEngine
+
+
+def _scenario(num_agents):
+    agents = [
+        {
+            "agent_name": "sphere{}".format(i),
+            "agent_type": "SphereAgent",
+            "sensors": [{"sensor_type": "LocationSensor"}],
+            "control_scheme": 1,
+            "location": [i, 0, 0],
+        }
+        for i in range(num_agents)
+    ]
+    return {
+        "name": "bench_journal",
+        "world": "TestWorld",
+        "main_agent": "sphere0",
+        "agents": agents,
+    }
+
+
+def _make_env(engine, num_agents):
+    return HolodeckEnvironment(
+        scenario=_scenario(num_agents), start_world=False, uuid=engine.uuid
+    )
+
+
+def run(num_agents, actions, path):
+    """Returns the seconds it took to step through the actions"""
+    with StandInEngine(use_process=True) as engine:
+        env = _make_env(engine, num_agents)
+        if path is not None:
+            env.start_journal(path)
+        start = time.perf_counter()
+        for tick_actions in actions:
+            for i, action in enumerate(tick_actions):
+                env.act("sphere{}".format(i), action)
+            env.tick()
+        if path is not None:
+            env.stop_journal()
+        duration = time.perf_counter() - start
+        env.__on_exit__()
+    return duration
+
+
+def run_replay(num_agents, path):
+    """Returns the seconds it took to read and replay the journal"""
+    with StandInEngine(use_process=True) as engine:
+        env = _make_env(engine, num_agents)
+        start = time.perf_counter()
+        replay(env, read_journal(path))
+        duration = time.perf_counter() - start
+        env.__on_exit__()
+    return duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ticks", type=int, default=20000)
+    parser.add_argument("--agents", type=int, default=4)
+    args = parser.parse_args()
+
+    actions = np.random.uniform(-1, 1, (args.ticks, args.agents, 2)).astype(np.float32)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.journal")
+        results = {
+            "step": run(args.agents, actions, None),
+            "step + journal": run(args.agents, actions, path),
+            "replay": run_replay(args.agents, path),
+        }
+        journal_size = os.path.getsize(path)
+
+    print("{:>16} {:>12} {:>12}".format("", "ticks/s", "us/tick"))
+    for name, seconds in results.items():
+        print(
+            "{:>16} {:>12.0f} {:>12.2f}".format(
+                name, args.ticks / seconds, seconds / args.ticks * 1e6
+            )
+        )
+    print("journal: {} bytes/tick".format(journal_size // args.ticks))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""First tick and steady state cost of a camera buffer with different memory backings.
+
+Imitates one tick of an RGBCamera: the "engine" writes a frame into the shared buffer, then
+the client copies the state out. On the first tick every page of a plain mapping faults; a
+pre-faulted buffer pays that cost when it is allocated instead.
+"""
+import argparse
+import time
+import uuid
+
+import numpy as np
+
+from holodeck.shmem import MemoryBacking, Shmem
+
+BACKINGS = {
+    "plain": None,
+    "prefault": MemoryBacking(prefault=True),
+    "huge_pages": MemoryBacking(huge_pages=True, prefault=True),
+    "lock": MemoryBacking(prefault=True, lock=True),
+}
+
+
+def measure(backing, shape, ticks):
+    """Returns the allocation time, and the write and copy time of every tick, in
+    milliseconds, along with the options that were applied
+    """
+    frame = np.random.randint(0, 255, shape, dtype=np.uint8)
+
+    start = time.perf_counter()
+    shmem = Shmem("bench_camera", shape, np.uint8, str(uuid.uuid4()), backing)
+    allocation = (time.perf_counter() - start) * 1000
+
+    writes = np.empty(ticks)
+    copies = np.empty(ticks)
+    for i in range(ticks):
+        start = time.perf_counter()
+        np.copyto(shmem.np_array, frame)
+        writes[i] = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        np.copy(shmem.np_array)
+        copies[i] = (time.perf_counter() - start) * 1000
+
+    applied = shmem.backing
+    shmem.unlink()
+    return allocation, writes, copies, applied
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--width", type=int, default=1280)
+    args = parser.parse_args()
+    shape = [args.height, args.width, 4]
+
+    print(
+        "{:>10} {:>8} {:>12} {:>12} {:>12} {:>12}  {}".format(
+            "backing",
+            "alloc",
+            "first write",
+            "first copy",
+            "write p50",
+            "copy p50",
+            "applied",
+        )
+    )
+    for name, backing in BACKINGS.items():
+        allocation, writes, copies, applied = measure(backing, shape, args.ticks)
+        print(
+            "{:>10} {:>8.3f} {:>12.3f} {:>12.3f} {:>12.3f} {:>12.3f}  {}".format(
+                name,
+                allocation,
+                writes[0],
+                copies[0],
+                np.median(writes[1:]),
+                np.median(copies[1:]),
+                ",".join(applied) or "-",
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Cost of a step with copy_state, copying every sensor versus only the ones a policy uses.
+
+The agent has two cameras and two low dimensional sensors; the filter keeps the low
+dimensional ones. The stand-in engine runs in a separate process and does no work per tick,
+so the time measured is the Python side of the step.
+"""
+import argparse
+import copy
+import time
+
+import numpy as np
+
+from holodeck.environments import HolodeckEnvironment
+from tests.client.conftest import stand_in_config
+from tests.utils.stand_in_engine import StandInEngine
+
+
+def measure(observation_filter, steps, camera_size):
+    """Returns the duration of every step in milliseconds"""
+    scenario = copy.deepcopy(stand_in_config)
+    for name in ("FrontCamera", "BackCamera"):
+        scenario["agents"][0]["sensors"].append(
+            {
+                "sensor_type": "RGBCamera",
+                "sensor_name": name,
+                "configuration": {
+                    "CaptureWidth": camera_size,
+                    "CaptureHeight": camera_size,
+                },
+            }
+        )
+    with StandInEngine(use_process=True) as engine:
+        env = HolodeckEnvironment(
+            scenario=scenario, start_world=False, uuid=engine.uuid
+        )
+        env.set_observation_filter(observation_filter)
+        action = np.zeros(2)
+        durations = np.empty(steps)
+        for i in range(steps):
+            start = time.perf_counter()
+            env.step(action)
+            durations[i] = (time.perf_counter() - start) * 1000
+        env.__on_exit__()
+    return durations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--camera-size", type=int, default=512)
+    args = parser.parse_args()
+
+    filters = {
+        "every sensor": None,
+        "filtered": {"sphere0": ["LocationSensor", "DistanceTask"]},
+    }
+    print("{:>14} {:>9} {:>9}".format("", "mean", "p90"))
+    for name, observation_filter in filters.items():
+        durations = measure(observation_filter, args.steps, args.camera_size)
+        print(
+            "{:>14} {:>9.3f} {:>9.3f}".format(
+                name, durations.mean(), np.percentile(durations, 90)
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Cost of building a flat float32 observation from several low dimensional sensors, with
+np.concatenate over the copied state versus a packed observation.
+
+Only the packing is timed, the engine isn't ticked in between.
+"""
+import argparse
+import copy
+import time
+
+import numpy as np
+
+from holodeck.environments import HolodeckEnvironment
+from tests.client.conftest import stand_in_config
+from tests.utils.stand_in_engine import StandInEngine
+
+SENSORS = [
+    "LocationSensor",
+    "VelocitySensor",
+    "IMUSensor",
+    "OrientationSensor",
+    "RotationSensor",
+]
+
+
+def concatenate(env, agent):
+    state = env._create_copy(agent.agent_state_dict)
+    return np.concatenate(
+        [state[name].reshape(-1).astype(np.float32) for name in SENSORS]
+    )
+
+
+def packed(env, agent):
+    return agent.packed_observation()
+
+
+def measure(pack, env, agent, repeats):
+    """Returns the duration of every packing in microseconds"""
+    durations = np.empty(repeats)
+    for i in range(repeats):
+        start = time.perf_counter()
+        pack(env, agent)
+        durations[i] = (time.perf_counter() - start) * 1e6
+    return durations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeats", type=int, default=10000)
+    args = parser.parse_args()
+
+    scenario = copy.deepcopy(stand_in_config)
+    scenario["agents"][0]["sensors"] = [
+        {"sensor_type": sensor_type} for sensor_type in SENSORS
+    ]
+    with StandInEngine() as engine:
+        env = HolodeckEnvironment(
+            scenario=scenario, start_world=False, uuid=engine.uuid
+        )
+        agent = env.agents["sphere0"]
+        agent.pack_observations(SENSORS)
+        assert np.all(concatenate(env, agent) == packed(env, agent))
+
+        print("{:>12} {:>9} {:>9}".format("", "mean us", "p90 us"))
+        for name, pack in (("concatenate", concatenate), ("packed", packed)):
+            durations = measure(pack, env, agent, args.repeats)
+            print(
+                "{:>12} {:>9.2f} {:>9.2f}".format(
+                    name, durations.mean(), np.percentile(durations, 90)
+                )
+            )
+        env.__on_exit__()
+
+
+if __name__ == "__main__":
+    main()
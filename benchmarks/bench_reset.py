@@ -0,0 +1,79 @@
+"""Cost of HolodeckEnvironment.reset with and without reusing agents across resets.
+
+The scenario has ``--agents`` agents with a handful of sensors each. The stand-in engine runs
+in a separate process and does no work per tick, so the time measured is the Python side of a
+reset plus the round trips of its ticks.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from holodeck.environments import HolodeckEnvironment
+from tests.utils.stand_in_engine import StandInEngine
+
+SENSORS = [
+    "LocationSensor",
+    "RotationSensor",
+    "VelocitySensor",
+    "IMUSensor",
+    "OrientationSensor",
+    "CollisionSensor",
+]
+
+
+def _scenario(num_agents):
+    agents = [
+        {
+            "agent_name": "sphere{}".format(i),
+            "agent_type": "SphereAgent",
+            "sensors": [{"sensor_type": sensor} for sensor in SENSORS],
+            "control_scheme": 0,
+            "location": [i, 0, 0],
+        }
+        for i in range(num_agents)
+    ]
+    return {
+        "name": "bench_reset",
+        "world": "TestWorld",
+        "main_agent": "sphere0",
+        "agents": agents,
+    }
+
+
+def measure(reuse_agents_on_reset, resets, num_agents):
+    """Returns the duration of every reset in milliseconds"""
+    with StandInEngine(use_process=True) as engine:
+        env = HolodeckEnvironment(
+            scenario=_scenario(num_agents),
+            start_world=False,
+            uuid=engine.uuid,
+            reuse_agents_on_reset=reuse_agents_on_reset,
+        )
+        durations = np.empty(resets)
+        for i in range(resets):
+            start = time.perf_counter()
+            env.reset()
+            durations[i] = (time.perf_counter() - start) * 1000
+        env.__on_exit__()
+    return durations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--resets", type=int, default=500)
+    parser.add_argument("--agents", type=int, default=4)
+    args = parser.parse_args()
+
+    print("{:>6} {:>9} {:>9} {:>9}".format("reuse", "mean", "p50", "p90"))
+    for reuse in (False, True):
+        durations = measure(reuse, args.resets, args.agents)
+        print(
+            "{:>6} {:>9.3f} {:>9.3f} {:>9.3f}".format(
+                str(reuse), durations.mean(), *np.percentile(durations, [50, 90])
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
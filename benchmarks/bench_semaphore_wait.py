@@ -0,0 +1,64 @@
+"""Per tick latency of blocking vs. spin-then-block semaphore waits.
+
+The stand-in engine runs in a separate process and busy waits ``--work-us`` microseconds per
+tick to imitate a fast, headless engine tick.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from holodeck.holodeckclient import HolodeckClient
+from tests.utils.stand_in_engine import StandInEngine
+
+
+def _busy_tick(work_us):
+    def on_tick(_engine):
+        deadline = time.perf_counter() + work_us / 1000000
+        while time.perf_counter() < deadline:
+            pass
+
+    return on_tick
+
+
+def measure(spin_wait_us, ticks, work_us):
+    """Returns the round trip time of every tick in microseconds"""
+    with StandInEngine(on_tick=_busy_tick(work_us), use_process=True) as engine:
+        client = HolodeckClient(engine.uuid, spin_wait_us=spin_wait_us)
+        client.acquire()
+        latencies = np.empty(ticks)
+        for i in range(ticks):
+            start = time.perf_counter()
+            client.release()
+            client.acquire()
+            latencies[i] = (time.perf_counter() - start) * 1000000
+        client.unlink()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ticks", type=int, default=20000)
+    parser.add_argument("--work-us", type=int, default=50)
+    parser.add_argument("--spin-us", type=int, nargs="+", default=[0, 100, 1000])
+    args = parser.parse_args()
+
+    print(
+        "{:>10} {:>9} {:>9} {:>9} {:>9} {:>9}".format(
+            "spin (us)", "mean", "p50", "p90", "p99", "max"
+        )
+    )
+    for spin_wait_us in args.spin_us:
+        latencies = measure(spin_wait_us, args.ticks, args.work_us)
+        print(
+            "{:>10} {:>9.1f} {:>9.1f} {:>9.1f} {:>9.1f} {:>9.1f}".format(
+                spin_wait_us,
+                latencies.mean(),
+                *np.percentile(latencies, [50, 90, 99]),
+                latencies.max()
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
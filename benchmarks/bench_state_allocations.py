@@ -0,0 +1,78 @@
+"""Memory allocated by each step with copy_state, with new arrays, a state pool, or ``out``.
+
+Uses :mod:`tracemalloc` (which numpy reports its array buffers to) to measure how much memory
+is allocated at the peak of each step beyond what was live before it. With a state pool or
+``out`` the camera frame isn't allocated again, and only a few small objects remain.
+"""
+import argparse
+import copy
+import time
+import tracemalloc
+
+import numpy as np
+
+from holodeck.environments import HolodeckEnvironment
+from tests.client.conftest import stand_in_config
+from tests.utils.stand_in_engine import StandInEngine
+
+
+def measure(case, steps, camera_size):
+    """Returns the bytes allocated at the peak of every step, and the mean step time in
+    milliseconds"""
+    scenario = copy.deepcopy(stand_in_config)
+    scenario["agents"][0]["sensors"].append(
+        {
+            "sensor_type": "RGBCamera",
+            "configuration": {
+                "CaptureWidth": camera_size,
+                "CaptureHeight": camera_size,
+            },
+        }
+    )
+    with StandInEngine(use_process=True) as engine:
+        env = HolodeckEnvironment(
+            scenario=scenario,
+            start_world=False,
+            uuid=engine.uuid,
+            state_pool_size=2 if case == "pool" else 0,
+        )
+        out = env.allocate_state() if case == "out" else None
+        action = np.zeros(2)
+        state = None
+        # Warm up, so that the pool is filled and a previous state is held as in training
+        for _ in range(4):
+            state = env.step(action, out=out)[0]
+
+        allocated = np.empty(steps)
+        tracemalloc.start()
+        start = time.perf_counter()
+        for i in range(steps):
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            state = env.step(action, out=out)[0]
+            allocated[i] = tracemalloc.get_traced_memory()[1] - before
+        duration = (time.perf_counter() - start) / steps * 1000
+        tracemalloc.stop()
+        del state
+        env.__on_exit__()
+    return allocated, duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--camera-size", type=int, default=256)
+    args = parser.parse_args()
+
+    print("{:>6} {:>14} {:>14} {:>9}".format("", "bytes/step", "max bytes", "ms/step"))
+    for case in ("copy", "pool", "out"):
+        allocated, duration = measure(case, args.steps, args.camera_size)
+        print(
+            "{:>6} {:>14.0f} {:>14.0f} {:>9.3f}".format(
+                case, allocated.mean(), allocated.max(), duration
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
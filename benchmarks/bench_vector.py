@@ -0,0 +1,71 @@
+"""Throughput of a VecEnv as the number of environments grows.
+
+Every worker runs a stand-in engine that takes ``--engine-ms`` per tick, imitating the time a
+world spends on physics and rendering, and has an RGBCamera so that a camera frame per
+environment is handed to the learner every step.
+"""
+import argparse
+import copy
+import functools
+import time
+
+import numpy as np
+
+from holodeck.environments import HolodeckEnvironment
+from holodeck.vector import VecEnv
+from tests.client.conftest import stand_in_config
+from tests.utils.stand_in_engine import StandInEngine
+
+
+def _busy_tick(seconds, engine):
+    time.sleep(seconds)
+
+
+def make_env(engine_ms, camera_size):
+    scenario = copy.deepcopy(stand_in_config)
+    scenario["agents"][0]["sensors"].append(
+        {
+            "sensor_type": "RGBCamera",
+            "configuration": {
+                "CaptureWidth": camera_size,
+                "CaptureHeight": camera_size,
+            },
+        }
+    )
+    engine = StandInEngine(
+        on_tick=functools.partial(_busy_tick, engine_ms / 1000)
+    ).start()
+    return HolodeckEnvironment(
+        scenario=scenario, start_world=False, uuid=engine.uuid, pre_start_steps=0
+    )
+
+
+def measure(num_envs, steps, engine_ms, camera_size):
+    """Returns the environment steps per second"""
+    env_fn = functools.partial(make_env, engine_ms, camera_size)
+    with VecEnv([env_fn] * num_envs) as envs:
+        envs.reset()
+        actions = np.zeros((num_envs, 2))
+        start = time.perf_counter()
+        for _ in range(steps):
+            envs.step(actions)
+        duration = time.perf_counter() - start
+    return num_envs * steps / duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--steps", type=int, default=300)
+    parser.add_argument("--engine-ms", type=float, default=5.0)
+    parser.add_argument("--camera-size", type=int, default=256)
+    parser.add_argument("--envs", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    print("{:>6} {:>12}".format("envs", "steps/s"))
+    for num_envs in args.envs:
+        rate = measure(num_envs, args.steps, args.engine_ms, args.camera_size)
+        print("{:>6} {:>12.0f}".format(num_envs, rate))
+
+
+if __name__ == "__main__":
+    main()
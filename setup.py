@@ -21,4 +21,5 @@ setup(
         'pywin32 >= 1.0; platform_system == "Windows"',
         "numpy",
     ],
+    entry_points={"console_scripts": ["holodeck-gc = holodeck.gc:main"]},
 )
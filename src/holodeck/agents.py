@@ -1,8 +1,10 @@
 """Definitions for different agents that can be controlled from Holodeck"""
+import bisect
 import math
 from functools import reduce
 
 import numpy as np
+from holodeck.exceptions import HolodeckException
 from holodeck.spaces import ContinuousActionSpace, DiscreteActionSpace
 from holodeck.sensors import SensorDefinition, SensorFactory, RGBCamera
 from holodeck.command import AddSensorCommand, RemoveSensorCommand
@@ -59,6 +61,87 @@ class TeleportFlags:
     TELEPORT_SET_PHYSICS_STATE = 0x4
 
 
+class PackedLayout:
+    """Where the data of each sensor lies in a packed observation vector, see
+    :meth:`HolodeckAgent.pack_observations`.
+
+    Args:
+        sensors (:obj:`list` of (:obj:`str`, :obj:`tuple`)): Name and data shape of each packed
+            sensor, in the order they are packed.
+        dtype (numpy dtype): Type of the packed vector.
+
+    Attributes:
+        sensor_names (:obj:`list` of :obj:`str`): Names of the packed sensors, in order.
+        slices (:obj:`dict`): Dictionary from sensor name to its :obj:`slice` of the vector.
+        shapes (:obj:`dict`): Dictionary from sensor name to its data shape.
+        dtype (:obj:`np.dtype`): Type of the packed vector.
+        size (:obj:`int`): Length of the packed vector.
+    """
+
+    def __init__(self, sensors, dtype):
+        self.sensor_names = [name for name, _ in sensors]
+        self.slices = dict()
+        self.shapes = dict()
+        self.dtype = np.dtype(dtype)
+        self._starts = []
+        offset = 0
+        for name, shape in sensors:
+            size = int(np.prod(shape, dtype=np.int64))
+            self._starts.append(offset)
+            self.slices[name] = slice(offset, offset + size)
+            self.shapes[name] = tuple(shape)
+            offset += size
+        self.size = offset
+
+    def unpack(self, vector):
+        """Splits a packed vector back into the data of each sensor.
+
+        Args:
+            vector (:obj:`np.ndarray`): A vector packed with this layout, or a batch of them
+                with the packed dimension last.
+
+        Returns:
+            :obj:`dict`: Dictionary from sensor name to a view of its data in ``vector``
+        """
+        batch_shape = vector.shape[:-1]
+        return {
+            name: vector[..., self.slices[name]].reshape(
+                batch_shape + self.shapes[name]
+            )
+            for name in self.sensor_names
+        }
+
+    def sensor_at(self, index):
+        """Gets the name of the sensor that an element of the packed vector comes from.
+
+        Args:
+            index (:obj:`int`): Index into the packed vector.
+
+        Returns:
+            :obj:`str`: Name of the sensor
+        """
+        if not 0 <= index < self.size:
+            raise IndexError(
+                "Index {} is out of range for a packed vector of size {}".format(
+                    index, self.size
+                )
+            )
+        return self.sensor_names[bisect.bisect_right(self._starts, index) - 1]
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        return "PackedLayout({})".format(
+            ", ".join(
+                "{}[{}:{}]".format(
+                    name, self.slices[name].start, self.slices[name].stop
+                )
+                for name in self.sensor_names
+            )
+        )
+
+
 class HolodeckAgent:
     """A learning agent in Holodeck
 
@@ -78,6 +161,8 @@ class HolodeckAgent:
         sensors (dict of (string, :class:`~holodeck.sensors.HolodeckSensor`)): List of
             HolodeckSensors on this agent.
         agent_state_dict (dict): A dictionary that maps sensor names to sensor observation data.
+        memory_keys (dict): A dictionary from the name of each of the agent's own shared memory
+            buffers (not including sensors) to its key.
     """
 
     def __init__(self, client, name="DefaultAgent"):
@@ -108,9 +193,24 @@ class HolodeckAgent:
         self._control_scheme_buffer = self._client.malloc(
             name + "_control_scheme", [1], np.uint8
         )
+        self.memory_keys = {
+            "action": name,
+            "teleport_flag": name + "_teleport_flag",
+            "teleport_command": name + "_teleport_command",
+            "control_scheme": name + "_control_scheme",
+        }
         self._current_control_scheme = 0
         self.set_control_scheme(0)
 
+        # Incremented whenever sensors are added or removed
+        self._sensor_changes = 0
+        # Packed observations, see pack_observations
+        self._packed_sensor_names = None
+        self._packed_dtype = None
+        self._packed_layout = None
+        self._packed_vector = None
+        self._packed_plan = None
+
     def clean_up_resources(self):
         if hasattr(self, "_action_buffer"):
             del self._action_buffer
@@ -124,6 +224,9 @@ class HolodeckAgent:
         for key in list(self.agent_state_dict.keys()):
             del self.agent_state_dict[key]
 
+        self._packed_layout = None
+        self._packed_plan = None
+
         for key in list(self.sensors.keys()):
             self.sensors[key].clean_up_resources()
             del self.sensors[key]
@@ -135,12 +238,22 @@ class HolodeckAgent:
         Args:
             action(:obj:`np.ndarray`): The action to take.
         """
+        self._client.check_not_awaiting_engine("act")
         self.__act__(action)
 
     def clear_action(self):
         """Sets the action to zeros, effectively removing any previous actions."""
+        self._client.check_not_awaiting_engine("clear_action")
         np.copyto(self._action_buffer, np.zeros(self._action_buffer.shape))
 
+    def reset_buffers(self):
+        """Returns the agent's own buffers to the state of a newly built agent, so that the
+        agent can be reused after the environment is reset."""
+        self.clear_action()
+        self._teleport_type_buffer[0] = 0
+        self._teleport_buffer.fill(0)
+        self.set_control_scheme(0)
+
     def set_control_scheme(self, index):
         """Sets the control scheme for the agent. See :class:`ControlSchemes`.
 
@@ -148,6 +261,7 @@ class HolodeckAgent:
             index (:obj:`int`): The control scheme to use. Should be set with an enum from
                 :class:`ControlSchemes`.
         """
+        self._client.check_not_awaiting_engine("set_control_scheme")
         self._current_control_scheme = index % self._num_control_schemes
         self._control_scheme_buffer[0] = self._current_control_scheme
 
@@ -165,6 +279,7 @@ class HolodeckAgent:
                 If ``None`` (default), keeps the current rotation.
 
         """
+        self._client.check_not_awaiting_engine("teleport")
         if location is not None:
             np.copyto(self._teleport_buffer[0:3], location)
             self._teleport_type_buffer[0] |= TeleportFlags.TELEPORT_LOCATION
@@ -183,6 +298,7 @@ class HolodeckAgent:
                 (see :ref:`coordinate-system`))
 
         """
+        self._client.check_not_awaiting_engine("set_physics_state")
         np.copyto(self._teleport_buffer[0:3], location)
         np.copyto(self._teleport_buffer[3:6], rotation)
         np.copyto(self._teleport_buffer[6:9], velocity)
@@ -206,11 +322,26 @@ class HolodeckAgent:
                 sensor = SensorFactory.build_sensor(self._client, sensor_def)
                 self.sensors[sensor_def.sensor_name] = sensor
                 self.agent_state_dict[sensor_def.sensor_name] = sensor.sensor_data
+                self._packed_layout = None
+                self._sensor_changes += 1
 
                 if not sensor_def.existing:
                     command_to_send = AddSensorCommand(sensor_def)
                     self._client.command_center.enqueue_command(command_to_send)
 
+    def respawn_sensors(self, sensor_defs):
+        """Attaches sensors that this agent object already has to the agent in the world again,
+        after the environment has been reset.
+
+        Args:
+            sensor_defs (:obj:`list` of :class:`~holodeck.sensors.SensorDefinition`):
+                Definitions of the sensors to attach.
+        """
+        for sensor_def in sensor_defs:
+            if sensor_def.agent_name == self.name and not sensor_def.existing:
+                command_to_send = AddSensorCommand(sensor_def)
+                self._client.command_center.enqueue_command(command_to_send)
+
     def remove_sensors(self, sensor_defs):
         """Removes a sensor from a particular agent object and detaches it from the agent in the
         world.
@@ -226,9 +357,125 @@ class HolodeckAgent:
         for sensor_def in sensor_defs:
             self.sensors.pop(sensor_def.sensor_name, None)
             self.agent_state_dict.pop(sensor_def.sensor_name, None)
+            self._packed_layout = None
+            self._sensor_changes += 1
             command_to_send = RemoveSensorCommand(self.name, sensor_def.sensor_name)
             self._client.command_center.enqueue_command(command_to_send)
 
+    def refresh_state_dict(self):
+        """Rebuilds :attr:`agent_state_dict` from the current data of every sensor.
+
+        Needed for double buffered sensors, whose data moves between slots every tick. A new
+        dictionary is created, so that dictionaries handed out before keep pointing at the
+        slots they were read from.
+
+        Returns:
+            :obj:`dict`: The new state dictionary
+        """
+        self.agent_state_dict = {
+            name: sensor.sensor_data for name, sensor in self.sensors.items()
+        }
+        return self.agent_state_dict
+
+    def state_views(self):
+        """Gets zero-copy, read-only views of the data of every sensor, see
+        :meth:`~holodeck.sensors.HolodeckSensor.view`.
+
+        Returns:
+            :obj:`dict`: Dictionary from sensor name to :class:`~holodeck.shmem.SharedView`
+        """
+        return {name: sensor.view() for name, sensor in self.sensors.items()}
+
+    def pack_observations(self, sensor_names=None, dtype=np.float32):
+        """Packs the data of several sensors into one flat vector, for example as the input of
+        an MLP policy. Get the vector with :meth:`packed_observation`.
+
+        The layout of the vector is computed once, and the vector is allocated once, so that
+        packing only copies the data of each sensor into its slice. It is recomputed if
+        sensors are added to or removed from the agent.
+
+        Args:
+            sensor_names (:obj:`list` of :obj:`str`, optional): Sensors to pack, in order. If
+                ``None`` (default), packs every sensor of the agent.
+            dtype (numpy dtype, optional): Type of the packed vector. The data of each sensor is
+                cast to it. Defaults to ``np.float32``.
+
+        Returns:
+            :class:`PackedLayout`: The layout of the packed vector
+        """
+        self._packed_sensor_names = None if sensor_names is None else list(sensor_names)
+        self._packed_dtype = np.dtype(dtype)
+        self._packed_layout = None
+        return self.packed_layout
+
+    @property
+    def packed_layout(self):
+        """
+        Returns:
+            :class:`PackedLayout`: The layout of the vector returned by
+            :meth:`packed_observation`, or ``None`` if observations aren't packed
+        """
+        if self._packed_dtype is None:
+            return None
+        if self._packed_layout is None:
+            self._build_packed_plan()
+        return self._packed_layout
+
+    def _build_packed_plan(self):
+        sensor_names = self._packed_sensor_names
+        if sensor_names is None:
+            sensor_names = list(self.sensors)
+        missing = [name for name in sensor_names if name not in self.sensors]
+        if missing:
+            raise HolodeckException(
+                "Can't pack {}, agent {} has no such sensors".format(
+                    ", ".join(missing), self.name
+                )
+            )
+
+        layout = PackedLayout(
+            [(name, self.sensors[name].data_shape) for name in sensor_names],
+            self._packed_dtype,
+        )
+        self._packed_vector = np.zeros(layout.size, dtype=layout.dtype)
+        # Views of the vector shaped like the data of each sensor, so that packing is one
+        # np.copyto per sensor
+        self._packed_plan = [
+            (
+                self._packed_vector[layout.slices[name]].reshape(layout.shapes[name]),
+                self.sensors[name],
+            )
+            for name in sensor_names
+        ]
+        self._packed_layout = layout
+
+    def packed_observation(self):
+        """Copies the current data of the packed sensors into the packed vector, see
+        :meth:`pack_observations`.
+
+        The same vector is filled on every call, copy it to keep the observation of a tick.
+
+        Returns:
+            :obj:`np.ndarray`: The packed vector, laid out as :attr:`packed_layout`
+
+        Raises:
+            HolodeckException: If :meth:`pack_observations` wasn't called, or a packed sensor
+                was removed from the agent
+        """
+        if self._packed_dtype is None:
+            raise HolodeckException(
+                "Observations of agent {} aren't packed, call pack_observations "
+                "first".format(self.name)
+            )
+        if self._packed_layout is None:
+            self._build_packed_plan()
+
+        for destination, sensor in self._packed_plan:
+            # Assigning casts like np.copyto(casting="unsafe"), with less overhead for small
+            # arrays
+            destination[...] = sensor.sensor_data
+        return self._packed_vector
+
     def has_camera(self):
         """Indicates whether this agent has a camera or not.
 
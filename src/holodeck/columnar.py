@@ -0,0 +1,168 @@
+"""Columnar state for multi-agent environments, where each sensor is one array across agents.
+
+The default multi-agent state is a dictionary from agent name to a dictionary from sensor name
+to array, which a learner has to loop over to batch the same sensor of every agent. With
+``columnar_state=True`` (see :class:`~holodeck.environments.HolodeckEnvironment`), the state is
+instead a dictionary from sensor name to an array of shape ``(num_agents, ...)``, with one row
+per agent that has the sensor, in the order of
+:attr:`~holodeck.environments.HolodeckEnvironment.agents`. Sensors of the same name that differ
+in shape or type between agents can't be stacked, and are returned per agent under
+``"agent_name/sensor_name"`` keys.
+
+Which sensor goes into which row is worked out once, in a :class:`ColumnarPlan`, so that
+building the state only copies data.
+"""
+import numpy as np
+
+from holodeck.exceptions import HolodeckException
+
+
+class ColumnarPlan:
+    """Where the data of every sensor goes in a columnar state.
+
+    Args:
+        agents (:obj:`dict`): Dictionary from agent name to
+            :class:`~holodeck.agents.HolodeckAgent`, in the order of the rows.
+        sensor_names (:obj:`dict`): Dictionary from agent name to the names of its sensors to
+            include.
+        cache_size (:obj:`int`, optional): Number of states given to :meth:`gather` whose copies
+            are remembered, so that gathering into them again doesn't work the copies out
+            again. Defaults to 8.
+
+    Attributes:
+        rows (:obj:`dict`): Dictionary from the key of each stacked sensor to the names of the
+            agents of its rows, in order.
+        buffers (:obj:`dict`): The state the plan gathers into when it isn't given one.
+    """
+
+    def __init__(self, agents, sensor_names, cache_size=8):
+        self._agents = list(agents.values())
+        self._sensor_changes = [agent._sensor_changes for agent in self._agents]
+
+        groups = dict()
+        for agent_name, names in sensor_names.items():
+            for sensor_name in names:
+                groups.setdefault(sensor_name, []).append(
+                    agents[agent_name].sensors[sensor_name]
+                )
+
+        self.rows = dict()
+        # Key -> (shape, dtype) of the state arrays
+        self._specs = dict()
+        # (key, sensors) of every entry of the state
+        self._entries = []
+        for sensor_name, sensors in groups.items():
+            specs = {
+                (tuple(sensor.data_shape), np.dtype(sensor.dtype)) for sensor in sensors
+            }
+            if len(specs) == 1:
+                shape, dtype = specs.pop()
+                self.rows[sensor_name] = [sensor.agent_name for sensor in sensors]
+                self._specs[sensor_name] = ((len(sensors),) + shape, dtype)
+                self._entries.append((sensor_name, sensors))
+            else:
+                for sensor in sensors:
+                    key = sensor.agent_name + "/" + sensor_name
+                    self._specs[key] = (
+                        tuple(sensor.data_shape),
+                        np.dtype(sensor.dtype),
+                    )
+                    self._entries.append((key, [sensor]))
+
+        self.buffers = self.allocate()
+        self._cache_size = cache_size
+        # id of a state -> (state, copies that gather into it)
+        self._steps = dict()
+
+    def is_current(self, agents):
+        """Whether the plan still matches the agents, and the sensors they have.
+
+        Args:
+            agents (:obj:`dict`): Dictionary from agent name to agent, as given to the plan.
+
+        Returns:
+            :obj:`bool`: If the plan can still be used
+        """
+        if len(agents) != len(self._agents):
+            return False
+        for agent, plan_agent, changes in zip(
+            agents.values(), self._agents, self._sensor_changes
+        ):
+            if agent is not plan_agent or agent._sensor_changes != changes:
+                return False
+        return True
+
+    def allocate(self):
+        """Allocates a state that the plan can gather into.
+
+        Returns:
+            :obj:`dict`: Dictionary from key to a zeroed array
+        """
+        return {
+            key: np.zeros(shape, dtype=dtype)
+            for key, (shape, dtype) in self._specs.items()
+        }
+
+    def gather(self, out=None):
+        """Copies the current data of every sensor into a columnar state.
+
+        Args:
+            out (:obj:`dict`, optional): State to gather into, such as one from
+                :meth:`allocate`. Defaults to :attr:`buffers`.
+
+        Returns:
+            :obj:`dict`: The state
+
+        Raises:
+            HolodeckException: If ``out`` doesn't have the keys, shapes and types of the state
+        """
+        if out is None:
+            out = self.buffers
+        steps = self._steps.get(id(out))
+        if steps is None or steps[0] is not out:
+            steps = (out, self._compile(out))
+            if len(self._steps) >= self._cache_size:
+                self._steps.clear()
+            self._steps[id(out)] = steps
+
+        for destination, sources, rows in steps[1]:
+            if sources is not None:
+                np.concatenate(sources, out=destination)
+            else:
+                for row, sensor in rows:
+                    row[...] = sensor.sensor_data
+        return out
+
+    def _compile(self, out):
+        """Works out the copies that gather into ``out``. Sensors that aren't double buffered
+        keep their arrays, so their flattened data is concatenated into the flattened
+        destination in one call. Double buffered sensors move between slots, so they are read
+        row by row."""
+        if out.keys() != self._specs.keys():
+            raise HolodeckException(
+                "Expected a state with {}, got {}".format(
+                    sorted(self._specs), sorted(out)
+                )
+            )
+        steps = []
+        for key, sensors in self._entries:
+            destination = out[key]
+            shape, dtype = self._specs[key]
+            if destination.shape != shape or destination.dtype != dtype:
+                raise HolodeckException(
+                    "Expected {} to be {} {}, got {} {}".format(
+                        key, dtype, shape, destination.dtype, destination.shape
+                    )
+                )
+            if len(sensors) == 1 and destination.ndim == len(sensors[0].data_shape):
+                rows = [(destination, sensors[0])]
+            else:
+                rows = list(zip(destination, sensors))
+            if destination.flags.c_contiguous and not any(
+                sensor.double_buffered for sensor in sensors
+            ):
+                sources = [sensor.sensor_data.reshape(-1) for sensor in sensors]
+                steps.append((destination.reshape(-1), sources, None))
+            else:
+                steps.append((destination, None, rows))
+        return steps
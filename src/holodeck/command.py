@@ -2,50 +2,251 @@
 backend. Most of these commands are just used internally by Holodeck, regular users do not need to
 worry about these.
 
+Commands can be sent to the engine in two formats: JSON, which every engine understands, and a
+compact binary format that engines advertising :attr:`CommandCenter.BINARY_CAPABILITY` can read
+without parsing text. The binary format is laid out as follows (all integers are little
+endian):
+
+- A header of 16 bytes: the magic ``b"HCMD"``, a ``uint16`` version, ``uint16`` flags
+  (currently 0), the ``uint32`` number of commands and the ``uint32`` total size in bytes.
+- For every command: the command type as a ``uint16`` length followed by utf-8 bytes, a
+  ``uint16`` number of parameter runs, then the runs. A run is a ``uint8``
+  :class:`ParameterKind`, a ``uint32`` number of values and the values: packed ``float32``,
+  ``int32`` or ``float64`` numbers, or strings as a ``uint32`` length followed by utf-8 bytes.
+
+Consecutive parameters of the same kind share a run, in the order they were added.
 """
-
+import collections
+import itertools
+import json
+import struct
+import sys
+import time
 
 import numpy as np
-import sys
+
 from holodeck.exceptions import HolodeckException
 
+BINARY_COMMANDS_MAGIC = b"HCMD"
+BINARY_COMMANDS_VERSION = 1
+
+_binary_header = struct.Struct("<4sHHII")
+_run_header = struct.Struct("<BI")
+_length_prefix = struct.Struct("<I")
+_short_length_prefix = struct.Struct("<H")
+
+
+class ParameterKind:
+    """The kinds of parameter runs in the binary command format.
+
+    Attributes:
+        FLOAT32 (int): Floating point numbers
+        INT32 (int): Integers (and booleans) that fit in 32 bits
+        FLOAT64 (int): Integers too large for 32 bits, such as ``sys.maxsize``
+        STRING (int): Strings
+    """
+
+    FLOAT32 = 0
+    INT32 = 1
+    FLOAT64 = 2
+    STRING = 3
+
+    _formats = {FLOAT32: "f", INT32: "i", FLOAT64: "d"}
+
+    @staticmethod
+    def of(value):
+        """Gets the kind of a parameter value.
+
+        Args:
+            value (:obj:`str`, :obj:`int` or :obj:`float`): The value
+
+        Returns:
+            :obj:`int`: The :class:`ParameterKind`
+        """
+        if isinstance(value, str):
+            return ParameterKind.STRING
+        if isinstance(value, (int, np.integer, np.bool_)):
+            if -(2**31) <= value < 2**31:
+                return ParameterKind.INT32
+            return ParameterKind.FLOAT64
+        return ParameterKind.FLOAT32
+
+
+def decode_binary_commands(data):
+    """Decodes commands in the binary format, the way the engine would.
+
+    Args:
+        data (:obj:`bytes`): The encoded commands, as written to the command buffer. Anything
+            after the size given in the header is ignored.
+
+    Returns:
+        :obj:`list` of (:obj:`str`, :obj:`list`): The type and parameters of every command
+    """
+    data = memoryview(data)
+    magic, version, _, count, size = _binary_header.unpack_from(data)
+    if magic != BINARY_COMMANDS_MAGIC:
+        raise HolodeckException("Command buffer doesn't hold binary commands")
+    if version != BINARY_COMMANDS_VERSION:
+        raise HolodeckException("Unsupported binary command version " + str(version))
+
+    offset = _binary_header.size
+    commands = []
+    for _ in range(count):
+        (type_length,) = _short_length_prefix.unpack_from(data, offset)
+        offset += _short_length_prefix.size
+        command_type = bytes(data[offset : offset + type_length]).decode("utf-8")
+        offset += type_length
+
+        (num_runs,) = _short_length_prefix.unpack_from(data, offset)
+        offset += _short_length_prefix.size
+        parameters = []
+        for _ in range(num_runs):
+            kind, num_values = _run_header.unpack_from(data, offset)
+            offset += _run_header.size
+            if kind == ParameterKind.STRING:
+                for _ in range(num_values):
+                    (length,) = _length_prefix.unpack_from(data, offset)
+                    offset += _length_prefix.size
+                    parameters.append(
+                        bytes(data[offset : offset + length]).decode("utf-8")
+                    )
+                    offset += length
+            else:
+                run = struct.Struct(
+                    "<{}{}".format(num_values, ParameterKind._formats[kind])
+                )
+                parameters.extend(run.unpack_from(data, offset))
+                offset += run.size
+        commands.append((command_type, parameters))
+
+    if offset != size:
+        raise HolodeckException(
+            "Binary commands are {} bytes, expected {}".format(offset, size)
+        )
+    return commands
+
 
 class CommandsGroup:
     """Represents a list of commands
 
-    Can convert list of commands to json.
+    Can convert list of commands to json or to the binary format.
+
+    Commands with a :meth:`~Command.coalesce_key` replace any earlier command in the group
+    with the same key, since only the last of them would have an effect. The replacement is
+    moved to the end of the group, so it is still sent after the commands queued before it.
 
+    Attributes:
+        dropped (:obj:`int`): Number of commands that have been replaced since this counter was
+            last reset.
     """
 
     def __init__(self):
         self._commands = []
+        # Coalesce key -> index in self._commands. Replaced commands are set to None
+        self._coalesced = dict()
+        self._num_replaced = 0
+        self.dropped = 0
 
     def add_command(self, command):
         """Adds a command to the list
 
         Args:
             command (:class:`Command`): A command to add."""
+        key = command.coalesce_key()
+        if key is not None:
+            if key in self._coalesced:
+                self._commands[self._coalesced[key]] = None
+                self._num_replaced += 1
+                self.dropped += 1
+            self._coalesced[key] = len(self._commands)
         self._commands.append(command)
 
+    def _live_commands(self):
+        if self._num_replaced == 0:
+            return self._commands
+        return [command for command in self._commands if command is not None]
+
     def to_json(self):
         """
         Returns:
              :obj:`str`: Json for commands array object and all of the commands inside the array.
 
         """
-        commands = ",".join(map(lambda x: x.to_json(), self._commands))
+        commands = ",".join(map(lambda x: x.to_json(), self._live_commands()))
         return '{"commands": [' + commands + "]}"
 
+    def to_binary(self):
+        """
+        Returns:
+            :obj:`bytes`: The commands in the binary format, see :mod:`holodeck.command`.
+        """
+        live_commands = self._live_commands()
+        commands = b"".join(map(lambda x: x.to_binary(), live_commands))
+        header = _binary_header.pack(
+            BINARY_COMMANDS_MAGIC,
+            BINARY_COMMANDS_VERSION,
+            0,
+            sum(command.num_commands for command in live_commands),
+            _binary_header.size + len(commands),
+        )
+        return header + commands
+
+    def split_front(self, max_bytes, binary=False):
+        """Removes as many commands from the front of the group as fit in ``max_bytes`` once
+        encoded, and returns them as a new group.
+
+        Args:
+            max_bytes (:obj:`int`): Maximum encoded size of the returned group, including the
+                terminator of the JSON format.
+            binary (:obj:`bool`, optional): If the size is measured in the binary format
+                instead of JSON. Defaults to False.
+
+        Returns:
+            :class:`CommandsGroup`: The commands removed from the front
+        """
+        self._commands = self._live_commands()
+        self._num_replaced = 0
+
+        size = _binary_header.size if binary else len('{"commands": []}0')
+        count = 0
+        for command in self._commands:
+            if binary:
+                command_size = len(command.to_binary())
+            else:
+                # Commands after the first are preceded by a comma
+                command_size = len(command.to_json().encode()) + (1 if count else 0)
+            if size + command_size > max_bytes:
+                break
+            size += command_size
+            count += 1
+
+        if count == 0:
+            raise HolodeckException(
+                "Error: Command of {} bytes exceeds buffer size".format(command_size)
+            )
+
+        front = CommandsGroup()
+        front._commands = self._commands[:count]
+        del self._commands[:count]
+        self._coalesced = {
+            command.coalesce_key(): index
+            for index, command in enumerate(self._commands)
+            if command.coalesce_key() is not None
+        }
+        return front
+
     def clear(self):
         """Clear the list of commands."""
         self._commands.clear()
+        self._coalesced.clear()
+        self._num_replaced = 0
 
     @property
     def size(self):
         """
         Returns:
             int: Size of commands group"""
-        return len(self._commands)
+        return len(self._commands) - self._num_replaced
 
 
 class Command:
@@ -87,7 +288,7 @@ class Command:
             for x in number:
                 self.add_number_parameters(x)
             return
-        self._parameters.append('{ "value": ' + str(number) + " }")
+        self._parameters.append(number)
 
     def add_string_parameters(self, string):
         """Add given string parameters to the internal list.
@@ -101,7 +302,34 @@ class Command:
             for x in string:
                 self.add_string_parameters(x)
             return
-        self._parameters.append('{ "value": "' + string + '" }')
+        self._parameters.append(string)
+
+    @property
+    def parameters(self):
+        """
+        Returns:
+            :obj:`list`: The parameters of the command, in order
+        """
+        return self._parameters
+
+    @property
+    def num_commands(self):
+        """
+        Returns:
+            :obj:`int`: Number of commands the engine receives for this object, which is more
+            than one for batches such as :class:`DebugDrawBatchCommand`
+        """
+        return 1
+
+    def coalesce_key(self):
+        """Gets the key of the state this command sets, if a later command with the same key
+        makes this one redundant. Commands whose effects add up or depend on their order (the
+        default) return None and are never dropped.
+
+        Returns:
+            :obj:`tuple` or None: The key
+        """
+        return None
 
     def to_json(self):
         """Converts to json.
@@ -110,26 +338,374 @@ class Command:
             :obj:`str`: This object as a json string.
 
         """
+        params = [
+            '{ "value": "' + param + '" }'
+            if isinstance(param, str)
+            else '{ "value": ' + str(param) + " }"
+            for param in self._parameters
+        ]
         to_return = (
             '{ "type": "'
             + self._command_type
             + '", "params": ['
-            + ",".join(self._parameters)
+            + ",".join(params)
             + "]}"
         )
         return to_return
 
+    def to_binary(self):
+        """Converts to the binary format, see :mod:`holodeck.command`.
+
+        Strings are sent exactly as they were added, including any escaping done for JSON.
+
+        Returns:
+            :obj:`bytes`: This object in the binary format.
+        """
+        command_type = self._command_type.encode("utf-8")
+        runs = []
+        num_runs = 0
+        for kind, values in itertools.groupby(self._parameters, ParameterKind.of):
+            values = list(values)
+            num_runs += 1
+            runs.append(_run_header.pack(kind, len(values)))
+            if kind == ParameterKind.STRING:
+                for value in values:
+                    encoded = value.encode("utf-8")
+                    runs.append(_length_prefix.pack(len(encoded)))
+                    runs.append(encoded)
+            else:
+                fmt = "<{}{}".format(len(values), ParameterKind._formats[kind])
+                runs.append(struct.pack(fmt, *values))
+
+        return (
+            _short_length_prefix.pack(len(command_type))
+            + command_type
+            + _short_length_prefix.pack(num_runs)
+            + b"".join(runs)
+        )
+
+
+class CommandTemplate:
+    """A command whose type, string parameters and layout are serialized once, so that sending
+    it again with new numbers only has to fill the numbers in.
+
+    Useful for commands that are sent every tick with the same shape. The JSON is compiled to a
+    format string with a slot for every number, and the binary format to constant byte
+    segments around packed number runs.
+
+    The kind of every number in the binary format (see :class:`ParameterKind`) is fixed by the
+    command the template is made from. Integers filled into a float slot are sent as floats, and
+    commands with numbers that don't fit their slot at all fall back to the regular encoding.
+
+    Args:
+        command (:class:`Command`): The command to make the template from. Its numbers are only
+            used for their kinds.
+    """
+
+    def __init__(self, command):
+        parameters = command.parameters
+        self.command_type = command._command_type
+        self._coalesce_key = command.coalesce_key()
+        self._parameters = list(parameters)
+        self._number_indices = [
+            index
+            for index, param in enumerate(parameters)
+            if not isinstance(param, str)
+        ]
+
+        json_params = [
+            '{ "value": "' + param.replace("%", "%%") + '" }'
+            if isinstance(param, str)
+            else '{ "value": %s }'
+            for param in parameters
+        ]
+        self._json_format = (
+            '{ "type": "'
+            + self.command_type.replace("%", "%%")
+            + '", "params": ['
+            + ",".join(json_params)
+            + "]}"
+        )
+
+        runs = [
+            (kind, list(values))
+            for kind, values in itertools.groupby(parameters, ParameterKind.of)
+        ]
+        command_type = self.command_type.encode("utf-8")
+        constant = bytearray(_short_length_prefix.pack(len(command_type)))
+        constant += command_type
+        constant += _short_length_prefix.pack(len(runs))
+        # Alternating constant bytes and (struct, number of values) for number runs
+        self._binary_segments = []
+        for kind, values in runs:
+            constant += _run_header.pack(kind, len(values))
+            if kind == ParameterKind.STRING:
+                for value in values:
+                    encoded = value.encode("utf-8")
+                    constant += _length_prefix.pack(len(encoded))
+                    constant += encoded
+            else:
+                self._binary_segments.append(bytes(constant))
+                constant = bytearray()
+                fmt = "<{}{}".format(len(values), ParameterKind._formats[kind])
+                self._binary_segments.append((struct.Struct(fmt), len(values)))
+        self._binary_segments.append(bytes(constant))
+
+    @property
+    def num_numbers(self):
+        """
+        Returns:
+            :obj:`int`: How many numbers :meth:`fill` expects
+        """
+        return len(self._number_indices)
+
+    def fill(self, numbers):
+        """Creates a command from the template.
+
+        Args:
+            numbers (:obj:`list` of :obj:`int`/:obj:`float`): The numbers of the command, in
+                the order they were added to the command the template was made from.
+
+        Returns:
+            :class:`TemplateCommand`: The command, ready to be enqueued
+        """
+        numbers = tuple(numbers)
+        if len(numbers) != len(self._number_indices):
+            raise HolodeckException(
+                "Command template for {} takes {} numbers, got {}".format(
+                    self.command_type, len(self._number_indices), len(numbers)
+                )
+            )
+        return TemplateCommand(self, numbers)
+
+
+class TemplateCommand(Command):
+    """A command filled in from a :class:`CommandTemplate`.
+
+    Args:
+        template (:class:`CommandTemplate`): The template
+        numbers (:obj:`tuple` of :obj:`int`/:obj:`float`): The numbers to fill in
+    """
+
+    def __init__(self, template, numbers):
+        # The template already holds everything Command.__init__ would build
+        self._template = template
+        self._numbers = numbers
+        self._command_type = template.command_type
+
+    @property
+    def parameters(self):
+        parameters = list(self._template._parameters)
+        for index, number in zip(self._template._number_indices, self._numbers):
+            parameters[index] = number
+        return parameters
+
+    def coalesce_key(self):
+        return self._template._coalesce_key
+
+    def to_json(self):
+        return self._template._json_format % self._numbers
+
+    def to_binary(self):
+        segments = []
+        start = 0
+        try:
+            for segment in self._template._binary_segments:
+                if isinstance(segment, bytes):
+                    segments.append(segment)
+                else:
+                    packer, count = segment
+                    segments.append(packer.pack(*self._numbers[start : start + count]))
+                    start += count
+        except struct.error:
+            # A number changed kind (say a float where the template had an integer), encode
+            # the command the slow way
+            command = Command()
+            command.set_command_type(self._command_type)
+            command._parameters = self.parameters
+            return command.to_binary()
+        return b"".join(segments)
+
+
+class CommandTrace:
+    """Records when every command was queued and on which tick it was sent to the engine.
+
+    Finished commands are kept in a ring buffer of the latest ``capacity`` records, each a
+    :obj:`dict` with the keys
+
+    - ``id``: Number of the command, in the order commands were queued
+    - ``type``: The command type, such as ``"Teleport"``
+    - ``name``: The name of the world command for custom commands, the type otherwise
+    - ``status``: ``"sent"``, ``"dropped"`` if a later command replaced it (see
+      :meth:`Command.coalesce_key`), or ``"cleared"`` if the queue was cleared by a reset
+    - ``queued_tick``: Index of the tick that was next when the command was queued
+    - ``flushed_tick``: Index of the tick that carried the command, or on which it was dropped
+    - ``queued_time``, ``flushed_time``: :func:`time.perf_counter` timestamps, in seconds
+    - ``latency``: Seconds from queueing the command to writing it to the command buffer
+    - ``size``: Size of the command once serialized, in bytes, or ``None`` if it wasn't sent
+
+    Tick indices count the ticks of the client since the environment was created, starting
+    at 0.
+
+    Args:
+        capacity (:obj:`int`, optional): Number of records to keep. Defaults to 10000.
+
+    """
+
+    def __init__(self, capacity=10000):
+        self.capacity = capacity
+        self.records = collections.deque(maxlen=capacity)
+        # Records of queued commands, in queue order, along with the commands themselves
+        self._pending = []
+        self._next_id = 0
+
+    def record_queued(self, command, tick):
+        """Starts a record for a command that was just queued.
+
+        Args:
+            command (:class:`Command`): The command
+            tick (:obj:`int`): Index of the next tick
+
+        Returns:
+            :obj:`int`: The id of the command
+        """
+        command_type = command._command_type
+        name = (
+            command.parameters[0] if command_type == "CustomCommand" else command_type
+        )
+        record = {
+            "id": self._next_id,
+            "type": command_type,
+            "name": name,
+            "status": "queued",
+            "queued_tick": tick,
+            "flushed_tick": None,
+            "queued_time": time.perf_counter(),
+            "flushed_time": None,
+            "latency": None,
+            "size": None,
+        }
+        self._pending.append((command, record))
+        self._next_id += 1
+        return record["id"]
+
+    def record_flushed(self, sent, remaining, binary, tick):
+        """Finishes the records of commands that were written to the command buffer, or that
+        were replaced before they could be.
+
+        Args:
+            sent (:obj:`list` of :class:`Command`): Commands written to the command buffer
+            remaining (:class:`CommandsGroup`): Commands still queued for later ticks
+            binary (:obj:`bool`): If the commands were written in the binary format
+            tick (:obj:`int`): Index of the tick carrying the commands
+        """
+        now = time.perf_counter()
+        sent = {id(command) for command in sent}
+        queued = {id(command) for command in remaining._live_commands()}
+        pending = []
+        for command, record in self._pending:
+            if id(command) in sent:
+                record["status"] = "sent"
+                record["size"] = (
+                    len(command.to_binary())
+                    if binary
+                    else len(command.to_json().encode())
+                )
+            elif id(command) in queued:
+                pending.append((command, record))
+                continue
+            else:
+                record["status"] = "dropped"
+            self._finish(record, now, tick)
+        self._pending = pending
+
+    def record_cleared(self, tick):
+        """Finishes the records of every queued command after the queue was cleared.
+
+        Args:
+            tick (:obj:`int`): Index of the next tick
+        """
+        now = time.perf_counter()
+        for _, record in self._pending:
+            record["status"] = "cleared"
+            self._finish(record, now, tick)
+        self._pending = []
+
+    def _finish(self, record, now, tick):
+        record["flushed_tick"] = tick
+        record["flushed_time"] = now
+        record["latency"] = now - record["queued_time"]
+        self.records.append(record)
+
+    @property
+    def pending(self):
+        """
+        Returns:
+            :obj:`list` of :obj:`dict`: Records of the commands that are still queued
+        """
+        return [record for _, record in self._pending]
+
+    def clear(self):
+        """Forgets every finished record."""
+        self.records.clear()
+
+    def to_json(self):
+        """
+        Returns:
+            :obj:`str`: The finished and pending records, as a JSON array
+        """
+        return json.dumps(list(self.records) + self.pending)
+
+    def save(self, path):
+        """Writes the finished and pending records to a JSON file.
+
+        Args:
+            path (:obj:`str`): Path of the file to write
+        """
+        with open(path, "w") as trace_file:
+            trace_file.write(self.to_json())
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __len__(self):
+        return len(self.records)
+
 
 class CommandCenter:
     """Manages pending commands to send to the client (the engine).
 
+    The engine advertises the command formats it can read in the ``command_capabilities``
+    byte of shared memory. Commands are sent in the binary format when the engine sets
+    :attr:`BINARY_CAPABILITY` and ``binary_commands`` is enabled, and as JSON otherwise.
+
+    If the queued commands don't fit in the command buffer, they are split at command
+    boundaries into batches that are sent on consecutive ticks.
+
+    Attributes:
+        extra_ticks (:obj:`int`): Number of additional ticks that have been needed so far to
+            send batches that didn't fit in the command buffer.
+        dropped_commands (:obj:`int`): Number of commands dropped from the batch sent on the
+            latest tick because a later command replaced them (see
+            :meth:`Command.coalesce_key`).
+        total_dropped_commands (:obj:`int`): Number of commands dropped so far.
+        trace (:class:`CommandTrace`): Trace of the commands sent, or ``None`` if tracing is
+            off (see :meth:`enable_trace`).
+        journal (:class:`~holodeck.journal.JournalWriter`): Journal that every batch written to
+            the command buffer is recorded in, or ``None``.
+
     Args:
         client (:class:`~holodeck.holodeckclient.HolodeckClient`): Client to send commands to
+        binary_commands (:obj:`bool`, optional): If the binary format should be used when the
+            engine supports it. Defaults to True.
 
     """
 
-    def __init__(self, client):
+    BINARY_CAPABILITY = 1
+
+    def __init__(self, client, binary_commands=True):
         self._client = client
+        self.binary_commands = binary_commands
 
         # Set up command buffer
         self._command_bool_ptr = self._client.malloc("command_bool", [1], np.bool)
@@ -138,18 +714,53 @@ class CommandCenter:
         self._command_buffer_ptr = self._client.malloc(
             "command_buffer", [self.max_buffer], np.byte
         )
+        # Byte view of the buffer, so that commands can be copied in with a single memcpy
+        self._command_buffer_view = memoryview(self._command_buffer_ptr).cast("B")
+        # Written by the engine, see BINARY_CAPABILITY
+        self._command_capabilities_ptr = self._client.malloc(
+            "command_capabilities", [1], np.uint8
+        )
         self._commands = CommandsGroup()
         self._should_write_to_command_buffer = False
+        self.extra_ticks = 0
+        self.dropped_commands = 0
+        self.total_dropped_commands = 0
+        self.trace = None
+        self.journal = None
+
+    def enable_trace(self, capacity=10000):
+        """Starts tracing every command that is queued from now on.
+
+        Args:
+            capacity (:obj:`int`, optional): Number of records to keep. Defaults to 10000.
+
+        Returns:
+            :class:`CommandTrace`: The trace
+        """
+        self.trace = CommandTrace(capacity)
+        return self.trace
+
+    def disable_trace(self):
+        """Stops tracing commands."""
+        self.trace = None
 
     def clean_up_resources(self):
         if hasattr(self, "_command_bool_ptr"):
             del self._command_bool_ptr
+        if hasattr(self, "_command_capabilities_ptr"):
+            del self._command_capabilities_ptr
+        if hasattr(self, "_command_buffer_view"):
+            self._command_buffer_view.release()
+            del self._command_buffer_view
         if hasattr(self, "_command_buffer_ptr"):
             del self._command_buffer_ptr
 
     def clear(self):
         """Clears pending commands"""
+        if self.trace is not None:
+            self.trace.record_cleared(self._client.sequence)
         self._commands.clear()
+        self._should_write_to_command_buffer = False
 
     def handle_buffer(self):
         """Writes the list of commands into the command buffer, if needed.
@@ -157,11 +768,43 @@ class CommandCenter:
         Checks if we should write to the command buffer, writes all of the queued commands to the
         buffer, and then clears the contents of the self._commands list
 
+        If the commands don't fit in the buffer, only the first batch that fits is written and
+        the rest stay queued for the next tick.
+
         """
-        if self._should_write_to_command_buffer:
-            self._write_to_command_buffer(self._commands.to_json())
+        self.dropped_commands = self._commands.dropped
+        self.total_dropped_commands += self._commands.dropped
+        self._commands.dropped = 0
+        if not self._should_write_to_command_buffer:
+            return
+
+        binary = self.uses_binary
+        to_write = self._commands.to_binary() if binary else self._commands.to_json()
+        size = len(to_write) if binary else len(to_write.encode()) + 1
+
+        if size <= self.max_buffer:
+            if self.trace is not None:
+                self.trace.record_flushed(
+                    self._commands._live_commands(),
+                    CommandsGroup(),
+                    binary,
+                    self._client.sequence,
+                )
             self._should_write_to_command_buffer = False
             self._commands.clear()
+        else:
+            batch = self._commands.split_front(self.max_buffer, binary)
+            to_write = batch.to_binary() if binary else batch.to_json()
+            self.extra_ticks += 1
+            if self.trace is not None:
+                self.trace.record_flushed(
+                    batch._commands, self._commands, binary, self._client.sequence
+                )
+
+        if binary:
+            self._write_binary_to_command_buffer(to_write)
+        else:
+            self._write_to_command_buffer(to_write)
 
     def enqueue_command(self, command_to_send):
         """Adds command to outgoing queue.
@@ -169,9 +812,16 @@ class CommandCenter:
         Args:
             command_to_send (:class:`Command`): Command to add to queue
 
+        Returns:
+            :obj:`int`: The id of the command in the :attr:`trace`, or ``None`` if tracing is
+            off
+
         """
         self._should_write_to_command_buffer = True
         self._commands.add_command(command_to_send)
+        if self.trace is not None:
+            return self.trace.record_queued(command_to_send, self._client.sequence)
+        return None
 
     def _write_to_command_buffer(self, to_write):
         """Write input to the command buffer.
@@ -182,15 +832,39 @@ class CommandCenter:
             to_write (:class:`str`): The string to write to the command buffer.
 
         """
+        # The gason JSON parser in holodeck expects a 0 at the end of the file.
+        self._copy_to_command_buffer(to_write.encode() + b"0")
+
+    def _write_binary_to_command_buffer(self, to_write):
+        """Write commands in the binary format to the command buffer.
+
+        Args:
+            to_write (:obj:`bytes`): The encoded commands.
+
+        """
+        self._copy_to_command_buffer(to_write)
+
+    def _copy_to_command_buffer(self, input_bytes):
+        """Copies encoded commands into the command buffer in one go and flags them for the
+        engine."""
+        length = len(input_bytes)
+        if length > self.max_buffer:
+            raise HolodeckException("Error: Command length exceeds buffer size")
+        self._command_buffer_view[:length] = input_bytes
+        if self.journal is not None:
+            self.journal.record_commands(input_bytes)
         np.copyto(self._command_bool_ptr, True)
-        to_write += (
-            "0"  # The gason JSON parser in holodeck expects a 0 at the end of the file.
+
+    @property
+    def uses_binary(self):
+        """
+        Returns:
+            :obj:`bool`: If commands are sent in the binary format, which requires both the
+            engine and ``binary_commands`` to allow it
+        """
+        return self.binary_commands and bool(
+            self._command_capabilities_ptr[0] & CommandCenter.BINARY_CAPABILITY
         )
-        input_bytes = str.encode(to_write)
-        if len(input_bytes) > self.max_buffer:
-            raise HolodeckException("Error: Command length exceeds buffer size")
-        for index, val in enumerate(input_bytes):
-            self._command_buffer_ptr[index] = val
 
     @property
     def queue_size(self):
@@ -305,6 +979,69 @@ class DebugDrawCommand(Command):
         self.add_number_parameters(thickness)
 
 
+class DebugDrawBatchCommand(Command):
+    """Draw many debug primitives of the same type, encoded in bulk.
+
+    The engine receives one ``DebugDraw`` command per primitive, exactly as if a
+    :class:`DebugDrawCommand` had been sent for each, but the batch is serialized with a single
+    format call and a single numpy copy instead of building every command separately.
+
+    Args:
+        draw_type (:obj:`int`): The type of object to draw, see :class:`DebugDrawCommand`
+        params (:obj:`np.ndarray`): ``(N, 10)`` array with the start, end, color and thickness
+            of every primitive
+    """
+
+    _json_format = (
+        '{ "type": "DebugDraw", "params": [{ "value": %d },'
+        + ",".join(['{ "value": %r }'] * 10)
+        + "]}"
+    )
+
+    def __init__(self, draw_type, params):
+        super(DebugDrawBatchCommand, self).__init__()
+        self._command_type = "DebugDraw"
+        self._draw_type = int(draw_type)
+        self._params = np.asarray(params, dtype=np.float64).reshape(-1, 10)
+
+        # Every DebugDraw command in binary starts with the same bytes: its type, the number
+        # of runs, an int32 run with the draw type and the header of a float32 run of 10
+        command_type = self._command_type.encode("utf-8")
+        prefix = (
+            _short_length_prefix.pack(len(command_type))
+            + command_type
+            + _short_length_prefix.pack(2)
+            + _run_header.pack(ParameterKind.INT32, 1)
+            + struct.pack("<i", self._draw_type)
+            + _run_header.pack(ParameterKind.FLOAT32, 10)
+        )
+        self._binary_dtype = np.dtype(
+            [("prefix", "S{}".format(len(prefix))), ("params", "<f4", (10,))]
+        )
+        self._binary_prefix = prefix
+
+    @property
+    def num_commands(self):
+        return len(self._params)
+
+    @property
+    def parameters(self):
+        return [[self._draw_type] + row for row in self._params.tolist()]
+
+    def to_json(self):
+        json_format = self._json_format
+        draw_type = self._draw_type
+        return ",".join(
+            [json_format % (draw_type, *row) for row in self._params.tolist()]
+        )
+
+    def to_binary(self):
+        records = np.empty(len(self._params), dtype=self._binary_dtype)
+        records["prefix"] = self._binary_prefix
+        records["params"] = self._params
+        return records.tobytes()
+
+
 class TeleportCameraCommand(Command):
     """Move the viewport camera (agent follower)
 
@@ -322,6 +1059,9 @@ class TeleportCameraCommand(Command):
         self.add_number_parameters(location)
         self.add_number_parameters(rotation)
 
+    def coalesce_key(self):
+        return (self._command_type,)
+
 
 class AddSensorCommand(Command):
     """Add a sensor to an agent
@@ -377,10 +1117,15 @@ class RotateSensorCommand(Command):
     def __init__(self, agent, sensor, rotation):
         Command.__init__(self)
         self._command_type = "RotateSensor"
+        self._agent = agent
+        self._sensor = sensor
         self.add_string_parameters(agent)
         self.add_string_parameters(sensor)
         self.add_number_parameters(rotation)
 
+    def coalesce_key(self):
+        return self._command_type, self._agent, self._sensor
+
 
 class RenderViewportCommand(Command):
     """Enable or disable the viewport. Note that this does not prevent the viewport
@@ -396,6 +1141,9 @@ class RenderViewportCommand(Command):
         self.set_command_type("RenderViewport")
         self.add_number_parameters(int(bool(render_viewport)))
 
+    def coalesce_key(self):
+        return (self._command_type,)
+
 
 class RGBCameraRateCommand(Command):
     """Set the number of ticks between captures of the RGB camera.
@@ -410,10 +1158,15 @@ class RGBCameraRateCommand(Command):
     def __init__(self, agent_name, sensor_name, ticks_per_capture):
         Command.__init__(self)
         self._command_type = "RGBCameraRate"
+        self._agent = agent_name
+        self._sensor = sensor_name
         self.add_string_parameters(agent_name)
         self.add_string_parameters(sensor_name)
         self.add_number_parameters(ticks_per_capture)
 
+    def coalesce_key(self):
+        return self._command_type, self._agent, self._sensor
+
 
 class RenderQualityCommand(Command):
     """Adjust the rendering quality of Holodeck
@@ -428,6 +1181,9 @@ class RenderQualityCommand(Command):
         self.set_command_type("AdjustRenderQuality")
         self.add_number_parameters(int(render_quality))
 
+    def coalesce_key(self):
+        return (self._command_type,)
+
 
 class CustomCommand(Command):
     """Send a custom command to the currently loaded world.
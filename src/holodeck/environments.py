@@ -21,10 +21,14 @@ from holodeck.command import (
     RenderViewportCommand,
     RenderQualityCommand,
     CustomCommand,
+    CommandTemplate,
 )
 
 from holodeck.exceptions import HolodeckException
 from holodeck.holodeckclient import HolodeckClient
+from holodeck.columnar import ColumnarPlan
+from holodeck.journal import JournalWriter
+from holodeck.shmem import TickHeader
 from holodeck.agents import AgentDefinition, SensorDefinition, AgentFactory
 from holodeck.util import check_process_alive, log_paths
 from holodeck.weather import WeatherController
@@ -76,6 +80,51 @@ class HolodeckEnvironment:
         max_ticks (:obj: `int`, optional):
             The number of ticks to be run before returning to the terminal and cancels the tick function
 
+        arena_size (:obj:`int`, optional):
+            If given, every shared memory buffer is sub-allocated from one region of this many
+            bytes instead of a separate block per buffer (see
+            :class:`~holodeck.shmem.ShmemArena`). Requires an engine that reads the arena
+            manifest. Defaults to None.
+
+        spin_wait_us (:obj:`int`, optional):
+            Microseconds to spin waiting for the engine to finish a tick before blocking on the
+            semaphore. Useful when ticks are short (headless, low render quality), since it
+            avoids a kernel sleep and wake up per tick. Defaults to 0 (always block).
+
+        double_buffer_sensors (:obj:`bool`, optional):
+            Give every sensor two slots that the engine alternates between, so that the state
+            of one tick stays intact while the next tick is written. With ``copy_state=False``
+            the returned state then stays valid until the tick after the next one. Requires an
+            engine that supports double buffering. Defaults to False.
+
+        reuse_agents_on_reset (:obj:`bool`, optional):
+            Keep the agent and sensor objects across :meth:`reset` when an agent is respawned
+            with the same type and sensors, instead of building them again. Only the commands
+            to respawn the agent and its sensors are sent to the engine, and the agent's state
+            dictionary and sensor arrays stay valid across episodes. Defaults to True.
+
+        memory_backing (:class:`~holodeck.shmem.MemoryBacking`, optional):
+            Back large buffers (by default those of at least 1 MiB, such as camera buffers)
+            with huge pages, pre-fault them so that the first tick doesn't page fault, or lock
+            them into RAM. Options that aren't permitted on this machine are skipped. Defaults
+            to None (plain mappings).
+
+        binary_commands (:obj:`bool`, optional):
+            Send commands to the engine in the compact binary format instead of JSON, if the
+            engine supports it (see :class:`~holodeck.command.CommandCenter`). Defaults to True.
+
+        state_pool_size (:obj:`int`, optional):
+            With ``copy_state``, copy the state into a ring of this many preallocated states
+            instead of allocating new arrays every tick. A returned state is then overwritten
+            ``state_pool_size`` ticks later. Defaults to 0 (allocate every tick).
+
+        columnar_state (:obj:`bool`, optional):
+            In multi-agent environments, return the state as a dictionary from sensor name to
+            an array of that sensor across agents, of shape ``(num_agents, ...)``, instead of a
+            dictionary per agent (see :mod:`holodeck.columnar` and :attr:`columnar_rows`). With
+            ``copy_state=False`` the arrays are overwritten on the next tick. Defaults to
+            False.
+
     """
 
     def __init__(
@@ -93,6 +142,14 @@ class HolodeckEnvironment:
         copy_state=True,
         scenario=None,
         max_ticks=sys.maxsize,
+        arena_size=None,
+        spin_wait_us=0,
+        double_buffer_sensors=False,
+        reuse_agents_on_reset=True,
+        memory_backing=None,
+        binary_commands=True,
+        state_pool_size=0,
+        columnar_state=False,
     ):
 
         if agent_definitions is None:
@@ -119,6 +176,22 @@ class HolodeckEnvironment:
         self._spawned_agent_defs = []
         self._total_ticks = 0
         self._max_ticks = max_ticks
+        self._reuse_agents_on_reset = reuse_agents_on_reset
+        # Agents that have been built, by name, to be reused across resets
+        self._agent_registry = dict()
+        self._journal = None
+        # Sensor name -> buffer holding its value on the second to last tick of a step
+        self._max_pool_buffers = dict()
+        # Preallocated states that copies of the state are recycled into, see state_pool_size
+        self._state_pool = [None] * state_pool_size
+        self._state_pool_index = 0
+        self._columnar_state = columnar_state
+        # Gathers the columnar state, rebuilt when the agents or their sensors change
+        self._columnar_plan = None
+        # Agent name -> names of the sensors returned in the state, see set_observation_filter
+        self._observation_filter = None
+        if scenario is not None and "observation_filter" in scenario:
+            self._observation_filter = scenario["observation_filter"]
 
         # Start world based on OS
         if start_world:
@@ -137,11 +210,24 @@ class HolodeckEnvironment:
                 raise HolodeckException("Unknown platform: " + os.name)
 
         # Initialize Client
-        self._client = HolodeckClient(self._uuid, start_world)
-        self._command_center = CommandCenter(self._client)
+        self._client = HolodeckClient(
+            self._uuid,
+            start_world,
+            arena_size=arena_size,
+            spin_wait_us=spin_wait_us,
+            double_buffer_sensors=double_buffer_sensors,
+            memory_backing=memory_backing,
+        )
+        if hasattr(self, "_world_process"):
+            self._client.add_owner_pid(self._world_process.pid)
+        self._command_center = CommandCenter(self._client, binary_commands)
         self._client.command_center = self._command_center
         self._reset_ptr = self._client.malloc("RESET", [1], np.bool)
         self._reset_ptr[0] = False
+        # The engine's tick counter, and the tick each sensor was last written on
+        self._client.tick_header = TickHeader(
+            self._client.malloc(TickHeader.KEY, [TickHeader.size_bytes()], np.uint8)
+        )
 
         # Initialize environment controller
         self.weather = WeatherController(self.send_world_command)
@@ -154,10 +240,7 @@ class HolodeckEnvironment:
         # Set the default state function
         self.num_agents = len(self.agents)
 
-        if self.num_agents == 1:
-            self._default_state_fn = self._get_single_state
-        else:
-            self._default_state_fn = self._get_full_state
+        self._default_state_fn = self._select_state_fn()
 
         self._acquire_catch_crash()
 
@@ -166,7 +249,14 @@ class HolodeckEnvironment:
 
         # Flag indicates if the user has called .reset() before .tick() and .step()
         self._initial_reset = False
-        self.reset()
+        # Flag indicates the engine owns shared memory until .step_wait() is called
+        self._client.awaiting_engine = False
+        try:
+            self.reset()
+        except HolodeckException:
+            # Such as an invalid scenario, don't leave the shared memory behind
+            self.__on_exit__()
+            raise
 
         # System event handlers for graceful exit. We may only need to handle
         # SIGHUB, but I'm being a little paranoid
@@ -177,12 +267,20 @@ class HolodeckEnvironment:
 
     def clean_up_resources(self):
         """Frees up references to mapped memory files."""
+        if getattr(self, "_journal", None) is not None:
+            self.stop_journal()
         self._command_center.clean_up_resources()
         if hasattr(self, "_reset_ptr"):
             del self._reset_ptr
+        if hasattr(self, "_client"):
+            self._client.tick_header = None
         for key in list(self.agents.keys()):
             self.agents[key].clean_up_resources()
             del self.agents[key]
+        if hasattr(self, "_agent_registry"):
+            for agent in self._agent_registry.values():
+                agent.clean_up_resources()
+            self._agent_registry.clear()
 
     def graceful_exit(self, _signum, _frame):
         """Signal handler to gracefully exit the script"""
@@ -221,6 +319,50 @@ class HolodeckEnvironment:
                 result.append("\n")
         return "".join(result)
 
+    def memory_report(self):
+        """Breaks down the shared memory used by this environment.
+
+        Cheap enough to be called every episode.
+
+        Returns:
+            :obj:`dict`: A dictionary with the keys
+
+            - ``agents``: Dictionary from agent name to a dictionary with the size in bytes of
+              each of the agent's own buffers (``action``, ``teleport_flag``,
+              ``teleport_command``, ``control_scheme``), ``sensors`` (a dictionary from
+              sensor name to its size in bytes) and the ``total`` for the agent.
+            - ``internal``: Dictionary from key to size in bytes of every buffer not owned by a
+              current agent, such as the ``command_buffer`` and the ``RESET`` flag.
+            - ``total``: Total size of all buffers in bytes
+            - ``mapped``: Bytes of shared memory mapped by this environment
+            - ``process_total``: Bytes of shared memory mapped by every environment in this
+              process
+        """
+        client_report = self._client.memory_report()
+        internal = dict(client_report["buffers"])
+
+        agents = dict()
+        for agent_name, agent in self.agents.items():
+            agent_report = {
+                buffer_name: internal.pop(key, 0)
+                for buffer_name, key in agent.memory_keys.items()
+            }
+            sensors = {
+                sensor_name: sum(internal.pop(key, 0) for key in sensor.memory_keys)
+                for sensor_name, sensor in agent.sensors.items()
+            }
+            agent_report["total"] = sum(agent_report.values()) + sum(sensors.values())
+            agent_report["sensors"] = sensors
+            agents[agent_name] = agent_report
+
+        return {
+            "agents": agents,
+            "internal": internal,
+            "total": client_report["total"],
+            "mapped": client_report["mapped"],
+            "process_total": client_report["process_total"],
+        }
+
     def _load_scenario(self):
         """Loads the scenario defined in self._scenario_key.
 
@@ -364,6 +506,8 @@ class HolodeckEnvironment:
 
             For multi-agent environment, returns the same as `tick`.
         """
+        self._check_not_awaiting_engine("reset")
+
         # Reset level
         self._initial_reset = True
         self._reset_ptr[0] = True
@@ -393,27 +537,44 @@ class HolodeckEnvironment:
             self.add_agent(agent_def, agent_def.is_main_agent)
 
         self._load_scenario()
+        if self._observation_filter is not None:
+            # Check the filter against the agents, such as one given in the scenario
+            self.set_observation_filter(self._observation_filter)
 
         self.num_agents = len(self.agents)
 
-        if self.num_agents == 1:
-            self._default_state_fn = self._get_single_state
-        else:
-            self._default_state_fn = self._get_full_state
+        self._default_state_fn = self._select_state_fn()
 
-        for _ in range(self._pre_start_steps + 1):
+        self.tick()
+        # Scenarios too large for the command buffer are sent over additional ticks, which
+        # shouldn't count as ticks of the episode or cut into the time the world has to settle
+        while self._command_center.queue_size > 0:
+            self._release_engine()
+            self._acquire_engine()
+        for _ in range(self._pre_start_steps):
             self.tick()
 
         return self._default_state_fn()
 
-    def step(self, action, ticks=1):
+    def step(self, action, ticks=1, frame_skip=False, max_pool=None, out=None):
         """Supplies an action to the main agent and tells the environment to tick once.
         Primary mode of interaction for single agent environments.
 
         Args:
             action (:obj:`np.ndarray`): An action for the main agent to carry out on the next tick.
             ticks (:obj:`int`): Number of times to step the environment with this action.
-                If ticks > 1, this function returns the last state generated.
+                If ticks > 1, this function returns the last state generated. The state is only
+                built (and copied, with ``copy_state``) on the last tick.
+            frame_skip (:obj:`bool`, optional): Return the sum of the rewards of the ticks
+                instead of the reward of the last one, and stop ticking as soon as the main agent
+                reaches a terminal state. Defaults to False.
+            max_pool (:obj:`list` of :obj:`str`, optional): Names of sensors of the main agent,
+                such as ``["RGBCamera"]``, whose returned value is the element-wise maximum of
+                their values on the last two ticks, as done with Atari frame skipping. Not
+                applied if the step ends early on a terminal state. Defaults to None.
+            out (:obj:`dict`, optional): A state to copy the state into, with the same sensors
+                as the one returned, such as one from :meth:`allocate_state`. It is returned
+                instead of a new state, so that stepping doesn't allocate. Defaults to None.
 
         Returns:
             (:obj:`dict`, :obj:`float`, :obj:`bool`, info): A 4tuple:
@@ -421,26 +582,132 @@ class HolodeckEnvironment:
                     (see :class:`~holodeck.sensors.HolodeckSensor`) to :obj:`np.ndarray`.
                 - Reward (:obj:`float`): Reward returned by the environment.
                 - Terminal: The bool terminal signal returned by the environment.
-                - Info: Any additional info, depending on the world. Defaults to None.
+                - Info (:obj:`dict`): ``tick``, the :attr:`engine_tick` of the state, and
+                  ``last_update_ticks``, a dictionary from sensor name to the
+                  :attr:`~holodeck.sensors.HolodeckSensor.last_update_tick` of each of the
+                  main agent's sensors. Sensors whose last update tick is older than ``tick``
+                  weren't written on this tick.
         """
         if not self._initial_reset:
             raise HolodeckException("You must call .reset() before .step()")
-
-        last_state = None
-
-        for _ in range(ticks):
+        self._check_not_awaiting_engine("step")
+
+        if ticks < 1:
+            return None
+        if max_pool and self._agent is None:
+            raise HolodeckException("max_pool requires a main agent")
+        if max_pool and self._default_state_fn == self._get_columnar_state:
+            raise HolodeckException("max_pool isn't supported with columnar_state")
+
+        total_reward = None
+        pooled = False
+        for tick in range(ticks):
             if self._agent is not None:
                 self._agent.act(action)
+            if max_pool and tick == ticks - 1 and tick > 0:
+                self._store_max_pool_frames(max_pool)
+                pooled = True
 
-            self._command_center.handle_buffer()
-            self._client.release()
-            self._acquire_catch_crash()
+            self._release_engine()
+            self._acquire_engine()
 
             reward, terminal = self._get_reward_terminal()
-            last_state = self._default_state_fn(), reward, terminal, None
             self.check_max_tick()
+            if frame_skip:
+                if reward is not None:
+                    total_reward = (
+                        reward if total_reward is None else total_reward + reward
+                    )
+                if terminal:
+                    break
+
+        state = self._default_state_fn(out)
+        if pooled:
+            state = self._apply_max_pool(
+                state, max_pool, out is not None or self._copy_state
+            )
+        if frame_skip:
+            reward = total_reward
+        return state, reward, terminal, self._get_info()
+
+    def _store_max_pool_frames(self, sensor_names):
+        """Copies the current value of the sensors into preallocated buffers, to be pooled with
+        the value of the next tick by :meth:`_apply_max_pool`"""
+        agent_state = self._state_dict[self._agent.name]
+        for name in sensor_names:
+            value = agent_state[name]
+            pool = self._max_pool_buffers.get(name)
+            if pool is None or pool.shape != value.shape or pool.dtype != value.dtype:
+                pool = np.empty_like(value)
+                self._max_pool_buffers[name] = pool
+            np.copyto(pool, value)
+
+    def _apply_max_pool(self, state, sensor_names, copied):
+        if not copied:
+            # The state is the live state dictionary, return the pooled values in a new one
+            state = dict(state)
+            if self.num_agents > 1:
+                state[self._agent.name] = dict(state[self._agent.name])
+        agent_state = state if self.num_agents == 1 else state[self._agent.name]
+
+        for name in sensor_names:
+            if name not in agent_state:
+                continue  # Left out by the observation filter
+            pool = self._max_pool_buffers[name]
+            if copied:
+                np.maximum(agent_state[name], pool, out=agent_state[name])
+            else:
+                np.maximum(agent_state[name], pool, out=pool)
+                agent_state[name] = pool
+        return state
+
+    def step_async(self, action):
+        """Supplies an action to the main agent and starts a tick, without waiting for the engine
+        to finish it. Must be followed by a call to :meth:`step_wait`.
+
+        This allows work on the Python side (like running a policy for another environment) to
+        overlap with the engine tick. Until :meth:`step_wait` returns, the engine owns the
+        shared memory, so the state returned by previous steps must not be read if
+        ``copy_state`` is False. Methods of the environment and its agents that write the
+        shared memory, such as :meth:`act`, :meth:`send_world_command` and
+        :meth:`~holodeck.agents.HolodeckAgent.teleport`, raise until then.
+
+        Args:
+            action (:obj:`np.ndarray`): An action for the main agent to carry out on the next tick.
+        """
+        if not self._initial_reset:
+            raise HolodeckException("You must call .reset() before .step_async()")
+        self._check_not_awaiting_engine("step_async")
+
+        if self._agent is not None:
+            self._agent.act(action)
+
+        self._release_engine()
+        self._client.awaiting_engine = True
 
-        return last_state
+    def step_wait(self, out=None):
+        """Waits for the tick started by :meth:`step_async` to finish.
+
+        Args:
+            out (:obj:`dict`, optional): A state to copy the state into, see :meth:`step`.
+
+        Returns:
+            (:obj:`dict`, :obj:`float`, :obj:`bool`, info): The same 4tuple as :meth:`step`.
+        """
+        if not self._client.awaiting_engine:
+            raise HolodeckException("You must call .step_async() before .step_wait()")
+
+        try:
+            self._acquire_engine()
+        finally:
+            # Don't leave the environment refusing every call if waiting failed
+            self._client.awaiting_engine = False
+
+        reward, terminal = self._get_reward_terminal()
+        state = self._default_state_fn(out), reward, terminal, self._get_info()
+        self.check_max_tick()
+
+        return state
 
     def act(self, agent_name, action):
         """Supplies an action to a particular agent, but doesn't tick the environment.
@@ -453,6 +720,7 @@ class HolodeckEnvironment:
                 action will be applied every time `tick` is called, until a new action is supplied
                 with another call to act.
         """
+        self._check_not_awaiting_engine("act")
         self.agents[agent_name].act(action)
 
     def get_joint_constraints(self, agent_name, joint_name):
@@ -465,32 +733,139 @@ class HolodeckEnvironment:
         """
         return self.agents[agent_name].get_joint_constraints(joint_name)
 
-    def tick(self, num_ticks=1):
+    def tick(self, num_ticks=1, out=None):
         """Ticks the environment once. Normally used for multi-agent environments.
         Args:
             num_ticks (:obj:`int`): Number of ticks to perform. Defaults to 1.
+            out (:obj:`dict`, optional): A state to copy the state into, see :meth:`step`.
         Returns:
             :obj:`dict`: A dictionary from agent name to its full state. The full state is another
                 dictionary from :obj:`holodeck.sensors.Sensors` enum to np.ndarray, containing the
                 sensors information for each sensor. The sensors always include the reward and
                 terminal sensors.
+                With ``columnar_state``, a dictionary from sensor name to the stacked array of
+                that sensor across agents instead.
 
                 Will return the state from the last tick executed.
         """
         if not self._initial_reset:
             raise HolodeckException("You must call .reset() before .tick()")
-
-        state = None
+        self._check_not_awaiting_engine("tick")
 
         for _ in range(num_ticks):
-            self._command_center.handle_buffer()
-
-            self._client.release()
-            self._acquire_catch_crash()
-            state = self._default_state_fn()
+            self._release_engine()
+            self._acquire_engine()
             self.check_max_tick()
 
-        return state
+        return self._default_state_fn(out) if num_ticks > 0 else None
+
+    def flush_commands(self):
+        """Ticks the environment until every queued command has been sent to the engine.
+
+        Commands are normally sent on the next tick, but if they don't fit in the command buffer
+        they are split into batches that are sent over consecutive ticks (see
+        :class:`~holodeck.command.CommandCenter`). The ticks count towards ``max_ticks``.
+
+        Returns:
+            :obj:`int`: The number of ticks it took
+        """
+        if not self._initial_reset:
+            raise HolodeckException("You must call .reset() before .flush_commands()")
+        self._check_not_awaiting_engine("flush_commands")
+
+        ticks = 0
+        while self._command_center.queue_size > 0:
+            self.tick()
+            ticks += 1
+        return ticks
+
+    @property
+    def dropped_commands(self):
+        """Number of commands left out of the latest tick because a later command of the same
+        kind and target replaced them, such as repeated sensor rotations. See
+        :meth:`~holodeck.command.Command.coalesce_key`.
+
+        Returns:
+            :obj:`int`: The number of commands
+        """
+        return self._command_center.dropped_commands
+
+    def enable_command_trace(self, capacity=10000):
+        """Starts recording when every command is queued and which tick carries it to the
+        engine, to find out why a command didn't seem to apply. Tracing adds overhead to every
+        command, so it is off by default.
+
+        Args:
+            capacity (:obj:`int`, optional): Number of commands to keep records of. Defaults to
+                10000.
+
+        Returns:
+            :class:`~holodeck.command.CommandTrace`: The trace, which can be saved with
+            :meth:`~holodeck.command.CommandTrace.save`
+        """
+        return self._command_center.enable_trace(capacity)
+
+    def disable_command_trace(self):
+        """Stops recording commands, see :meth:`enable_command_trace`."""
+        self._command_center.disable_trace()
+
+    @property
+    def command_trace(self):
+        """The trace of the commands sent to the engine, or ``None`` if it isn't enabled. See
+        :meth:`enable_command_trace`.
+
+        Returns:
+            :class:`~holodeck.command.CommandTrace`: The trace
+        """
+        return self._command_center.trace
+
+    def start_journal(self, path):
+        """Starts journaling, every tick, the actions, teleports, control schemes and commands
+        handed to the engine, so that the episode from here on can be replayed with
+        :func:`holodeck.journal.replay`. The journal is written to ``path`` from a background
+        thread.
+
+        Args:
+            path (:obj:`str`): Path of the journal file, which is overwritten.
+
+        Returns:
+            :class:`~holodeck.journal.JournalWriter`: The journal
+        """
+        if self._journal is not None:
+            raise HolodeckException("A journal is already being written")
+        self._journal = JournalWriter(path, self._client)
+        self._command_center.journal = self._journal
+        return self._journal
+
+    def stop_journal(self):
+        """Stops journaling and finishes writing the journal file, see :meth:`start_journal`.
+
+        Returns:
+            :obj:`int`: The number of ticks journaled
+        """
+        journal = self._journal
+        if journal is None:
+            raise HolodeckException("No journal is being written")
+        self._journal = None
+        self._command_center.journal = None
+        journal.close()
+        return journal.ticks
+
+    def _journal_keys(self):
+        keys = ["RESET"]
+        for agent in self.agents.values():
+            keys.extend(agent.memory_keys.values())
+        return keys
+
+    @property
+    def engine_tick(self):
+        """The engine's tick counter, as of the latest tick. Always 0 with an engine that
+        doesn't count ticks.
+
+        Returns:
+            :obj:`int`: The tick number
+        """
+        return int(self._client.tick_header.counter[0])
 
     def check_max_tick(self):
         """Increments tick counter '_total_ticks' and throws a
@@ -504,6 +879,26 @@ class HolodeckEnvironment:
                 )
             )
 
+    def _release_engine(self):
+        """Writes pending commands and hands control of the shared memory to the engine."""
+        self._command_center.handle_buffer()
+        if self._journal is not None:
+            self._journal.record_tick(self._journal_keys())
+        self._client.release()
+
+    def _acquire_engine(self):
+        """Waits for the engine to finish a tick and takes back control of the shared memory."""
+        self._acquire_catch_crash()
+        if self._journal is not None:
+            self._journal.record_engine_done()
+        if self._client.double_buffer_sensors:
+            self._state_dict = {
+                name: agent.refresh_state_dict() for name, agent in self.agents.items()
+            }
+
+    def _check_not_awaiting_engine(self, method_name):
+        self._client.check_not_awaiting_engine(method_name)
+
     def _acquire_catch_crash(self):
         pid = self._world_process.pid if hasattr(self, "_world_process") else None
         try:
@@ -521,7 +916,7 @@ class HolodeckEnvironment:
             ) from error
 
     def _enqueue_command(self, command_to_send):
-        self._command_center.enqueue_command(command_to_send)
+        return self._command_center.enqueue_command(command_to_send)
 
     def add_agent(self, agent_def, is_main_agent=False):
         """Add an agent in the world.
@@ -537,8 +932,20 @@ class HolodeckEnvironment:
         if agent_def.name in self.agents:
             raise HolodeckException("Error. Duplicate agent name. ")
 
-        self.agents[agent_def.name] = AgentFactory.build_agent(self._client, agent_def)
-        self._state_dict[agent_def.name] = self.agents[agent_def.name].agent_state_dict
+        agent = self._agent_registry.get(agent_def.name)
+        reuse = (
+            self._reuse_agents_on_reset
+            and agent is not None
+            and self._agent_matches_definition(agent, agent_def)
+        )
+        if reuse:
+            agent.reset_buffers()
+        else:
+            agent = AgentFactory.build_agent(self._client, agent_def)
+            self._agent_registry[agent_def.name] = agent
+
+        self.agents[agent_def.name] = agent
+        self._state_dict[agent_def.name] = agent.agent_state_dict
 
         if not agent_def.existing:
             command_to_send = SpawnAgentCommand(
@@ -551,9 +958,35 @@ class HolodeckEnvironment:
             )
 
             self._client.command_center.enqueue_command(command_to_send)
-        self.agents[agent_def.name].add_sensors(agent_def.sensors)
+        if reuse:
+            agent.respawn_sensors(agent_def.sensors)
+        else:
+            agent.add_sensors(agent_def.sensors)
         if is_main_agent:
-            self._agent = self.agents[agent_def.name]
+            self._agent = agent
+
+    @staticmethod
+    def _agent_matches_definition(agent, agent_def):
+        """Whether ``agent`` has exactly the buffers that building ``agent_def`` would give it"""
+        if type(agent) is not agent_def.type:
+            return False
+
+        sensor_defs = [
+            sensor_def
+            for sensor_def in agent_def.sensors
+            if sensor_def.agent_name == agent.name
+        ]
+        if set(agent.sensors) != {sensor_def.sensor_name for sensor_def in sensor_defs}:
+            return False
+
+        for sensor_def in sensor_defs:
+            sensor = agent.sensors[sensor_def.sensor_name]
+            if (
+                type(sensor) is not sensor_def.type
+                or sensor.config != sensor_def.config
+            ):
+                return False
+        return True
 
     def get_main_agent(self):
         """Returns the main agent in the environment"""
@@ -698,12 +1131,45 @@ class HolodeckEnvironment:
             num_params (obj:`list` of :obj:`int`): List of arbitrary number parameters
             string_params (obj:`list` of :obj:`string`): List of arbitrary string parameters
         """
+        self._check_not_awaiting_engine("send_world_command")
         num_params = [] if num_params is None else num_params
         string_params = [] if string_params is None else string_params
 
         command_to_send = CustomCommand(name, num_params, string_params)
         self._enqueue_command(command_to_send)
 
+    def world_command_template(self, name, num_params=None, string_params=None):
+        """Prepares a world command that will be sent repeatedly with different numbers, see
+        :meth:`send_world_command_template`.
+
+        Serializing the command once and only filling in the numbers each time makes sending it
+        every tick much cheaper than :meth:`send_world_command`.
+
+        Args:
+            name (:obj:`str`): The name of the command, ex "OpenDoor"
+            num_params (obj:`list` of :obj:`int`): Example number parameters. Only their count
+                and whether each is an integer or a float are used.
+            string_params (obj:`list` of :obj:`string`): List of arbitrary string parameters,
+                which are the same every time the command is sent
+
+        Returns:
+            :class:`~holodeck.command.CommandTemplate`: The template
+        """
+        num_params = [] if num_params is None else num_params
+        string_params = [] if string_params is None else string_params
+
+        return CommandTemplate(CustomCommand(name, num_params, string_params))
+
+    def send_world_command_template(self, template, num_params):
+        """Send a world command prepared with :meth:`world_command_template`.
+
+        Args:
+            template (:class:`~holodeck.command.CommandTemplate`): The template
+            num_params (obj:`list` of :obj:`int`): The number parameters to send
+        """
+        self._check_not_awaiting_engine("send_world_command_template")
+        self._enqueue_command(template.fill(num_params))
+
     def __linux_start_process__(
         self, binary_path, task_key, gl_version, verbose, show_viewport=True
     ):
@@ -803,23 +1269,173 @@ class HolodeckEnvironment:
         # TODO: Suppress exceptions?
         self.__on_exit__()
 
-    def _get_single_state(self):
+    def set_observation_filter(self, observation_filter):
+        """Restricts the sensors returned in the state, and copied with ``copy_state``, to the
+        ones a policy uses. Sensors left out are still updated by the engine, and the reward and
+        terminal are still read from the task sensor.
 
-        if self._agent is not None:
-            return (
-                self._create_copy(self._state_dict[self._agent.name])
-                if self._copy_state
-                else self._state_dict[self._agent.name]
-            )
+        The filter can also be given in the scenario, as ``"observation_filter"``.
 
-        return self._get_full_state()
+        Args:
+            observation_filter (:obj:`dict`): Dictionary from agent name to the list of names
+                of its sensors to return, such as
+                ``{"uav0": ["IMUSensor", "LocationSensor"]}``. Agents that aren't in the
+                dictionary are returned with all of their sensors. ``None`` returns every
+                sensor again.
+
+        Raises:
+            HolodeckException: If an agent doesn't have one of the sensors
+        """
+        if observation_filter is not None:
+            observation_filter = {
+                agent: list(sensors) for agent, sensors in observation_filter.items()
+            }
+            for agent_name, sensors in observation_filter.items():
+                if agent_name not in self.agents:
+                    continue
+                missing = set(sensors) - set(self.agents[agent_name].sensors)
+                if missing:
+                    raise HolodeckException(
+                        "Agent {} doesn't have the sensors {}".format(
+                            agent_name, sorted(missing)
+                        )
+                    )
+        self._observation_filter = observation_filter
+        self._columnar_plan = None
+
+    def _observed_agent_state(self, agent_name):
+        """The state of an agent, restricted to the sensors of the observation filter"""
+        agent_state = self._state_dict[agent_name]
+        if (
+            self._observation_filter is None
+            or agent_name not in self._observation_filter
+        ):
+            return agent_state
+        return {
+            sensor: agent_state[sensor]
+            for sensor in self._observation_filter[agent_name]
+            if sensor in agent_state
+        }
+
+    def _observed_state(self):
+        """The state of every agent, restricted to the sensors of the observation filter"""
+        if self._observation_filter is None:
+            return self._state_dict
+        return {name: self._observed_agent_state(name) for name in self._state_dict}
+
+    def allocate_state(self):
+        """Allocates a state with the sensors that :meth:`step` and :meth:`tick` return, to pass
+        to them as ``out``.
 
-    def _get_full_state(self):
-        return (
-            self._create_copy(self._state_dict)
-            if self._copy_state
-            else self._state_dict
-        )
+        Returns:
+            :obj:`dict`: The state
+        """
+        if self._default_state_fn == self._get_single_state and self._agent is not None:
+            return self._create_copy(self._observed_agent_state(self._agent.name))
+        if self._default_state_fn == self._get_columnar_state:
+            return self._get_columnar_plan().allocate()
+        return self._create_copy(self._observed_state())
+
+    def _select_state_fn(self):
+        if self.num_agents == 1:
+            return self._get_single_state
+        if self._columnar_state:
+            return self._get_columnar_state
+        return self._get_full_state
+
+    @property
+    def columnar_rows(self):
+        """The agents of the rows of each array of the columnar state, see ``columnar_state``.
+
+        Returns:
+            :obj:`dict`: Dictionary from sensor name to the names of the agents of its rows, in
+            order
+        """
+        return self._get_columnar_plan().rows
+
+    def _get_columnar_plan(self):
+        plan = self._columnar_plan
+        if plan is None or not plan.is_current(self.agents):
+            sensor_names = dict()
+            for agent_name, agent in self.agents.items():
+                names = list(agent.sensors)
+                if (
+                    self._observation_filter is not None
+                    and agent_name in self._observation_filter
+                ):
+                    names = [
+                        name
+                        for name in self._observation_filter[agent_name]
+                        if name in agent.sensors
+                    ]
+                sensor_names[agent_name] = names
+            plan = ColumnarPlan(
+                self.agents, sensor_names, max(8, len(self._state_pool) + 1)
+            )
+            self._columnar_plan = plan
+        return plan
+
+    def _get_columnar_state(self, out=None):
+        plan = self._get_columnar_plan()
+        if out is not None or not self._copy_state:
+            return plan.gather(out)
+        if not self._state_pool:
+            # Copying the gathered arrays is cheaper than working out the gather into new ones
+            return self._create_copy(plan.gather())
+
+        index = self._state_pool_index
+        self._state_pool_index = (index + 1) % len(self._state_pool)
+        pooled = self._state_pool[index]
+        if pooled is not None:
+            try:
+                return plan.gather(pooled)
+            except HolodeckException:
+                pass  # The agents or sensors changed since it was allocated
+        self._state_pool[index] = plan.gather(plan.allocate())
+        return self._state_pool[index]
+
+    def _get_single_state(self, out=None):
+
+        if self._agent is not None:
+            return self._copy_out(self._observed_agent_state(self._agent.name), out)
+
+        return self._get_full_state(out)
+
+    def _get_full_state(self, out=None):
+        return self._copy_out(self._observed_state(), out)
+
+    def _copy_out(self, state, out):
+        """Returns the state as configured: copied into ``out``, copied into the next state of
+        the pool, copied into a new state, or as is"""
+        if out is not None:
+            return self._copy_into(state, out)
+        if not self._copy_state:
+            return state
+        if not self._state_pool:
+            return self._create_copy(state)
+
+        index = self._state_pool_index
+        self._state_pool_index = (index + 1) % len(self._state_pool)
+        pooled = self._state_pool[index]
+        if pooled is not None:
+            try:
+                return self._copy_into(state, pooled)
+            except (HolodeckException, ValueError):
+                pass  # The agents or sensors changed since it was allocated
+        self._state_pool[index] = self._create_copy(state)
+        return self._state_pool[index]
+
+    def _copy_into(self, state, out):
+        if out.keys() != state.keys():
+            raise HolodeckException(
+                "Expected a state with {}, got {}".format(sorted(state), sorted(out))
+            )
+        for key, value in state.items():
+            if isinstance(value, dict):
+                self._copy_into(value, out[key])
+            else:
+                np.copyto(out[key], value)
+        return out
 
     def _get_reward_terminal(self):
         reward = None
@@ -831,6 +1447,15 @@ class HolodeckEnvironment:
                     terminal = self._state_dict[self._agent.name][sensor][1] == 1
         return reward, terminal
 
+    def _get_info(self):
+        last_update_ticks = dict()
+        if self._agent is not None:
+            last_update_ticks = {
+                name: sensor.last_update_tick
+                for name, sensor in self._agent.sensors.items()
+            }
+        return {"tick": self.engine_tick, "last_update_ticks": last_update_ticks}
+
     def _create_copy(self, obj):
         if isinstance(obj, dict):  # Deep copy dictionary
             copy = dict()
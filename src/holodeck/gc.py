@@ -0,0 +1,198 @@
+"""Garbage collector for shared memory and semaphores left behind by Holodeck.
+
+If a process using Holodeck is killed before it can clean up (for example with ``SIGKILL``),
+its ``HOLODECK_MEM*`` shared memory and ``HOLODECK_SEMAPHORE_*`` / ``HOLODECK_LOADING_SEM*``
+semaphores stay in ``/dev/shm`` until the machine reboots. This module finds the ones whose
+owning processes are gone and removes them.
+
+Resources are grouped by the UUID of the environment that created them. A group is in use if
+a process listed in its owner record (see :func:`~holodeck.shmem.write_owner_record`) is
+still alive, or if any process still has one of its files mapped.
+
+Run it from the command line with ``holodeck-gc`` (or ``python -m holodeck.gc``), pass
+``--dry-run`` to only report what would be removed.
+"""
+import argparse
+import collections
+import os
+import time
+
+from holodeck.shmem import SHM_DIR, OWNER_KEY
+from holodeck.util import check_process_alive, human_readable_size
+
+OrphanedResource = collections.namedtuple("OrphanedResource", ["path", "uuid", "size"])
+OrphanedResource.__doc__ = """A shared memory file or semaphore left behind by Holodeck.
+
+Attributes:
+    path (:obj:`str`): Path of the file
+    uuid (:obj:`str`): UUID of the environment that created it
+    size (:obj:`int`): Bytes of memory the file occupies
+"""
+
+_MEMORY_PREFIX = "HOLODECK_MEM"
+_SEMAPHORE_PREFIXES = [
+    "sem.HOLODECK_SEMAPHORE_SERVER",
+    "sem.HOLODECK_SEMAPHORE_CLIENT",
+    "sem.HOLODECK_LOADING_SEM",
+]
+
+
+def _get_uuid(file_name):
+    """Gets the UUID a Holodeck file belongs to, or None if it isn't a Holodeck file"""
+    if file_name.startswith(_MEMORY_PREFIX):
+        # HOLODECK_MEM<uuid>_<key>, UUIDs don't contain underscores
+        return file_name[len(_MEMORY_PREFIX) :].split("_", 1)[0]
+    for prefix in _SEMAPHORE_PREFIXES:
+        if file_name.startswith(prefix):
+            return file_name[len(prefix) :]
+    return None
+
+
+def _owner_pids(shm_dir, uuid):
+    path = os.path.join(shm_dir, _MEMORY_PREFIX + uuid + "_" + OWNER_KEY)
+    try:
+        with open(path) as f:
+            return [int(pid) for pid in f.read().split()]
+    except (OSError, ValueError):
+        return []
+
+
+def _mapped_paths():
+    """Gets the paths of every file mapped by a process we are allowed to inspect"""
+    paths = set()
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(os.path.join("/proc", pid, "maps")) as f:
+                for line in f:
+                    fields = line.split(None, 5)
+                    if len(fields) == 6:
+                        paths.add(fields[5].rstrip("\n").replace(" (deleted)", ""))
+        except OSError:
+            continue  # The process exited, or belongs to another user
+    return paths
+
+
+def find_orphans(shm_dir=SHM_DIR, min_age=60):
+    """Finds Holodeck shared memory and semaphores whose owning processes are gone.
+
+    Only files owned by the current user are considered, since the processes of other users
+    can't be inspected.
+
+    Args:
+        shm_dir (:obj:`str`, optional): Directory to search. Defaults to ``/dev/shm``.
+        min_age (:obj:`float`, optional): Files modified less than this many seconds ago are
+            left alone, so that environments that are still starting up aren't collected.
+            Defaults to 60.
+
+    Returns:
+        :obj:`list` of :class:`OrphanedResource`: The orphaned resources
+    """
+    if os.name != "posix" or not os.path.isdir(shm_dir):
+        # Named shared memory on Windows is freed along with the last process using it
+        return []
+
+    groups = collections.defaultdict(list)
+    now = time.time()
+    for file_name in os.listdir(shm_dir):
+        uuid = _get_uuid(file_name)
+        if uuid is None:
+            continue
+        path = os.path.join(shm_dir, file_name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        if stat.st_uid != os.getuid() or now - stat.st_mtime < min_age:
+            # Any file of the group being off limits keeps the whole group
+            groups[uuid].append(None)
+            continue
+        groups[uuid].append(OrphanedResource(path, uuid, stat.st_blocks * 512))
+
+    mapped = None
+    orphans = []
+    for uuid, resources in groups.items():
+        if None in resources:
+            continue
+        if any(check_process_alive(pid) for pid in _owner_pids(shm_dir, uuid)):
+            continue
+        if mapped is None:
+            mapped = _mapped_paths()
+        if any(resource.path in mapped for resource in resources):
+            continue
+        orphans.extend(resources)
+
+    return orphans
+
+
+def collect(dry_run=False, shm_dir=SHM_DIR, min_age=60):
+    """Removes Holodeck shared memory and semaphores whose owning processes are gone.
+
+    Args:
+        dry_run (:obj:`bool`, optional): Only find the orphaned resources, don't remove them.
+            Defaults to False.
+        shm_dir (:obj:`str`, optional): Directory to search. Defaults to ``/dev/shm``.
+        min_age (:obj:`float`, optional): See :func:`find_orphans`. Defaults to 60.
+
+    Returns:
+        :obj:`list` of :class:`OrphanedResource`: The resources that were (or would have
+        been) removed
+    """
+    orphans = find_orphans(shm_dir, min_age)
+    if dry_run:
+        return orphans
+
+    removed = []
+    for orphan in orphans:
+        try:
+            os.remove(orphan.path)
+        except FileNotFoundError:
+            continue  # Somebody else cleaned it up
+        removed.append(orphan)
+    return removed
+
+
+def main(argv=None):
+    """Command line entry point, see ``holodeck-gc --help``"""
+    parser = argparse.ArgumentParser(
+        prog="holodeck-gc",
+        description="Remove shared memory and semaphores left behind by Holodeck "
+        "processes that were killed",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="only report what would be removed",
+    )
+    parser.add_argument(
+        "--min-age",
+        type=float,
+        default=60,
+        help="ignore files modified less than this many seconds ago (default: 60)",
+    )
+    parser.add_argument(
+        "--shm-dir",
+        default=SHM_DIR,
+        help="directory to search (default: {})".format(SHM_DIR),
+    )
+    args = parser.parse_args(argv)
+
+    orphans = collect(args.dry_run, args.shm_dir, args.min_age)
+    verb = "Would remove" if args.dry_run else "Removed"
+    for orphan in orphans:
+        print("{} {} ({})".format(verb, orphan.path, human_readable_size(orphan.size)))
+
+    total = sum(orphan.size for orphan in orphans)
+    print(
+        "{} {} files from {} environments, {}".format(
+            verb,
+            len(orphans),
+            len({orphan.uuid for orphan in orphans}),
+            human_readable_size(total),
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -32,6 +32,14 @@ def make(
     show_viewport=True,
     ticks_per_sec=30,
     copy_state=True,
+    arena_size=None,
+    spin_wait_us=0,
+    double_buffer_sensors=False,
+    reuse_agents_on_reset=True,
+    memory_backing=None,
+    binary_commands=True,
+    state_pool_size=0,
+    columnar_state=False,
 ):
     """Creates a Holodeck environment
 
@@ -63,6 +71,38 @@ def make(
         copy_state (:obj:`bool`, optional):
             If the state should be copied or passed as a reference when returned. Defaults to True
 
+        arena_size (:obj:`int`, optional):
+            If given, all shared memory is sub-allocated from a single region of this many bytes
+            instead of one block per buffer. Defaults to None.
+
+        spin_wait_us (:obj:`int`, optional):
+            Microseconds to spin waiting for each tick before blocking on the semaphore.
+            Defaults to 0 (always block).
+
+        double_buffer_sensors (:obj:`bool`, optional):
+            If sensor data should be double buffered, so that the state of a tick stays intact
+            while the next tick is written. Defaults to False.
+
+        reuse_agents_on_reset (:obj:`bool`, optional):
+            If agents and sensors should be kept across resets instead of being built again.
+            Defaults to True.
+
+        memory_backing (:class:`~holodeck.shmem.MemoryBacking`, optional):
+            How to back large buffers, such as with huge pages or pre-faulted memory.
+            Defaults to None (plain mappings).
+
+        binary_commands (:obj:`bool`, optional):
+            If commands should be sent in the binary format when the engine supports it.
+            Defaults to True.
+
+        state_pool_size (:obj:`int`, optional):
+            Number of preallocated states to recycle copies of the state into, instead of
+            allocating new arrays every tick. Defaults to 0.
+
+        columnar_state (:obj:`bool`, optional):
+            In multi-agent environments, return each sensor as one array across agents instead
+            of a dictionary per agent (see :mod:`holodeck.columnar`). Defaults to False.
+
     Returns:
         :class:`~holodeck.environments.HolodeckEnvironment`: A holodeck environment instantiated
             with all the settings necessary for the specified world, and other supplied arguments.
@@ -99,6 +139,14 @@ def make(
     param_dict["show_viewport"] = show_viewport
     param_dict["copy_state"] = copy_state
     param_dict["ticks_per_sec"] = ticks_per_sec
+    param_dict["arena_size"] = arena_size
+    param_dict["spin_wait_us"] = spin_wait_us
+    param_dict["double_buffer_sensors"] = double_buffer_sensors
+    param_dict["reuse_agents_on_reset"] = reuse_agents_on_reset
+    param_dict["memory_backing"] = memory_backing
+    param_dict["binary_commands"] = binary_commands
+    param_dict["state_pool_size"] = state_pool_size
+    param_dict["columnar_state"] = columnar_state
 
     if window_res is not None:
         param_dict["window_size"] = window_res
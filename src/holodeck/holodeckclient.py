@@ -1,8 +1,15 @@
 """The client used for subscribing shared memory between python and c++."""
 import os
+import time
+import weakref
 
 from holodeck.exceptions import HolodeckException
-from holodeck.shmem import Shmem
+from holodeck.shmem import (
+    Shmem,
+    ShmemArena,
+    write_owner_record,
+    remove_owner_record,
+)
 
 
 class HolodeckClient:
@@ -13,9 +20,42 @@ class HolodeckClient:
             The same UUID should be passed to the world through a command line flag. Defaults to "".
         should_timeout (:obj:`boolean`, optional): If the client should time out after 5s waiting
         for the engine
+        arena_size (:obj:`int`, optional): If given, all shared memory is sub-allocated from a
+            single :class:`~holodeck.shmem.ShmemArena` of this many bytes instead of creating a
+            separate block for every buffer. Defaults to None.
+        spin_wait_us (:obj:`int`, optional): Number of microseconds :meth:`acquire` polls the
+            semaphore before falling back to a blocking wait. Spinning avoids a kernel sleep and
+            wake up when the engine finishes a tick quickly, at the cost of a busy CPU core.
+            Defaults to 0 (always block).
+        double_buffer_sensors (:obj:`bool`, optional): If sensors should allocate two slots for
+            their data, so that the engine can write one while the other is being read. See
+            :class:`~holodeck.sensors.HolodeckSensor`. Defaults to False.
+        memory_backing (:class:`~holodeck.shmem.MemoryBacking`, optional): How to back large
+            buffers, such as with huge pages or pre-faulted memory. Defaults to None (plain
+            mappings).
+
+    Attributes:
+        sequence (:obj:`int`): Number of times control has been released to the engine. Used
+            to tell when a :class:`~holodeck.shmem.SharedView` has gone stale.
+        tick_header (:class:`~holodeck.shmem.TickHeader`): The engine's tick counter and the
+            stamps of the sensors, set up by the environment.
+        awaiting_engine (:obj:`bool`): If the engine owns the shared memory until the
+            environment waits for the tick it started, see
+            :meth:`~holodeck.environments.HolodeckEnvironment.step_async`.
     """
 
-    def __init__(self, uuid="", should_timeout=False):
+    # Every client that hasn't been unlinked yet, for process wide memory accounting
+    _live_clients = weakref.WeakSet()
+
+    def __init__(
+        self,
+        uuid="",
+        should_timeout=False,
+        arena_size=None,
+        spin_wait_us=0,
+        double_buffer_sensors=False,
+        memory_backing=None,
+    ):
         self._uuid = uuid
 
         # Important functions
@@ -25,13 +65,26 @@ class HolodeckClient:
         self._semaphore2 = None
         self.unlink = None
         self.command_center = None
+        self.tick_header = None
+        self.awaiting_engine = False
         self.should_timeout = should_timeout
+        self.spin_wait_us = spin_wait_us
+        self.double_buffer_sensors = double_buffer_sensors
+        self.memory_backing = memory_backing
+        self.sequence = 0
 
         self._memory = dict()
         self._sensors = dict()  # never used
         self._agents = dict()
         self._settings = dict()
 
+        self._owner_pids = [os.getpid()]
+        write_owner_record(self._uuid, self._owner_pids)
+
+        self._arena = None
+        if arena_size is not None:
+            self._arena = ShmemArena(arena_size, self._uuid)
+
         if os.name == "nt":
             self.__windows_init__()
         elif os.name == "posix":
@@ -39,6 +92,8 @@ class HolodeckClient:
         else:
             raise HolodeckException("Currently unsupported os: " + os.name)
 
+        HolodeckClient._live_clients.add(self)
+
     def __windows_init__(self):
         import win32event
 
@@ -63,13 +118,24 @@ class HolodeckClient:
             if result != win32event.WAIT_OBJECT_0:
                 raise TimeoutError("Timed out or error waiting for engine!")
 
+        def windows_spin_acquire_semaphore(sem):
+            deadline = time.perf_counter() + self.spin_wait_us / 1000000
+            while time.perf_counter() < deadline:
+                if win32event.WaitForSingleObject(sem, 0) == win32event.WAIT_OBJECT_0:
+                    return
+            windows_acquire_semaphore(sem)
+
         def windows_release_semaphore(sem):
             win32event.ReleaseSemaphore(sem, 1)
 
         def windows_unlink():
-            pass
+            HolodeckClient._live_clients.discard(self)
 
-        self._get_semaphore_fn = windows_acquire_semaphore
+        self._get_semaphore_fn = (
+            windows_spin_acquire_semaphore
+            if self.spin_wait_us > 0
+            else windows_acquire_semaphore
+        )
         self._release_semaphore_fn = windows_release_semaphore
         self.unlink = windows_unlink
 
@@ -94,6 +160,21 @@ class HolodeckClient:
                 # Raise a TimeoutError for consistency with Windows implementation
                 raise TimeoutError("Timed out or error waiting for engine!") from error
 
+        def posix_spin_acquire_semaphore(sem):
+            deadline = time.perf_counter() + self.spin_wait_us / 1000000
+            while time.perf_counter() < deadline:
+                # Reading the value doesn't enter the kernel, so poll it and only try to take
+                # the semaphore once it has been released. OSX can't read the value, so there
+                # we have to poll with a non-blocking acquire.
+                if posix_ipc.SEMAPHORE_VALUE_SUPPORTED and sem.value == 0:
+                    continue
+                try:
+                    sem.acquire(0)
+                    return
+                except posix_ipc.BusyError:
+                    pass
+            posix_acquire_semaphore(sem)
+
         def posix_release_semaphore(sem):
             sem.release()
 
@@ -105,8 +186,17 @@ class HolodeckClient:
             for key in list(self._memory.keys()):
                 self._memory[key].unlink()
                 del self._memory[key]
+            if self._arena is not None:
+                self._arena.unlink()
+                self._arena = None
+            remove_owner_record(self._uuid)
+            HolodeckClient._live_clients.discard(self)
 
-        self._get_semaphore_fn = posix_acquire_semaphore
+        self._get_semaphore_fn = (
+            posix_spin_acquire_semaphore
+            if self.spin_wait_us > 0
+            else posix_acquire_semaphore
+        )
         self._release_semaphore_fn = posix_release_semaphore
         self.unlink = posix_unlink
 
@@ -114,10 +204,36 @@ class HolodeckClient:
         """Used to acquire control. Will wait until the HolodeckServer has finished its work."""
         self._get_semaphore_fn(self._semaphore2)
 
+    def check_not_awaiting_engine(self, method_name):
+        """Refuses to write the shared memory while the engine owns it.
+
+        Args:
+            method_name (:obj:`str`): Name of the method that would write it, for the error
+
+        Raises:
+            HolodeckException: If the engine is ticking
+        """
+        if self.awaiting_engine:
+            raise HolodeckException(
+                "Cannot call .{}() while the engine is ticking. "
+                "Call .step_wait() first".format(method_name)
+            )
+
     def release(self):
         """Used to release control. Will allow the HolodeckServer to take a step."""
+        self.sequence += 1
         self._release_semaphore_fn(self._semaphore1)
 
+    def add_owner_pid(self, pid):
+        """Records another process (such as the engine) as an owner of this client's shared
+        memory, see :mod:`holodeck.gc`.
+
+        Args:
+            pid (:obj:`int`): Process id of the owner
+        """
+        self._owner_pids.append(pid)
+        write_owner_record(self._uuid, self._owner_pids)
+
     def malloc(self, key, shape, dtype):
         """Allocates a block of shared memory, and returns a numpy array whose data corresponds
         with that block.
@@ -135,6 +251,52 @@ class HolodeckClient:
             or self._memory[key].shape != shape
             or self._memory[key].dtype != dtype
         ):
-            self._memory[key] = Shmem(key, shape, dtype, self._uuid)
+            if self._arena is not None:
+                self._memory[key] = self._arena.allocate(
+                    key, shape, dtype, self.memory_backing
+                )
+            else:
+                self._memory[key] = Shmem(
+                    key, shape, dtype, self._uuid, self.memory_backing
+                )
 
         return self._memory[key].np_array
+
+    @property
+    def mapped_bytes(self):
+        """
+        Returns:
+            :obj:`int`: Number of bytes of shared memory this client has mapped. In arena mode
+            this is the size of the arena, most of which may not be backed by memory yet.
+        """
+        if self._arena is not None:
+            return self._arena.size
+        return sum(mem.size_bytes for mem in self._memory.values())
+
+    def memory_report(self):
+        """Reports the shared memory allocated by this client.
+
+        Returns:
+            :obj:`dict`: A dictionary with the keys
+
+            - ``buffers``: Dictionary from buffer key to its size in bytes
+            - ``total``: Total size of all buffers in bytes
+            - ``mapped``: See :attr:`mapped_bytes`
+            - ``process_total``: See :meth:`process_mapped_bytes`
+        """
+        buffers = {key: mem.size_bytes for key, mem in self._memory.items()}
+        return {
+            "buffers": buffers,
+            "total": sum(buffers.values()),
+            "mapped": self.mapped_bytes,
+            "process_total": HolodeckClient.process_mapped_bytes(),
+        }
+
+    @staticmethod
+    def process_mapped_bytes():
+        """
+        Returns:
+            :obj:`int`: Number of bytes of shared memory mapped by every live client in this
+            process.
+        """
+        return sum(client.mapped_bytes for client in list(HolodeckClient._live_clients))
@@ -0,0 +1,286 @@
+"""Journal of everything the client hands to the engine, to replay an episode exactly.
+
+While journaling, every tick records the agent buffers the engine reads (actions, teleports and
+control schemes), the reset flag, and the command batch written to the command buffer. Replaying
+the journal against a fresh environment writes the same bytes to the same buffers on the same
+ticks, so a deterministic engine goes through the same episode. Since replay only copies bytes
+and doesn't go through the agents or the command queue, it runs about as fast as the engine
+ticks.
+
+Start a journal with :meth:`~holodeck.environments.HolodeckEnvironment.start_journal`, and
+replay it with :func:`replay`.
+
+The journal file starts with a ``"<4sH"`` header holding the magic ``b"HJRN"`` and the format
+version, followed by records that each start with a one byte type:
+
+- ``b"D"``: Defines a buffer, ``"<HH"`` (id, length of key), the key, ``"<B"`` (length of
+  dtype), the numpy dtype string, ``"<B"`` (number of dimensions) and a ``"<I"`` per dimension.
+- ``b"W"``: The contents of a buffer changed, ``"<HI"`` (id, length) followed by the bytes.
+- ``b"C"``: A command batch was written, ``"<I"`` (length) followed by the bytes, in whichever
+  format the engine was sent (see :mod:`holodeck.command`).
+- ``b"T"``: The end of a tick, the engine was handed the buffers as written so far.
+
+Buffers are only written when their contents differ from what the engine left in them at the
+end of the previous tick.
+"""
+import collections
+import queue
+import struct
+import threading
+
+import numpy as np
+
+from holodeck.exceptions import HolodeckException
+
+JOURNAL_MAGIC = b"HJRN"
+JOURNAL_VERSION = 1
+
+_header = struct.Struct("<4sH")
+_define = struct.Struct("<HH")
+_write = struct.Struct("<HI")
+_commands = struct.Struct("<I")
+
+# Bytes of records gathered before they are handed to the writer thread
+_CHUNK_SIZE = 1 << 16
+
+Journal = collections.namedtuple("Journal", ["buffers", "ticks"])
+Journal.__doc__ = """A journal read with :func:`read_journal`.
+
+Attributes:
+    buffers (:obj:`dict`): Dictionary from buffer key to its ``(dtype, shape)``
+    ticks (:obj:`list`): For every tick, a tuple of the writes, a list of ``(key, bytes)``, and
+        the command batch as :obj:`bytes`, or ``None`` if no commands were sent that tick
+"""
+
+
+def _byte_view(array):
+    return memoryview(array.reshape(-1).view(np.uint8))
+
+
+class JournalWriter:
+    """Writes a journal file from a background thread, so that journaling costs the ticking
+    thread only a copy of what changed.
+
+    Args:
+        path (:obj:`str`): Path of the journal file, which is overwritten.
+        client (:class:`~holodeck.holodeckclient.HolodeckClient`): Client whose buffers are
+            journaled.
+
+    """
+
+    def __init__(self, path, client):
+        self.path = path
+        self.ticks = 0
+        self._client = client
+        # Key -> [id, array, byte view, contents as of the previous tick]
+        self._buffers = dict()
+        self._chunk = bytearray(_header.pack(JOURNAL_MAGIC, JOURNAL_VERSION))
+        self._queue = queue.Queue()
+        self._error = None
+        self._file = open(path, "wb")
+        self._thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._thread.start()
+
+    def record_commands(self, to_write):
+        """Records a command batch written to the command buffer this tick.
+
+        Args:
+            to_write (:obj:`bytes`): The batch, as written to the command buffer
+        """
+        self._chunk += b"C"
+        self._chunk += _commands.pack(len(to_write))
+        self._chunk += to_write
+
+    def record_tick(self, keys):
+        """Records the buffers the engine is about to be handed, and ends the tick.
+
+        Args:
+            keys (:obj:`list` of :obj:`str`): Keys of the buffers to journal
+        """
+        for key in keys:
+            array = self._client._memory[key].np_array
+            buffer = self._buffers.get(key)
+            if buffer is None or buffer[1] is not array:
+                buffer = self._define(key, array)
+            contents = buffer[2].tobytes()
+            if contents != buffer[3]:
+                buffer[3] = contents
+                self._chunk += b"W"
+                self._chunk += _write.pack(buffer[0], len(contents))
+                self._chunk += contents
+
+        self._chunk += b"T"
+        self.ticks += 1
+        if len(self._chunk) >= _CHUNK_SIZE:
+            self._hand_off()
+
+    def record_engine_done(self):
+        """Takes the contents of the journaled buffers as the engine left them at the end of a
+        tick. The engine clears one-shot buffers, such as the reset and teleport flags, once it
+        has used them, so setting the same flag on the next tick is a change to journal.
+        """
+        for buffer in self._buffers.values():
+            buffer[3] = buffer[2].tobytes()
+
+    def _define(self, key, array):
+        buffer_id = len(self._buffers)
+        if key in self._buffers:
+            # The buffer was allocated again, keep its id
+            buffer_id = self._buffers[key][0]
+        encoded_key = key.encode()
+        dtype = array.dtype.str.encode()
+        self._chunk += b"D"
+        self._chunk += _define.pack(buffer_id, len(encoded_key))
+        self._chunk += encoded_key
+        self._chunk += struct.pack("<B", len(dtype)) + dtype
+        self._chunk += struct.pack("<B{}I".format(array.ndim), array.ndim, *array.shape)
+        buffer = [buffer_id, array, _byte_view(array), None]
+        self._buffers[key] = buffer
+        return buffer
+
+    def _hand_off(self):
+        self._queue.put(bytes(self._chunk))
+        self._chunk.clear()
+
+    def _write_loop(self):
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                return
+            try:
+                self._file.write(chunk)
+            except OSError as error:
+                self._error = error
+
+    def close(self):
+        """Writes out the remaining records and closes the file.
+
+        Raises:
+            HolodeckException: If the journal could not be written
+        """
+        if self._file.closed:
+            return
+        self._hand_off()
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
+        if self._error is not None:
+            raise HolodeckException(
+                "Could not write journal {}: {}".format(self.path, self._error)
+            )
+
+
+def read_journal(path):
+    """Reads a journal file.
+
+    Args:
+        path (:obj:`str`): Path of the journal file
+
+    Returns:
+        :class:`Journal`: The journal
+
+    Raises:
+        HolodeckException: If the file isn't a journal, or is of an unknown version
+    """
+    with open(path, "rb") as journal_file:
+        data = journal_file.read()
+
+    if len(data) < _header.size:
+        raise HolodeckException("{} is not a Holodeck journal".format(path))
+    magic, version = _header.unpack_from(data)
+    if magic != JOURNAL_MAGIC:
+        raise HolodeckException("{} is not a Holodeck journal".format(path))
+    if version != JOURNAL_VERSION:
+        raise HolodeckException(
+            "Journal version {} is not supported, expected {}".format(
+                version, JOURNAL_VERSION
+            )
+        )
+
+    buffers = dict()
+    keys = dict()
+    ticks = []
+    writes = []
+    commands = None
+    offset = _header.size
+    while offset < len(data):
+        record_type = data[offset : offset + 1]
+        offset += 1
+        if record_type == b"T":
+            ticks.append((writes, commands))
+            writes = []
+            commands = None
+        elif record_type == b"W":
+            buffer_id, length = _write.unpack_from(data, offset)
+            offset += _write.size
+            writes.append((keys[buffer_id], data[offset : offset + length]))
+            offset += length
+        elif record_type == b"C":
+            (length,) = _commands.unpack_from(data, offset)
+            offset += _commands.size
+            commands = data[offset : offset + length]
+            offset += length
+        elif record_type == b"D":
+            buffer_id, key_length = _define.unpack_from(data, offset)
+            offset += _define.size
+            key = data[offset : offset + key_length].decode()
+            offset += key_length
+            dtype_length = data[offset]
+            dtype = np.dtype(data[offset + 1 : offset + 1 + dtype_length].decode())
+            offset += 1 + dtype_length
+            ndim = data[offset]
+            shape = list(struct.unpack_from("<{}I".format(ndim), data, offset + 1))
+            offset += 1 + 4 * ndim
+            keys[buffer_id] = key
+            buffers[key] = (dtype, shape)
+        else:
+            raise HolodeckException(
+                "Corrupt journal {}: unknown record at byte {}".format(path, offset - 1)
+            )
+
+    return Journal(buffers, ticks)
+
+
+def replay(env, journal):
+    """Replays a journal against an environment, tick by tick.
+
+    The environment should be freshly made from the same scenario as the journaled one, since
+    the journal starts from the state the journaled environment was in when journaling started.
+    Replay writes the journaled bytes straight into the shared memory, so the agents and
+    command queue of ``env`` don't see the replayed actions and commands.
+
+    Args:
+        env (:class:`~holodeck.environments.HolodeckEnvironment`): Environment to replay in
+        journal (:class:`Journal` or :obj:`str`): The journal, or the path of a journal file
+
+    Returns:
+        :obj:`int`: The number of ticks replayed
+    """
+    if isinstance(journal, str):
+        journal = read_journal(journal)
+    env._check_not_awaiting_engine("replay")
+
+    client = env._client
+    command_center = env._command_center
+    views = {
+        key: _byte_view(client.malloc(key, shape, dtype))
+        for key, (dtype, shape) in journal.buffers.items()
+    }
+    # Resolve every write beforehand, so that each tick only copies bytes
+    ticks = [
+        ([(views[key], contents) for key, contents in writes], commands)
+        for writes, commands in journal.ticks
+    ]
+
+    for index, (writes, commands) in enumerate(ticks):
+        for view, contents in writes:
+            view[:] = contents
+        if commands is not None:
+            command_center._copy_to_command_buffer(commands)
+        client.release()
+        if index + 1 < len(ticks):
+            env._acquire_catch_crash()
+        else:
+            env._acquire_engine()
+
+    return len(ticks)
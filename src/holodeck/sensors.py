@@ -6,11 +6,20 @@ import holodeck
 
 from holodeck.command import RGBCameraRateCommand, RotateSensorCommand, CustomCommand
 from holodeck.exceptions import HolodeckConfigurationException
+from holodeck.shmem import SharedView
 
 
 class HolodeckSensor:
     """Base class for a sensor
 
+    If the client was created with ``double_buffer_sensors``, the sensor allocates two slots
+    for its data plus a one byte index of the slot that holds the latest data. The engine
+    writes each tick into the other slot and then flips the index, so a view of the data from
+    one tick stays intact while the next tick is being written.
+
+    Every sensor also has a ``uint64`` stamp that the engine sets to its tick counter whenever
+    it writes the sensor data, see :attr:`last_update_tick`.
+
     Args:
         client (:class:`~holodeck.holodeckclient.HolodeckClient`): Client
             attached to a sensor
@@ -36,9 +45,25 @@ class HolodeckSensor:
         self.agent_type = agent_type
         self._buffer_name = self.agent_name + "_" + self.name
 
-        self._sensor_data_buffer = self._client.malloc(
-            self._buffer_name + "_sensor_data", self.data_shape, self.dtype
-        )
+        self._sensor_slot_index = None
+        # Keys of the shared memory owned by this sensor
+        self.memory_keys = [self._buffer_name + "_sensor_data"]
+        # Slot of the stamp of this sensor in the client's tick header
+        self._tick_slot = self._client.tick_header.assign(self._buffer_name)
+        if self._client.double_buffer_sensors:
+            self._sensor_data_buffer = self._client.malloc(
+                self._buffer_name + "_sensor_data",
+                [2] + list(self.data_shape),
+                self.dtype,
+            )
+            self._sensor_slot_index = self._client.malloc(
+                self._buffer_name + "_sensor_slot", [1], np.uint8
+            )
+            self.memory_keys.append(self._buffer_name + "_sensor_slot")
+        else:
+            self._sensor_data_buffer = self._client.malloc(
+                self._buffer_name + "_sensor_data", self.data_shape, self.dtype
+            )
 
         self.config = {} if config is None else config
 
@@ -46,6 +71,8 @@ class HolodeckSensor:
         """Cleans up the resources by deleting the sensor data buffer it exists."""
         if hasattr(self, "_sensor_data_buffer"):
             del self._sensor_data_buffer
+        if hasattr(self, "_sensor_slot_index"):
+            del self._sensor_slot_index
 
     @property
     def sensor_data(self):
@@ -55,8 +82,43 @@ class HolodeckSensor:
             :obj:`np.ndarray` of size :obj:`self.data_shape`: Current sensor data
 
         """
+        if self._sensor_slot_index is not None:
+            return self._sensor_data_buffer[self._sensor_slot_index[0] & 1]
         return self._sensor_data_buffer
 
+    @property
+    def last_update_tick(self):
+        """The engine tick on which the sensor data was last written.
+
+        Compare it to :attr:`~holodeck.environments.HolodeckEnvironment.engine_tick` to tell
+        if the data changed on the latest tick, for example to skip processing a camera frame
+        that wasn't captured this tick. Always 0 with an engine that doesn't stamp sensors.
+
+        Returns:
+            :obj:`int`: The tick number
+        """
+        return int(self._client.tick_header.ticks[self._tick_slot])
+
+    def view(self):
+        """Gets a zero-copy, read-only view of the current sensor data that can be handed to
+        other libraries through DLPack or the buffer protocol.
+
+        Returns:
+            :class:`~holodeck.shmem.SharedView`: The view, which reports when the engine may
+            have overwritten the data
+        """
+        return SharedView(
+            self.sensor_data, self._client, 2 if self.double_buffered else 1
+        )
+
+    @property
+    def double_buffered(self):
+        """
+        Returns:
+            :obj:`bool`: If the sensor data is double buffered
+        """
+        return self._sensor_slot_index is not None
+
     @property
     def dtype(self):
         """The type of data in the sensor
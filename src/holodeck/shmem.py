@@ -2,12 +2,180 @@
 import ctypes
 import mmap
 import os
+import struct
 from functools import reduce
 
 import numpy as np
 
 from holodeck.exceptions import HolodeckException
 
+# Directory that named shared memory and semaphores live in on Linux
+SHM_DIR = "/dev/shm"
+# Key of the record listing the processes that own a UUID's shared memory
+OWNER_KEY = "OWNER"
+
+
+def write_owner_record(uuid, pids):
+    """Records which processes own the shared memory of ``uuid``, so that
+    :mod:`holodeck.gc` can tell when it has been left behind. Does nothing on Windows, where
+    named shared memory is freed with the last process using it.
+
+    Args:
+        uuid (:obj:`str`): UUID of the shared memory
+        pids (:obj:`list` of :obj:`int`): Process ids of the owners
+    """
+    if os.name != "posix":
+        return
+    path = os.path.join(SHM_DIR, "HOLODECK_MEM" + uuid + "_" + OWNER_KEY)
+    with open(path, "w") as f:
+        f.write("\n".join(str(pid) for pid in pids))
+
+
+def remove_owner_record(uuid):
+    """Removes the record written by :func:`write_owner_record`, if there is one."""
+    if os.name != "posix":
+        return
+    path = os.path.join(SHM_DIR, "HOLODECK_MEM" + uuid + "_" + OWNER_KEY)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def _map_shared_file(mem_name, size_bytes):
+    """Creates a named block of shared memory and maps it into this process.
+
+    Args:
+        mem_name (:obj:`str`): Name of the block, appended to ``HOLODECK_MEM``
+        size_bytes (:obj:`int`): Size of the block in bytes
+
+    Returns:
+        (:obj:`str`, :obj:`mmap.mmap`): The path of the block and the mapping
+    """
+    if os.name == "nt":
+        mem_path = "/HOLODECK_MEM" + mem_name
+        return mem_path, mmap.mmap(0, size_bytes, mem_path)
+    if os.name == "posix":
+        mem_path = os.path.join(SHM_DIR, "HOLODECK_MEM" + mem_name)
+        f = os.open(mem_path, os.O_CREAT | os.O_TRUNC | os.O_RDWR)
+        os.ftruncate(f, size_bytes)
+        os.fsync(f)
+
+        mem_pointer = mmap.mmap(f, size_bytes)
+        os.close(f)  # we don't need the file descriptor to stay open. see the man page
+        return mem_path, mem_pointer
+
+    raise HolodeckException("Currently unsupported os: " + os.name)
+
+
+# madvise advice to populate page tables writable, Linux 5.14+. Not exposed by the mmap module
+_MADV_POPULATE_WRITE = 23
+_THP_SHMEM_SETTING = "/sys/kernel/mm/transparent_hugepage/shmem_enabled"
+
+
+class MemoryBacking:
+    """Options for how large blocks of shared memory are backed, such as camera buffers.
+
+    Every option is best effort: if it isn't supported or permitted on this machine the
+    memory is mapped as usual, and the option is left out of the list returned by
+    :meth:`apply`.
+
+    Args:
+        huge_pages (:obj:`bool`, optional): Ask the kernel to back the memory with
+            transparent huge pages, which reduces TLB pressure when many environments are
+            running. Linux only, and only takes effect if
+            ``/sys/kernel/mm/transparent_hugepage/shmem_enabled`` isn't ``never``.
+            Defaults to False.
+        prefault (:obj:`bool`, optional): Fault every page in when the memory is allocated,
+            instead of on the first tick that writes it. Defaults to False.
+        lock (:obj:`bool`, optional): Lock the memory into RAM with ``mlock`` so that it is
+            never swapped out. Linux only, limited by ``ulimit -l``. Defaults to False.
+        min_size (:obj:`int`, optional): Blocks smaller than this many bytes are mapped as
+            usual. Defaults to 1 MiB.
+    """
+
+    HUGE_PAGES = "huge_pages"
+    PREFAULT = "prefault"
+    LOCK = "lock"
+
+    _libc = None
+
+    def __init__(self, huge_pages=False, prefault=False, lock=False, min_size=1 << 20):
+        self.huge_pages = huge_pages
+        self.prefault = prefault
+        self.lock = lock
+        self.min_size = min_size
+
+    def apply(self, mem_pointer, offset, size_bytes):
+        """Applies the options to part of a mapping.
+
+        Args:
+            mem_pointer (:obj:`mmap.mmap`): The mapping
+            offset (:obj:`int`): Offset of the memory from the start of the mapping
+            size_bytes (:obj:`int`): Size of the memory in bytes
+
+        Returns:
+            :obj:`list` of :obj:`str`: The options that were applied, out of
+            :attr:`HUGE_PAGES`, :attr:`PREFAULT` and :attr:`LOCK`
+        """
+        if size_bytes < self.min_size:
+            return []
+
+        # madvise and mlock work on whole pages
+        start = offset - offset % mmap.PAGESIZE
+        length = min(_round_up(offset + size_bytes, mmap.PAGESIZE), len(mem_pointer))
+        length -= start
+
+        applied = []
+        # Huge pages have to be requested before the pages are faulted in
+        if self.huge_pages and self._advise_huge_pages(mem_pointer, start, length):
+            applied.append(MemoryBacking.HUGE_PAGES)
+        if self.prefault:
+            self._prefault(mem_pointer, start, length)
+            applied.append(MemoryBacking.PREFAULT)
+        if self.lock and self._lock(mem_pointer, start, length):
+            applied.append(MemoryBacking.LOCK)
+        return applied
+
+    @staticmethod
+    def _advise_huge_pages(mem_pointer, start, length):
+        if not hasattr(mmap, "MADV_HUGEPAGE"):
+            return False
+        try:
+            with open(_THP_SHMEM_SETTING) as f:
+                setting = f.read()
+            if "[never]" in setting or "[deny]" in setting:
+                return False
+            mem_pointer.madvise(mmap.MADV_HUGEPAGE, start, length)
+        except (OSError, ValueError):
+            return False
+        return True
+
+    @staticmethod
+    def _prefault(mem_pointer, start, length):
+        if hasattr(mem_pointer, "madvise"):
+            try:
+                mem_pointer.madvise(_MADV_POPULATE_WRITE, start, length)
+                return
+            except OSError:
+                pass  # Older kernel, fault the pages in by hand
+        pages = np.frombuffer(mem_pointer, np.uint8, length, start)[:: mmap.PAGESIZE]
+        # Writing is what allocates a page of shared memory, reading maps the zero page
+        pages[:] = pages
+        del pages
+
+    @staticmethod
+    def _lock(mem_pointer, start, length):
+        if os.name != "posix":
+            return False
+        if MemoryBacking._libc is None:
+            MemoryBacking._libc = ctypes.CDLL(None, use_errno=True)
+        first_byte = ctypes.c_char.from_buffer(mem_pointer, start)
+        address = ctypes.addressof(first_byte)
+        del first_byte  # Don't keep the mapping exported, or it can't be closed
+        return (
+            MemoryBacking._libc.mlock(ctypes.c_void_p(address), ctypes.c_size_t(length))
+            == 0
+        )
+
 
 class Shmem:
     """Implementation of shared memory
@@ -18,44 +186,40 @@ class Shmem:
         shape (:obj:`int`): Shape of the memory block
         dtype (type, optional): data type of the shared memory. Defaults to np.float32
         uuid (:obj:`str`, optional): UUID of the memory block. Defaults to ""
+        backing (:class:`MemoryBacking`, optional): How to back the memory block. Defaults to
+            a plain mapping.
     """
 
+    # Keyed by np.dtype, so that both scalar types and dtype objects can be looked up
     _numpy_to_ctype = {
-        np.float32: ctypes.c_float,
-        np.uint8: ctypes.c_uint8,
-        np.bool: ctypes.c_bool,
-        np.byte: ctypes.c_byte,
+        np.dtype(np.float32): ctypes.c_float,
+        np.dtype(np.uint8): ctypes.c_uint8,
+        np.dtype(np.uint32): ctypes.c_uint32,
+        np.dtype(np.uint64): ctypes.c_uint64,
+        np.dtype(np.bool): ctypes.c_bool,
+        np.dtype(np.byte): ctypes.c_byte,
     }
 
-    def __init__(self, name, shape, dtype=np.float32, uuid=""):
+    def __init__(self, name, shape, dtype=np.float32, uuid="", backing=None):
         self.shape = shape
         self.dtype = dtype
         size = reduce(lambda x, y: x * y, shape)
         size_bytes = np.dtype(dtype).itemsize * size
+        self.size_bytes = size_bytes
 
-        self._mem_path = None
-        self._mem_pointer = None
-        if os.name == "nt":
-            self._mem_path = "/HOLODECK_MEM" + uuid + "_" + name
-            self._mem_pointer = mmap.mmap(0, size_bytes, self._mem_path)
-        elif os.name == "posix":
-            self._mem_path = "/dev/shm/HOLODECK_MEM" + uuid + "_" + name
-            f = os.open(self._mem_path, os.O_CREAT | os.O_TRUNC | os.O_RDWR)
-            os.ftruncate(f, size_bytes)
-            os.fsync(f)
-
-            self._mem_pointer = mmap.mmap(f, size_bytes)
-            os.close(
-                f
-            )  # we don't need the file descriptor to stay open. see the man page
-        else:
-            raise HolodeckException("Currently unsupported os: " + os.name)
+        self._mem_path, self._mem_pointer = _map_shared_file(
+            uuid + "_" + name, size_bytes
+        )
 
-        self.np_array = np.ndarray(shape, dtype=dtype)
-        self.np_array.data = (Shmem._numpy_to_ctype[dtype] * size).from_buffer(
-            self._mem_pointer
+        self.backing = (
+            [] if backing is None else backing.apply(self._mem_pointer, 0, size_bytes)
         )
 
+        self.np_array = np.ndarray(shape, dtype=dtype)
+        self.np_array.data = (
+            Shmem._numpy_to_ctype[np.dtype(dtype)] * size
+        ).from_buffer(self._mem_pointer)
+
     def unlink(self):
         """unlinks the shared memory"""
         if os.name == "posix":
@@ -71,3 +235,431 @@ class Shmem:
 
     def __windows_unlink__(self):
         pass
+
+
+class ShmemArena:
+    """A single block of shared memory that many named buffers are sub-allocated from.
+
+    Instead of creating a separate shared memory file for every buffer, the arena maps one
+    region and hands out aligned slices of it. A manifest at the start of the region records
+    where each buffer lives, so that the engine can find the buffers by their keys.
+
+    The manifest is laid out as follows (all integers are little endian):
+
+    - A header of :attr:`HEADER_SIZE` bytes: the magic ``b"HOLOAREN"``, a ``uint32``
+      version, a ``uint32`` entry count, the ``uint64`` size of the region and the
+      ``uint32`` maximum number of entries.
+    - ``max_entries`` entries of :attr:`ENTRY_SIZE` bytes: the key as a NUL padded utf-8
+      string of :attr:`KEY_SIZE` bytes, the ``uint64`` offset of the buffer from the start
+      of the region, the ``uint64`` size of the buffer in bytes and the numpy dtype string
+      (for example ``<f4``) NUL padded to 8 bytes.
+
+    The entry count is only incremented after an entry has been written, so a reader never
+    sees a partially written entry.
+
+    Args:
+        size (:obj:`int`): Total size of the region in bytes, including the manifest. Pages
+            that are never written to do not use any memory.
+        uuid (:obj:`str`, optional): UUID of the memory block. Defaults to ""
+        max_entries (:obj:`int`, optional): Number of buffers the manifest has room for.
+            Defaults to 1024.
+        alignment (:obj:`int`, optional): Alignment in bytes of small buffers. Buffers of
+            at least a page are always page aligned. Defaults to 64.
+    """
+
+    MAGIC = b"HOLOAREN"
+    VERSION = 1
+    HEADER_SIZE = 64
+    ENTRY_SIZE = 128
+    KEY_SIZE = 96
+
+    _header_struct = struct.Struct("<8sIIQI")
+    _entry_struct = struct.Struct("<96sQQ8s")
+
+    def __init__(self, size, uuid="", max_entries=1024, alignment=64):
+        self.size = size
+        self.max_entries = max_entries
+        self.alignment = alignment
+
+        manifest_size = ShmemArena.HEADER_SIZE + ShmemArena.ENTRY_SIZE * max_entries
+        self.data_offset = _round_up(manifest_size, mmap.PAGESIZE)
+        if self.data_offset >= size:
+            raise HolodeckException(
+                "Shared memory arena of {} bytes is too small to hold its manifest".format(
+                    size
+                )
+            )
+
+        self._mem_path, self._mem_pointer = _map_shared_file(uuid + "_ARENA", size)
+        self._next_offset = self.data_offset
+        # key -> (index, offset, size in bytes, capacity of its slice in bytes)
+        self._entries = dict()
+        # (offset, size in bytes) of the slices that aren't handed out, sorted by offset
+        self._free_slices = []
+        # End of the furthest slice ever handed out
+        self._high_water = self._next_offset
+
+        self._header_struct.pack_into(
+            self._mem_pointer,
+            0,
+            ShmemArena.MAGIC,
+            ShmemArena.VERSION,
+            0,
+            size,
+            max_entries,
+        )
+
+    def allocate(self, key, shape, dtype, backing=None):
+        """Reserves a slice of the arena for ``key``.
+
+        If ``key`` was allocated before and its slice is large enough, the slice is reused.
+        Otherwise a new slice is carved out and the manifest entry is pointed at it, and the old
+        slice is freed for later allocations that fit in it. Arrays on the old slice must not
+        be used anymore.
+
+        Args:
+            key (:obj:`str`): The key to identify the buffer.
+            shape (:obj:`list` of :obj:`int`): The shape of the buffer.
+            dtype (type): The numpy data type of the buffer.
+            backing (:class:`MemoryBacking`, optional): How to back the buffer. Defaults to
+                a plain mapping.
+
+        Returns:
+            :class:`ArenaBuffer`: The allocated buffer.
+        """
+        encoded_key = key.encode("utf-8")
+        if len(encoded_key) >= ShmemArena.KEY_SIZE:
+            raise HolodeckException(
+                "Shared memory key '{}' is too long for the arena manifest".format(key)
+            )
+
+        size_bytes = np.dtype(dtype).itemsize * reduce(lambda x, y: x * y, shape, 1)
+
+        if key in self._entries and self._entries[key][3] >= size_bytes:
+            index, offset, _, capacity = self._entries[key]
+            # Match the behaviour of a freshly created block of shared memory
+            self._mem_pointer[offset : offset + size_bytes] = bytes(size_bytes)
+        else:
+            if key in self._entries:
+                _, old_offset, _, old_capacity = self._entries[key]
+                self._free(old_offset, old_capacity)
+            offset = self._carve(key, size_bytes)
+            capacity = size_bytes
+
+            if key in self._entries:
+                index = self._entries[key][0]
+            elif len(self._entries) < self.max_entries:
+                index = len(self._entries)
+            else:
+                raise HolodeckException(
+                    "Shared memory arena manifest is full ({} entries)".format(
+                        self.max_entries
+                    )
+                )
+
+        self._entries[key] = (index, offset, size_bytes, capacity)
+        self._entry_struct.pack_into(
+            self._mem_pointer,
+            ShmemArena.HEADER_SIZE + index * ShmemArena.ENTRY_SIZE,
+            encoded_key,
+            offset,
+            size_bytes,
+            np.dtype(dtype).str.encode("ascii"),
+        )
+        # Publish the entry only once it is completely written
+        struct.pack_into("<I", self._mem_pointer, 12, len(self._entries))
+
+        buffer = ArenaBuffer(self._mem_pointer, offset, size_bytes, shape, dtype)
+        if backing is not None:
+            buffer.backing = backing.apply(self._mem_pointer, offset, size_bytes)
+        return buffer
+
+    def _carve(self, key, size_bytes):
+        """Takes an aligned, zeroed slice of ``size_bytes`` from the first free slice it fits
+        in, or from the end of the slices handed out so far"""
+        offset = self._find_slice(key, size_bytes)
+        # Only memory that was handed out before can be dirty, leave the rest untouched so
+        # that its pages aren't faulted in
+        dirty_end = min(offset + size_bytes, self._high_water)
+        if dirty_end > offset:
+            self._mem_pointer[offset:dirty_end] = bytes(dirty_end - offset)
+        self._high_water = max(self._high_water, offset + size_bytes)
+        return offset
+
+    def _find_slice(self, key, size_bytes):
+        alignment = mmap.PAGESIZE if size_bytes >= mmap.PAGESIZE else self.alignment
+        for index, (free_offset, free_size) in enumerate(self._free_slices):
+            offset = _round_up(free_offset, alignment)
+            end = free_offset + free_size
+            if offset + size_bytes <= end:
+                # Keep what is left on either side of the slice free
+                remaining = [
+                    (start, stop - start)
+                    for start, stop in (
+                        (free_offset, offset),
+                        (offset + size_bytes, end),
+                    )
+                    if stop > start
+                ]
+                self._free_slices[index : index + 1] = remaining
+                return offset
+
+        offset = _round_up(self._next_offset, alignment)
+        if offset + size_bytes > self.size:
+            raise HolodeckException(
+                "Shared memory arena is out of space allocating {} bytes for '{}'".format(
+                    size_bytes, key
+                )
+            )
+        gap = self._next_offset
+        self._next_offset = offset + size_bytes
+        if offset > gap:
+            self._free(gap, offset - gap)
+        return offset
+
+    def _free(self, offset, size_bytes):
+        """Returns a slice to the free slices, merged with the free slices next to it, or to
+        the end of the arena if it is the last slice handed out"""
+        end = offset + size_bytes
+        merged = []
+        for free_offset, free_size in self._free_slices:
+            free_end = free_offset + free_size
+            if free_end == offset:
+                offset = free_offset
+            elif free_offset == end:
+                end = free_end
+            else:
+                merged.append((free_offset, free_size))
+
+        if end == self._next_offset:
+            self._next_offset = offset
+        else:
+            merged.append((offset, end - offset))
+            merged.sort()
+        self._free_slices = merged
+
+    @property
+    def used_bytes(self):
+        """
+        Returns:
+            :obj:`int`: Number of bytes of the region handed out so far, including the manifest
+        """
+        return self._next_offset
+
+    def unlink(self):
+        """unlinks the shared memory"""
+        if os.name == "posix":
+            os.remove(self._mem_path)
+        elif os.name != "nt":
+            raise HolodeckException("Currently unsupported os: " + os.name)
+
+
+class ArenaBuffer:
+    """A buffer that lives inside of a :class:`ShmemArena`.
+
+    Has the same attributes as :class:`Shmem`, so it can be used wherever a :class:`Shmem`
+    is expected.
+
+    Args:
+        mem_pointer (:obj:`mmap.mmap`): The mapping of the arena
+        offset (:obj:`int`): Offset of the buffer from the start of the arena
+        size_bytes (:obj:`int`): Size of the buffer in bytes
+        shape (:obj:`list` of :obj:`int`): Shape of the buffer
+        dtype (type): data type of the buffer
+    """
+
+    def __init__(self, mem_pointer, offset, size_bytes, shape, dtype):
+        self.shape = shape
+        self.dtype = dtype
+        self.offset = offset
+        self.size_bytes = size_bytes
+        self.backing = []
+        self.np_array = np.ndarray(
+            shape, dtype=dtype, buffer=mem_pointer, offset=offset
+        )
+
+    def unlink(self):
+        """Releases the view of the arena. The arena itself is unlinked by its owner."""
+        del self.np_array
+
+
+class TickHeader:
+    """The engine's tick counter and the tick that each sensor was last written on, in one
+    small block of shared memory.
+
+    The block is laid out as follows (all integers are little endian):
+
+    - A header of :attr:`HEADER_SIZE` bytes: the ``uint64`` tick counter, incremented by the
+      engine every tick, and the ``uint64`` number of entries.
+    - ``max_entries`` entries of :attr:`ENTRY_SIZE` bytes: the buffer name of the sensor (for
+      example ``uav0_RGBCamera``) as a NUL padded utf-8 string of :attr:`KEY_SIZE` bytes, and
+      the ``uint64`` tick the engine last wrote the sensor on.
+
+    The entry count is only incremented after an entry has been written, so a reader never
+    sees a partially written entry.
+
+    Args:
+        array (:obj:`np.ndarray`): ``uint8`` array on the block, of at least
+            :meth:`size_bytes` bytes for one entry
+    """
+
+    KEY = "tick_header"
+    HEADER_SIZE = 16
+    ENTRY_SIZE = 64
+    KEY_SIZE = 56
+    MAX_ENTRIES = 1024
+
+    _entry_dtype = np.dtype([("key", "S56"), ("tick", "<u8")])
+
+    @staticmethod
+    def size_bytes(max_entries=MAX_ENTRIES):
+        """
+        Args:
+            max_entries (:obj:`int`, optional): Number of sensors the block has room for.
+                Defaults to :attr:`MAX_ENTRIES`.
+
+        Returns:
+            :obj:`int`: Size of a block with room for ``max_entries`` sensors
+        """
+        return TickHeader.HEADER_SIZE + TickHeader.ENTRY_SIZE * max_entries
+
+    def __init__(self, array):
+        self.max_entries = (
+            array.size - TickHeader.HEADER_SIZE
+        ) // TickHeader.ENTRY_SIZE
+        header = array[: TickHeader.HEADER_SIZE].view("<u8")
+        self.counter = header[0:1]
+        self._count = header[1:2]
+        self._entries = array[
+            TickHeader.HEADER_SIZE : TickHeader.size_bytes(self.max_entries)
+        ].view(TickHeader._entry_dtype)
+        # Stamp of every entry, indexed by slot
+        self.ticks = self._entries["tick"]
+        self._slots = dict()
+
+    def assign(self, key):
+        """Gives a sensor a slot for its stamp, which starts at 0. A sensor that is built again
+        gets its previous slot back.
+
+        Args:
+            key (:obj:`str`): Buffer name of the sensor
+
+        Returns:
+            :obj:`int`: Index of the slot in :attr:`ticks`
+
+        Raises:
+            HolodeckException: If the key is too long, or every slot is taken
+        """
+        slot = self._slots.get(key)
+        if slot is not None:
+            self.ticks[slot] = 0
+            return slot
+
+        encoded_key = key.encode("utf-8")
+        if len(encoded_key) >= TickHeader.KEY_SIZE:
+            raise HolodeckException(
+                "Sensor key '{}' is too long for the tick header".format(key)
+            )
+        slot = len(self._slots)
+        if slot >= self.max_entries:
+            raise HolodeckException(
+                "Tick header is full ({} sensors)".format(self.max_entries)
+            )
+
+        self._entries[slot] = (encoded_key, 0)
+        # Publish the entry only once it is completely written
+        self._count[0] = slot + 1
+        self._slots[key] = slot
+        return slot
+
+    def slot(self, key):
+        """Looks up the slot of a sensor in the block, the way the engine would.
+
+        Args:
+            key (:obj:`str`): Buffer name of the sensor
+
+        Returns:
+            :obj:`int`: Index of the slot in :attr:`ticks`, or ``None`` if the sensor has none
+        """
+        encoded_key = key.encode("utf-8")
+        for slot in range(int(self._count[0])):
+            if self._entries[slot]["key"] == encoded_key:
+                return slot
+        return None
+
+
+class SharedView:
+    """A read-only view of shared memory, stamped with the sequence number of the tick it was
+    taken on.
+
+    The view can be handed to other libraries without a copy: it implements ``__array__``,
+    the DLPack protocol (``__dlpack__`` / ``__dlpack_device__``, for example for
+    ``torch.from_dlpack`` or ``np.from_dlpack``) and, on Python 3.12+, the buffer protocol.
+    The data is only valid until the engine writes the buffer again, which :attr:`stale`
+    reports.
+
+    DLPack before version 1.0 can't mark memory as read-only, so consumers of ``__dlpack__``
+    get a tensor that they could write to. Writing to it changes what the engine reads.
+
+    Args:
+        array (:obj:`np.ndarray`): The array on the shared memory
+        client (:class:`~holodeck.holodeckclient.HolodeckClient`): The client whose
+            :attr:`~holodeck.holodeckclient.HolodeckClient.sequence` stamps the view
+        lifetime (:obj:`int`, optional): Number of ticks the engine can start before the
+            memory is overwritten. 2 for double buffered sensors. Defaults to 1.
+
+    Attributes:
+        array (:obj:`np.ndarray`): Read-only array on the shared memory
+        sequence (:obj:`int`): Sequence number of the tick the view was taken on
+    """
+
+    def __init__(self, array, client, lifetime=1):
+        self._writable_array = array
+        self._client = client
+        self._lifetime = lifetime
+        self.sequence = client.sequence
+        self.array = array.view()
+        self.array.flags.writeable = False
+
+    @property
+    def stale(self):
+        """
+        Returns:
+            :obj:`bool`: If the engine may have overwritten the memory since the view was taken
+        """
+        return self._client.sequence - self.sequence >= self._lifetime
+
+    @property
+    def shape(self):
+        return self.array.shape
+
+    @property
+    def dtype(self):
+        return self.array.dtype
+
+    def __array__(self, dtype=None):
+        if dtype is None:
+            return self.array
+        return self.array.astype(dtype)
+
+    def __dlpack__(self, stream=None):
+        try:
+            return self.array.__dlpack__(stream=stream)
+        except (TypeError, BufferError):
+            # Older numpy refuses to export read-only arrays
+            return self._writable_array.__dlpack__(stream=stream)
+
+    def __dlpack_device__(self):
+        return self.array.__dlpack_device__()
+
+    def __buffer__(self, flags):
+        return memoryview(self.array)
+
+    def __repr__(self):
+        return "SharedView(sequence={}, stale={}, array={!r})".format(
+            self.sequence, self.stale, self.array
+        )
+
+
+def _round_up(value, alignment):
+    return (value + alignment - 1) // alignment * alignment
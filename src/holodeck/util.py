@@ -3,7 +3,12 @@ import math
 import os
 import holodeck
 
-from holodeck.command import DebugDrawCommand
+import numpy as np
+
+from holodeck.command import DebugDrawCommand, DebugDrawBatchCommand
+
+# Primitives per batch command, which keeps each batch well below the size of the command buffer
+DRAW_BATCH_SIZE = 1000
 
 
 try:
@@ -163,6 +168,85 @@ def draw_point(env, loc, color=None, thickness=10.0):
     env._enqueue_command(command_to_send)
 
 
+def _draw_batch(env, draw_type, starts, ends, colors, thickness):
+    starts = np.asarray(starts, dtype=np.float64).reshape(-1, 3)
+    num_primitives = len(starts)
+    params = np.empty((num_primitives, 10))
+    params[:, 0:3] = starts
+    params[:, 3:6] = np.broadcast_to(ends, (num_primitives, 3))
+    colors = [255, 0, 0] if colors is None else colors
+    params[:, 6:9] = np.broadcast_to(colors, (num_primitives, 3))
+    params[:, 9] = np.broadcast_to(thickness, (num_primitives,))
+
+    for start in range(0, num_primitives, DRAW_BATCH_SIZE):
+        command_to_send = DebugDrawBatchCommand(
+            draw_type, params[start : start + DRAW_BATCH_SIZE]
+        )
+        env._enqueue_command(command_to_send)
+
+
+def draw_lines(env, starts, ends, colors=None, thickness=10.0):
+    """Draws many debug lines in the world at once.
+
+    Much faster than calling :func:`draw_line` for every line. Batches too large for the
+    command buffer are sent over several ticks.
+
+    Args:
+        env (:class:`~holodeck.environments.HolodeckEnvironment`): Environment to draw in.
+        starts (:obj:`np.ndarray`): ``(N, 3)`` start ``[x, y, z]`` locations of the lines.
+            (see :ref:`coordinate-system`)
+        ends (:obj:`np.ndarray`): ``(N, 3)`` end ``[x, y, z]`` locations of the lines
+        colors (:obj:`np.ndarray`): ``[r, g, b]`` color of every line, or ``(N, 3)`` colors
+        thickness (:obj:`float` or :obj:`np.ndarray`): thickness of every line, or ``(N,)``
+            thicknesses
+    """
+    _draw_batch(env, 0, starts, ends, colors, thickness)
+
+
+def draw_arrows(env, starts, ends, colors=None, thickness=10.0):
+    """Draws many debug arrows in the world at once.
+
+    Args:
+        env (:class:`~holodeck.environments.HolodeckEnvironment`): Environment to draw in.
+        starts (:obj:`np.ndarray`): ``(N, 3)`` start ``[x, y, z]`` locations of the arrows.
+            (see :ref:`coordinate-system`)
+        ends (:obj:`np.ndarray`): ``(N, 3)`` end ``[x, y, z]`` locations of the arrows
+        colors (:obj:`np.ndarray`): ``[r, g, b]`` color of every arrow, or ``(N, 3)`` colors
+        thickness (:obj:`float` or :obj:`np.ndarray`): thickness of every arrow, or ``(N,)``
+            thicknesses
+    """
+    _draw_batch(env, 1, starts, ends, colors, thickness)
+
+
+def draw_boxes(env, centers, extents, colors=None, thickness=10.0):
+    """Draws many debug boxes in the world at once.
+
+    Args:
+        env (:class:`~holodeck.environments.HolodeckEnvironment`): Environment to draw in.
+        centers (:obj:`np.ndarray`): ``(N, 3)`` ``[x, y, z]`` locations of the boxes.
+            (see :ref:`coordinate-system`)
+        extents (:obj:`np.ndarray`): ``[x, y, z]`` extent of every box, or ``(N, 3)`` extents
+        colors (:obj:`np.ndarray`): ``[r, g, b]`` color of every box, or ``(N, 3)`` colors
+        thickness (:obj:`float` or :obj:`np.ndarray`): thickness of the lines of every box, or
+            ``(N,)`` thicknesses
+    """
+    _draw_batch(env, 2, centers, extents, colors, thickness)
+
+
+def draw_points(env, locations, colors=None, thickness=10.0):
+    """Draws many debug points in the world at once, such as a point cloud.
+
+    Args:
+        env (:class:`~holodeck.environments.HolodeckEnvironment`): Environment to draw in.
+        locations (:obj:`np.ndarray`): ``(N, 3)`` ``[x, y, z]`` locations of the points.
+            (see :ref:`coordinate-system`)
+        colors (:obj:`np.ndarray`): ``[r, g, b]`` color of every point, or ``(N, 3)`` colors
+        thickness (:obj:`float` or :obj:`np.ndarray`): thickness of every point, or ``(N,)``
+            thicknesses
+    """
+    _draw_batch(env, 3, locations, [0, 0, 0], colors, thickness)
+
+
 def _windows_check_process_alive(pid):
     import win32api
     import win32process
@@ -0,0 +1,571 @@
+"""Runs several Holodeck environments in parallel, each in its own worker process.
+
+:class:`VecEnv` steps every environment at once and returns their observations, rewards and
+terminals stacked into arrays. Observations are handed from the workers to the learner through
+one block of shared memory, so camera frames are never pickled; only the actions and the small
+info dictionaries go through pipes.
+
+Create one from a scenario with :func:`make_vec`, or from a list of functions that each make an
+environment::
+
+    envs = holodeck.vector.make_vec("Dystopia-Follow", num_envs=8, show_viewport=False)
+    obs = envs.reset()
+    for _ in range(1000):
+        obs, rewards, terminals, infos = envs.step(policy(obs))
+    envs.close()
+"""
+import copy
+import functools
+import mmap
+import multiprocessing
+import os
+import traceback
+import uuid as uuid_module
+
+import numpy as np
+
+import holodeck
+from holodeck.exceptions import HolodeckException
+from holodeck.shmem import Shmem
+
+# Alignment of every array in the shared block, in bytes
+_ALIGNMENT = 64
+
+
+def _flatten_state(state, prefix=""):
+    """Flattens the state of a multi-agent environment, ``{agent: {sensor: array}}``, into
+    ``{"agent/sensor": array}``. The state of a single agent environment is left as is."""
+    flat = dict()
+    for key, value in state.items():
+        if isinstance(value, dict):
+            flat.update(_flatten_state(value, prefix + key + "/"))
+        else:
+            flat[prefix + key] = np.asarray(value)
+    return flat
+
+
+def _layout(spec, num_envs, auto_reset):
+    """Places the stacked observations, rewards and terminals in the shared block.
+
+    Args:
+        spec (:obj:`list`): ``(key, shape, dtype string)`` of every observation of one
+            environment
+        num_envs (:obj:`int`): Number of environments
+        auto_reset (:obj:`bool`): If the final observation of every episode is kept as well
+
+    Returns:
+        (:obj:`dict`, :obj:`int`): Dictionary from key to ``(offset, shape, dtype)``, and the
+        size of the block in bytes
+    """
+    entries = [("obs/" + key, shape, dtype) for key, shape, dtype in spec]
+    if auto_reset:
+        entries += [("final/" + key, shape, dtype) for key, shape, dtype in spec]
+    entries += [("reward", [], "<f4"), ("terminal", [], "|b1")]
+
+    layout = dict()
+    offset = 0
+    for key, shape, dtype in entries:
+        shape = [num_envs] + list(shape)
+        layout[key] = (offset, shape, dtype)
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        offset += (size + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+    return layout, max(offset, 1)
+
+
+def _views(buffer, layout):
+    return {
+        key: np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset)
+        for key, (offset, shape, dtype) in layout.items()
+    }
+
+
+def _attach(path, size):
+    """Maps the block of shared memory allocated by the :class:`VecEnv` in a worker. On
+    Windows the block is a named mapping rather than a file, and ``path`` is its tag name."""
+    if os.name == "nt":
+        return np.frombuffer(mmap.mmap(-1, size, path), dtype=np.uint8, count=size)
+    return np.memmap(path, dtype=np.uint8, mode="r+", shape=(size,))
+
+
+def _worker(conn, env_fn, index):
+    """Runs one environment, following the commands sent by :class:`VecEnv` over ``conn``"""
+    env = None
+    try:
+        env = env_fn()
+        state = _flatten_state(env._default_state_fn())
+        conn.send(
+            (
+                "spec",
+                [
+                    (key, list(value.shape), value.dtype.str)
+                    for key, value in state.items()
+                ],
+                env.action_space,
+            )
+        )
+
+        views = None
+        while True:
+            command, data = conn.recv()
+            if command == "attach":
+                path, size, layout = data
+                buffer = _attach(path, size)
+                views = _views(buffer, layout)
+                conn.send(("ok", None))
+            elif command == "reset":
+                state = env.reset()
+                for key, value in _flatten_state(state).items():
+                    views["obs/" + key][index] = value
+                conn.send(("ok", None))
+            elif command == "step":
+                auto_reset = data[1]
+                state, reward, terminal, info = env.step(data[0])
+                views["reward"][index] = 0 if reward is None else reward
+                views["terminal"][index] = bool(terminal)
+                if terminal and auto_reset:
+                    for key, value in _flatten_state(state).items():
+                        views["final/" + key][index] = value
+                    state = env.reset()
+                    info["terminal_observation"] = True
+                for key, value in _flatten_state(state).items():
+                    views["obs/" + key][index] = value
+                conn.send(("ok", info))
+            elif command == "close":
+                break
+    except Exception:  # pylint: disable=broad-except
+        conn.send(("error", traceback.format_exc()))
+    finally:
+        if env is not None:
+            env.__on_exit__()
+        conn.close()
+
+
+class VecEnv:
+    """A batch of Holodeck environments running in parallel worker processes.
+
+    Every environment must have the same observations. The environment at index ``i`` gets
+    ``actions[i]`` on every :meth:`step`, and observation ``key`` of all of the environments is
+    stacked into ``obs[key]``, of shape ``(num_envs, ...)``. For multi-agent environments the
+    observations are named ``"agent/sensor"``.
+
+    Args:
+        env_fns (:obj:`list` of callable): Functions that each create a
+            :class:`~holodeck.environments.HolodeckEnvironment`, called in the worker processes.
+        auto_reset (:obj:`bool`, optional): Reset an environment as soon as it reaches a
+            terminal state. Its observation is then the first of the next episode, and the final
+            observation of the episode is in ``infos[i]["terminal_observation"]``. Defaults to
+            True.
+        copy_obs (:obj:`bool`, optional): If the observations should be copied out of shared
+            memory. If False they are views that the next :meth:`step` overwrites. Defaults to
+            True.
+        start_method (:obj:`str`, optional): The :mod:`multiprocessing` start method of the
+            workers. Defaults to the platform default.
+
+    Attributes:
+        num_envs (:obj:`int`): Number of environments
+        action_space (:class:`~holodeck.spaces.ActionSpace`): Action space of one environment
+
+    """
+
+    def __init__(self, env_fns, auto_reset=True, copy_obs=True, start_method=None):
+        self.num_envs = len(env_fns)
+        self.auto_reset = auto_reset
+        self.copy_obs = copy_obs
+        self._uuid = str(uuid_module.uuid4())
+        self._shmem = None
+        self._waiting = False
+        self._closed = False
+
+        context = multiprocessing.get_context(start_method)
+        self._conns = []
+        self._processes = []
+        for index, env_fn in enumerate(env_fns):
+            conn, worker_conn = context.Pipe()
+            process = context.Process(
+                target=_worker, args=(worker_conn, env_fn, index), daemon=True
+            )
+            process.start()
+            worker_conn.close()
+            self._conns.append(conn)
+            self._processes.append(process)
+
+        try:
+            specs = [self._receive(index) for index in range(self.num_envs)]
+            spec = specs[0][0]
+            if any(other[0] != spec for other in specs):
+                raise HolodeckException(
+                    "Every environment of a VecEnv must have the same observations"
+                )
+            self.action_space = specs[0][1]
+            self.observation_keys = [key for key, _, _ in spec]
+
+            layout, size = _layout(spec, self.num_envs, auto_reset)
+            self._shmem = Shmem("VECENV", [size], np.uint8, self._uuid)
+            self._views = _views(self._shmem.np_array, layout)
+            for conn in self._conns:
+                conn.send(("attach", (self._shmem._mem_path, size, layout)))
+            for index in range(self.num_envs):
+                self._receive(index)
+        except Exception:
+            self.close()
+            raise
+
+    def _receive(self, index):
+        status, *data = self._conns[index].recv()
+        if status == "error":
+            raise HolodeckException(
+                "Environment {} of the VecEnv failed:\n{}".format(index, data[0])
+            )
+        return data if len(data) > 1 else data[0]
+
+    def _observations(self, prefix="obs/"):
+        obs = {key: self._views[prefix + key][:] for key in self.observation_keys}
+        if self.copy_obs:
+            obs = {key: value.copy() for key, value in obs.items()}
+        return obs
+
+    def reset(self):
+        """Resets every environment.
+
+        Returns:
+            :obj:`dict`: Dictionary from observation key to the stacked observations
+        """
+        self._check_not_waiting("reset")
+        for conn in self._conns:
+            conn.send(("reset", None))
+        for index in range(self.num_envs):
+            self._receive(index)
+        return self._observations()
+
+    def step_async(self, actions):
+        """Sends every environment its action and starts its tick, without waiting for them.
+        Must be followed by a call to :meth:`step_wait`.
+
+        Args:
+            actions (:obj:`np.ndarray` or :obj:`list`): One action per environment
+        """
+        self._check_not_waiting("step_async")
+        if len(actions) != self.num_envs:
+            raise HolodeckException(
+                "Expected {} actions, got {}".format(self.num_envs, len(actions))
+            )
+        for conn, action in zip(self._conns, actions):
+            conn.send(("step", (action, self.auto_reset)))
+        self._waiting = True
+
+    def step_wait(self):
+        """Waits for the ticks started by :meth:`step_async` to finish.
+
+        Returns:
+            (:obj:`dict`, :obj:`np.ndarray`, :obj:`np.ndarray`, :obj:`list`): The stacked
+            observations, the rewards, the terminals, and the info dictionary of every
+            environment (see :meth:`~holodeck.environments.HolodeckEnvironment.step`)
+        """
+        if not self._waiting:
+            raise HolodeckException("You must call .step_async() before .step_wait()")
+        self._waiting = False
+
+        infos = [self._receive(index) for index in range(self.num_envs)]
+        if self.auto_reset and any("terminal_observation" in info for info in infos):
+            final = self._observations("final/")
+            for index, info in enumerate(infos):
+                if "terminal_observation" in info:
+                    info["terminal_observation"] = {
+                        key: np.copy(value[index]) for key, value in final.items()
+                    }
+
+        return (
+            self._observations(),
+            self._views["reward"].copy(),
+            self._views["terminal"].copy(),
+            infos,
+        )
+
+    def step(self, actions):
+        """Steps every environment with its action.
+
+        Args:
+            actions (:obj:`np.ndarray` or :obj:`list`): One action per environment
+
+        Returns:
+            The same as :meth:`step_wait`
+        """
+        self.step_async(actions)
+        return self.step_wait()
+
+    def _check_not_waiting(self, method_name):
+        if self._waiting:
+            raise HolodeckException(
+                "Cannot call .{}() while the environments are ticking. "
+                "Call .step_wait() first".format(method_name)
+            )
+
+    def close(self):
+        """Closes every environment and frees the shared memory."""
+        if self._closed:
+            return
+        self._closed = True
+        for conn, process in zip(self._conns, self._processes):
+            if process.is_alive():
+                try:
+                    if self._waiting:
+                        conn.recv()
+                    conn.send(("close", None))
+                except (BrokenPipeError, EOFError):
+                    pass
+            process.join(10)
+            if process.is_alive():
+                process.kill()
+            conn.close()
+        if self._shmem is not None:
+            self._views = None
+            self._shmem.unlink()
+            self._shmem = None
+
+    def __len__(self):
+        return self.num_envs
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback_):
+        self.close()
+
+
+def make_vec(scenario_name="", num_envs=2, auto_reset=True, copy_obs=True, **kwargs):
+    """Creates a :class:`VecEnv` of ``num_envs`` copies of a scenario, each with its own engine.
+
+    Args:
+        scenario_name (:obj:`str`): The name of the scenario, see :func:`holodeck.make`
+        num_envs (:obj:`int`, optional): Number of environments. Defaults to 2.
+        auto_reset (:obj:`bool`, optional): See :class:`VecEnv`. Defaults to True.
+        copy_obs (:obj:`bool`, optional): See :class:`VecEnv`. Defaults to True.
+        **kwargs: Other arguments for :func:`holodeck.make`, such as ``scenario_cfg`` or
+            ``show_viewport``
+
+    Returns:
+        :class:`VecEnv`: The environments
+    """
+    env_fn = functools.partial(holodeck.make, scenario_name, **kwargs)
+    return VecEnv([env_fn] * num_envs, auto_reset=auto_reset, copy_obs=copy_obs)
+
+
+def replicate_main_agent(scenario, num_copies, offsets):
+    """Adds copies of the main agent of a scenario, for :class:`InWorldVecEnv`.
+
+    The copies have the same type, sensors and control scheme as the main agent, and are named
+    ``"<main agent>_<i>"`` for ``i`` from 1 to ``num_copies - 1``. The main agent is copy 0.
+
+    Args:
+        scenario (:obj:`dict`): The scenario, which isn't modified
+        num_copies (:obj:`int`): Number of agents in the returned scenario, including the main
+            agent
+        offsets (:obj:`list`): Either one ``[x, y, z]`` offset, by which every copy is moved
+            from the previous one, or a ``(num_copies, 3)`` array with the offset of every
+            copy from the main agent, whose first row (the main agent's) is ignored.
+
+    Returns:
+        (:obj:`dict`, :obj:`list` of :obj:`str`): The scenario with the copies added, and the
+        names of the copies
+    """
+    scenario = copy.deepcopy(scenario)
+    main_name = scenario["main_agent"]
+    main_agent = next(
+        agent for agent in scenario["agents"] if agent["agent_name"] == main_name
+    )
+
+    offsets = np.asarray(offsets, dtype=np.float64)
+    if offsets.shape == (3,):
+        offsets = np.outer(np.arange(num_copies), offsets)
+    if offsets.shape != (num_copies, 3):
+        raise HolodeckException(
+            "Expected one offset or {} offsets, got an array of shape {}".format(
+                num_copies, offsets.shape
+            )
+        )
+
+    names = [main_name]
+    location = np.asarray(main_agent.get("location", [0, 0, 0]), dtype=np.float64)
+    for index in range(1, num_copies):
+        agent = copy.deepcopy(main_agent)
+        agent["agent_name"] = "{}_{}".format(main_name, index)
+        agent["location"] = (location + offsets[index]).tolist()
+        scenario["agents"].append(agent)
+        names.append(agent["agent_name"])
+    return scenario, names
+
+
+class InWorldVecEnv:
+    """Many copies of an agent in one world, presented as a batch of independent environments.
+
+    Rendering and physics set up are paid once per engine, so running the copies in one world
+    gives many times the throughput of one environment per engine when the agents only have
+    low dimensional sensors. Each copy has its own task sensor, which gives its reward and
+    terminal.
+
+    Copies that reach a terminal state are put back at their starting location and rotation, at
+    rest, with :meth:`~holodeck.agents.HolodeckAgent.set_physics_state`. This takes effect on the
+    next step, so the observation returned for them is the final one of their episode, which is
+    also given in their info, as with :class:`VecEnv`. The world itself is only reset by
+    :meth:`reset`.
+
+    Stacking the observations of the copies copies them out of shared memory, so the environment
+    should be made with ``copy_state=False``, as :func:`make_in_world_vec` does, for its state
+    not to be copied twice.
+
+    Use :func:`make_in_world_vec` to make one from a scenario, or give
+    :func:`replicate_main_agent` a scenario to make the environment with.
+
+    Args:
+        env (:class:`~holodeck.environments.HolodeckEnvironment`): The environment, with the
+            copies already in it. It can't have ``columnar_state``.
+        agent_names (:obj:`list` of :obj:`str`): Names of the copies, in the order of the
+            sub-environments
+        auto_reset (:obj:`bool`, optional): Reset copies that reach a terminal state. Defaults
+            to True.
+
+    Attributes:
+        num_envs (:obj:`int`): Number of copies
+        env (:class:`~holodeck.environments.HolodeckEnvironment`): The environment
+
+    """
+
+    def __init__(self, env, agent_names, auto_reset=True):
+        if env._columnar_state:
+            raise HolodeckException(
+                "InWorldVecEnv stacks the copies itself, "
+                "make the environment without columnar_state"
+            )
+        self.env = env
+        self.agent_names = list(agent_names)
+        self.num_envs = len(self.agent_names)
+        self.auto_reset = auto_reset
+        self._start_poses = dict()
+
+    @property
+    def action_space(self):
+        """
+        Returns:
+            :class:`~holodeck.spaces.ActionSpace`: Action space of one copy
+        """
+        return self.env.agents[self.agent_names[0]].action_space
+
+    def _stack(self, state):
+        if self.env.num_agents == 1:
+            state = {self.agent_names[0]: state}
+        sensors = state[self.agent_names[0]].keys()
+        return {
+            sensor: np.stack([state[name][sensor] for name in self.agent_names])
+            for sensor in sensors
+        }
+
+    def _reward_terminal(self):
+        # Read from every sensor, the task sensor may be left out by the observation filter
+        state = self.env._state_dict
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        terminals = np.zeros(self.num_envs, dtype=bool)
+        for index, name in enumerate(self.agent_names):
+            for sensor, value in state[name].items():
+                if "Task" in sensor:
+                    rewards[index] = value[0]
+                    terminals[index] = value[1] == 1
+        return rewards, terminals
+
+    def reset(self):
+        """Resets the world, and every copy with it.
+
+        Returns:
+            :obj:`dict`: Dictionary from sensor name to the stacked observations
+        """
+        state = self.env.reset()
+        self._start_poses = {
+            agent_def.name: (agent_def.starting_loc, agent_def.starting_rot)
+            for agent_def in self.env._spawned_agent_defs
+        }
+        return self._stack(state)
+
+    def reset_copy(self, index):
+        """Puts a copy back at its starting location and rotation, at rest, on the next tick.
+
+        Args:
+            index (:obj:`int`): Index of the copy
+        """
+        name = self.agent_names[index]
+        location, rotation = self._start_poses[name]
+        self.env.agents[name].set_physics_state(
+            location, rotation, [0, 0, 0], [0, 0, 0]
+        )
+
+    def step(self, actions):
+        """Steps every copy with its action, in one tick of the world.
+
+        Args:
+            actions (:obj:`np.ndarray` or :obj:`list`): One action per copy
+
+        Returns:
+            (:obj:`dict`, :obj:`np.ndarray`, :obj:`np.ndarray`, :obj:`list`): The stacked
+            observations, the rewards, the terminals, and an info dictionary per copy. With
+            ``auto_reset``, the info of a copy that reached a terminal state has its final
+            observation under ``"terminal_observation"``, as with :class:`VecEnv`.
+        """
+        if len(actions) != self.num_envs:
+            raise HolodeckException(
+                "Expected {} actions, got {}".format(self.num_envs, len(actions))
+            )
+        for name, action in zip(self.agent_names, actions):
+            self.env.act(name, action)
+        obs = self._stack(self.env.tick())
+        rewards, terminals = self._reward_terminal()
+        infos = [dict() for _ in range(self.num_envs)]
+        if self.auto_reset:
+            for index in np.flatnonzero(terminals):
+                self.reset_copy(index)
+                infos[index]["terminal_observation"] = {
+                    sensor: np.copy(value[index]) for sensor, value in obs.items()
+                }
+        return obs, rewards, terminals, infos
+
+    def close(self):
+        """Closes the environment."""
+        self.env.__on_exit__()
+
+    def __len__(self):
+        return self.num_envs
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback_):
+        self.close()
+
+
+def make_in_world_vec(
+    scenario_name="",
+    num_copies=2,
+    offsets=(10, 0, 0),
+    scenario_cfg=None,
+    auto_reset=True,
+    **kwargs
+):
+    """Creates an :class:`InWorldVecEnv` with ``num_copies`` copies of the main agent of a
+    scenario in one world.
+
+    Args:
+        scenario_name (:obj:`str`): The name of the scenario, see :func:`holodeck.make`
+        num_copies (:obj:`int`, optional): Number of copies. Defaults to 2.
+        offsets (:obj:`list`, optional): Where to place the copies, see
+            :func:`replicate_main_agent`. Defaults to 10 meters apart along x.
+        scenario_cfg (:obj:`dict`, optional): Scenario to use instead of ``scenario_name``
+        auto_reset (:obj:`bool`, optional): See :class:`InWorldVecEnv`. Defaults to True.
+        **kwargs: Other arguments for :func:`holodeck.make`. ``copy_state`` defaults to
+            False, see :class:`InWorldVecEnv`.
+
+    Returns:
+        :class:`InWorldVecEnv`: The environments
+    """
+    if scenario_cfg is None:
+        scenario_cfg = holodeck.packagemanager.get_scenario(scenario_name)
+    scenario, names = replicate_main_agent(scenario_cfg, num_copies, offsets)
+    kwargs.setdefault("copy_state", False)
+    env = holodeck.make(scenario_cfg=scenario, **kwargs)
+    return InWorldVecEnv(env, names, auto_reset=auto_reset)
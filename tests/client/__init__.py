@@ -0,0 +1,4 @@
+"""
+Tests in this module exercise the client side of the shared memory protocol against a
+stand-in engine, so they do not need a world binary.
+"""
@@ -0,0 +1,53 @@
+import copy
+
+import pytest
+
+from holodeck.environments import HolodeckEnvironment
+from tests.utils.stand_in_engine import StandInEngine
+
+
+stand_in_config = {
+    "name": "test_stand_in",
+    "world": "TestWorld",
+    "main_agent": "sphere0",
+    "agents": [
+        {
+            "agent_name": "sphere0",
+            "agent_type": "SphereAgent",
+            "sensors": [
+                {"sensor_type": "LocationSensor"},
+                {"sensor_type": "DistanceTask"},
+            ],
+            "control_scheme": 1,
+            "location": [0, 0, 0],
+        }
+    ],
+}
+
+
+@pytest.fixture
+def engine():
+    """A running stand-in engine. The client is expected to unlink its own memory."""
+    with StandInEngine() as stand_in:
+        yield stand_in
+
+
+@pytest.fixture
+def make_env(engine):
+    """Returns a function that creates a HolodeckEnvironment attached to the stand-in engine.
+    The environments are cleaned up after the test.
+    """
+    envs = []
+
+    def _make_env(scenario=None, **kwargs):
+        scenario = copy.deepcopy(stand_in_config if scenario is None else scenario)
+        env = HolodeckEnvironment(
+            scenario=scenario, start_world=False, uuid=engine.uuid, **kwargs
+        )
+        envs.append(env)
+        return env
+
+    yield _make_env
+
+    for env in envs:
+        env.__on_exit__()
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from holodeck.exceptions import HolodeckException
+
+
+def write_tick_count(engine):
+    location = engine.buffer("sphere0_LocationSensor_sensor_data", [3], np.float32)
+    location[:] = engine.ticks
+    task = engine.buffer("sphere0_DistanceTask_sensor_data", [2], np.float32)
+    task[:] = [0.5, 0]
+
+
+def test_step_async_matches_step(engine, make_env):
+    """Validate that step_async/step_wait returns the state of the tick it started"""
+    env = make_env()
+    engine.on_tick = write_tick_count
+
+    state, _, _, _ = env.step([0, 0])
+    env.step_async([0, 0])
+    async_state, reward, terminal, info = env.step_wait()
+
+    assert async_state["LocationSensor"][0] == state["LocationSensor"][0] + 1
+    assert reward == 0.5
+    assert not terminal
+    assert set(info) == {"tick", "last_update_ticks"}
+    assert not engine.errors
+
+
+def test_action_is_written_before_release(engine, make_env):
+    """Validate that the action is in shared memory by the time the engine ticks"""
+    seen = []
+    env = make_env()
+    engine.on_tick = lambda e: seen.append(
+        np.copy(e.buffer("sphere0", [2], np.float32))
+    )
+
+    env.step_async([3, 4])
+    env.step_wait()
+
+    assert np.all(seen[-1] == [3, 4])
+
+
+@pytest.mark.parametrize(
+    "call",
+    [
+        lambda env: env.tick(),
+        lambda env: env.step([0, 0]),
+        lambda env: env.step_async([0, 0]),
+        lambda env: env.act("sphere0", [0, 0]),
+        lambda env: env.reset(),
+        lambda env: env.flush_commands(),
+        lambda env: env.agents["sphere0"].teleport([1, 2, 3]),
+        lambda env: env.agents["sphere0"].set_physics_state(
+            [0, 0, 0], [0, 0, 0], [0, 0, 0], [0, 0, 0]
+        ),
+        lambda env: env.set_control_scheme("sphere0", 0),
+        lambda env: env.send_world_command("OpenDoor"),
+    ],
+)
+def test_shared_memory_is_guarded_while_engine_ticks(make_env, call):
+    """Validate that the environment refuses to touch shared memory between step_async and
+    step_wait
+    """
+    env = make_env()
+    env.step_async([0, 0])
+
+    with pytest.raises(HolodeckException):
+        call(env)
+
+    env.step_wait()
+    env.tick()
+
+
+def test_step_wait_requires_step_async(make_env):
+    env = make_env()
+    with pytest.raises(HolodeckException):
+        env.step_wait()
+
+
+def test_failed_step_wait_releases_the_guard(make_env, monkeypatch):
+    env = make_env()
+    env.step_async([0, 0])
+    acquire = env._acquire_engine
+
+    def time_out():
+        acquire()
+        raise HolodeckException("Timed out")
+
+    monkeypatch.setattr(env, "_acquire_engine", time_out)
+    with pytest.raises(HolodeckException):
+        env.step_wait()
+
+    monkeypatch.setattr(env, "_acquire_engine", acquire)
+    env.tick()
@@ -0,0 +1,84 @@
+import sys
+
+import numpy as np
+import pytest
+
+from holodeck.command import (
+    CommandCenter,
+    CommandsGroup,
+    CustomCommand,
+    DebugDrawCommand,
+    SpawnAgentCommand,
+    decode_binary_commands,
+)
+
+COMMAND_BUFFER_SIZE = 1048576
+
+
+def _commands():
+    return [
+        SpawnAgentCommand(
+            np.array([1.5, 2, 3], dtype=np.float32),
+            [0, 90, 0],
+            "sphere0",
+            "SphereAgent",
+            is_main_agent=True,
+        ),
+        DebugDrawCommand(1, [0, 0, 0], np.array([[1.0, 2.0, 3.0]]), [255, 0, 0], 0.5),
+        CustomCommand("OpenDoor", [1, 2.25], ["left", "ünicode"]),
+    ]
+
+
+def test_binary_round_trip():
+    group = CommandsGroup()
+    for command in _commands():
+        group.add_command(command)
+
+    decoded = decode_binary_commands(group.to_binary())
+
+    assert [command_type for command_type, _ in decoded] == [
+        "SpawnAgent",
+        "DebugDraw",
+        "CustomCommand",
+    ]
+    for command, (_, parameters) in zip(_commands(), decoded):
+        assert len(parameters) == len(command.parameters)
+        for decoded_value, value in zip(parameters, command.parameters):
+            if isinstance(value, str):
+                assert decoded_value == value
+            else:
+                assert decoded_value == pytest.approx(value)
+
+    # Integers that don't fit in 32 bits go in a float64 run
+    assert decoded[0][1][8] == float(sys.maxsize)
+
+
+def test_json_is_unchanged():
+    command = CustomCommand("OpenDoor", np.array([1, 2.5]), ["left"])
+
+    assert command.to_json() == (
+        '{ "type": "CustomCommand", "params": [{ "value": "OpenDoor" },'
+        '{ "value": 1.0 },{ "value": 2.5 },{ "value": "left" }]}'
+    )
+
+
+def test_format_follows_engine_capability(engine, make_env):
+    env = make_env()
+    capabilities = engine.buffer("command_capabilities", [1], np.uint8)
+    command_buffer = engine.buffer("command_buffer", [COMMAND_BUFFER_SIZE], np.byte)
+
+    env.send_world_command("OpenDoor", [1], ["left"])
+    env.tick()
+    assert bytes(command_buffer[:1]) == b"{"
+    assert not env._command_center.uses_binary
+
+    capabilities[0] = CommandCenter.BINARY_CAPABILITY
+    env.send_world_command("OpenDoor", [1], ["left"])
+    env.tick()
+    assert env._command_center.uses_binary
+    assert decode_binary_commands(command_buffer.tobytes()) == [
+        ("CustomCommand", ["OpenDoor", 1, "left"])
+    ]
+
+    env._command_center.binary_commands = False
+    assert not env._command_center.uses_binary
@@ -0,0 +1,120 @@
+import copy
+
+import numpy as np
+import pytest
+
+from holodeck.exceptions import HolodeckException
+from tests.client.conftest import stand_in_config
+
+
+def swarm_config(num_agents=3):
+    scenario = copy.deepcopy(stand_in_config)
+    for i in range(1, num_agents):
+        agent = copy.deepcopy(scenario["agents"][0])
+        agent["agent_name"] = "sphere{}".format(i)
+        scenario["agents"].append(agent)
+    return scenario
+
+
+def write_locations(engine):
+    for i in range(3):
+        key = "sphere{}_LocationSensor_sensor_data".format(i)
+        if engine.has_buffer(key):
+            engine.buffer(key, [3], np.float32)[:] = i
+
+
+def test_stacks_sensors_across_agents(engine, make_env):
+    env = make_env(swarm_config(), columnar_state=True)
+    engine.on_tick = write_locations
+
+    state = env.tick()
+
+    assert set(state) == {"LocationSensor", "DistanceTask"}
+    assert state["LocationSensor"].shape == (3, 3)
+    assert state["DistanceTask"].shape == (3, 2)
+    assert np.all(state["LocationSensor"] == [[0] * 3, [1] * 3, [2] * 3])
+    assert env.columnar_rows["LocationSensor"] == ["sphere0", "sphere1", "sphere2"]
+
+
+def test_sensors_that_differ_are_returned_per_agent(make_env):
+    scenario = swarm_config(2)
+    scenario["agents"][1]["sensors"].append(
+        {"sensor_type": "RGBCamera", "configuration": {"CaptureWidth": 32}}
+    )
+    scenario["agents"][0]["sensors"].append(
+        {"sensor_type": "RGBCamera", "configuration": {"CaptureWidth": 64}}
+    )
+    env = make_env(scenario, columnar_state=True)
+
+    state = env.tick()
+
+    assert state["LocationSensor"].shape == (2, 3)
+    assert state["sphere0/RGBCamera"].shape[1] == 64
+    assert state["sphere1/RGBCamera"].shape[1] == 32
+    assert "RGBCamera" not in env.columnar_rows
+
+
+def test_without_copy_returns_the_same_arrays(engine, make_env):
+    env = make_env(swarm_config(), columnar_state=True, copy_state=False)
+    engine.on_tick = write_locations
+
+    first = env.tick()["LocationSensor"]
+    second = env.tick()["LocationSensor"]
+
+    assert first is second
+
+
+def test_copy_returns_new_arrays(make_env):
+    env = make_env(swarm_config(), columnar_state=True)
+
+    assert env.tick()["LocationSensor"] is not env.tick()["LocationSensor"]
+
+
+def test_recycles_state_pool_and_out(make_env):
+    env = make_env(swarm_config(), columnar_state=True, state_pool_size=2)
+    out = env.allocate_state()
+
+    states = [env.tick() for _ in range(3)]
+
+    assert states[0] is states[2]
+    assert states[0] is not states[1]
+    assert env.tick(out=out) is out
+    with pytest.raises(HolodeckException):
+        env.tick(out={"LocationSensor": np.zeros((2, 3), dtype=np.float32)})
+
+
+def test_follows_observation_filter(make_env):
+    env = make_env(swarm_config(), columnar_state=True)
+
+    env.set_observation_filter({"sphere1": ["LocationSensor"]})
+    state = env.tick()
+
+    assert state["LocationSensor"].shape == (3, 3)
+    assert state["DistanceTask"].shape == (2, 2)
+    assert env.columnar_rows["DistanceTask"] == ["sphere0", "sphere2"]
+
+
+def test_gathers_double_buffered_sensors(engine, make_env):
+    env = make_env(swarm_config(2), columnar_state=True, double_buffer_sensors=True)
+
+    def publish(engine):
+        for i in range(2):
+            key = "sphere{}_LocationSensor".format(i)
+            slots = engine.buffer(key + "_sensor_data", [2, 3], np.float32)
+            index = engine.buffer(key + "_sensor_slot", [1], np.uint8)
+            slots[(index[0] + 1) % 2] = engine.ticks + i
+            index[0] = (index[0] + 1) % 2
+
+    engine.on_tick = publish
+    state = env.tick()
+
+    assert state["LocationSensor"][1, 0] == state["LocationSensor"][0, 0] + 1
+    assert state["LocationSensor"][0, 0] == engine.ticks - 1
+
+
+def test_single_agent_state_is_unchanged(make_env):
+    env = make_env(columnar_state=True)
+
+    state = env.tick()
+
+    assert state["LocationSensor"].shape == (3,)
@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+from holodeck.exceptions import HolodeckException
+
+COMMAND_BUFFER_SIZE = 1048576
+
+
+def test_json_is_written_with_terminator(engine, make_env):
+    env = make_env()
+    command_buffer = engine.buffer("command_buffer", [COMMAND_BUFFER_SIZE], np.byte)
+    command_bool = engine.buffer("command_bool", [1], np.bool_)
+
+    env._command_center._write_to_command_buffer('{"commands": []}')
+
+    expected = b'{"commands": []}0'
+    assert command_buffer[: len(expected)].tobytes() == expected
+    assert command_bool[0]
+
+
+def test_oversized_commands_are_rejected(make_env):
+    env = make_env()
+
+    with pytest.raises(HolodeckException):
+        env._command_center._write_to_command_buffer("x" * COMMAND_BUFFER_SIZE)
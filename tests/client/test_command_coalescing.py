@@ -0,0 +1,73 @@
+from holodeck.command import (
+    CommandsGroup,
+    CustomCommand,
+    RGBCameraRateCommand,
+    RotateSensorCommand,
+    TeleportCameraCommand,
+)
+
+
+def _types_and_params(group):
+    return [
+        (command.to_json().split('"')[3], command.parameters)
+        for command in group._live_commands()
+    ]
+
+
+def test_last_writer_wins():
+    group = CommandsGroup()
+    group.add_command(RotateSensorCommand("sphere0", "camera", [0, 0, 0]))
+    group.add_command(CustomCommand("OpenDoor"))
+    group.add_command(RotateSensorCommand("sphere0", "other", [1, 1, 1]))
+    group.add_command(RotateSensorCommand("sphere0", "camera", [0, 90, 0]))
+    group.add_command(TeleportCameraCommand([0, 0, 0], [0, 0, 0]))
+    group.add_command(TeleportCameraCommand([1, 2, 3], [0, 0, 0]))
+
+    assert group.size == 4
+    assert group.dropped == 2
+    assert _types_and_params(group) == [
+        ("CustomCommand", ["OpenDoor"]),
+        ("RotateSensor", ["sphere0", "other", 1, 1, 1]),
+        # The replacement is sent after everything queued before it
+        ("RotateSensor", ["sphere0", "camera", 0, 90, 0]),
+        ("TeleportCamera", [1, 2, 3, 0, 0, 0]),
+    ]
+    assert group.to_json().count("RotateSensor") == 2
+
+
+def test_order_sensitive_commands_are_kept():
+    group = CommandsGroup()
+    for _ in range(3):
+        group.add_command(CustomCommand("Step"))
+
+    assert group.size == 3
+    assert group.dropped == 0
+
+
+def test_split_keeps_coalescing():
+    group = CommandsGroup()
+    group.add_command(RGBCameraRateCommand("sphere0", "camera", 1))
+    group.add_command(RGBCameraRateCommand("sphere0", "camera", 2))
+    group.add_command(CustomCommand("x" * 100))
+
+    front = group.split_front(len('{"commands": []}0') + 120)
+    group.add_command(RGBCameraRateCommand("sphere0", "camera", 3))
+
+    assert [params for _, params in _types_and_params(front)] == [
+        ["sphere0", "camera", 2]
+    ]
+    assert group.size == 2
+
+
+def test_environment_reports_dropped_commands(make_env):
+    env = make_env()
+    camera = env.agents["sphere0"].sensors["LocationSensor"]
+    for angle in range(5):
+        camera.rotate([0, angle, 0])
+
+    env.tick()
+    assert env.dropped_commands == 4
+    assert env._command_center.total_dropped_commands == 4
+
+    env.tick()
+    assert env.dropped_commands == 0
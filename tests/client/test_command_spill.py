@@ -0,0 +1,75 @@
+import json
+
+import numpy as np
+import pytest
+
+from holodeck.command import CommandsGroup, CustomCommand
+from holodeck.exceptions import HolodeckException
+
+COMMAND_BUFFER_SIZE = 1048576
+SMALL_BUFFER = 2000
+
+
+def record_commands(received):
+    """Returns an on_tick callback that parses the JSON commands the client sent this tick"""
+
+    def on_tick(engine):
+        flag = engine.buffer("command_bool", [1], np.bool_)
+        if not flag[0]:
+            return
+        flag[0] = False
+        raw = engine.buffer("command_buffer", [COMMAND_BUFFER_SIZE], np.byte).tobytes()
+        end = raw.index(b"]}0") + 2
+        assert end + 1 <= SMALL_BUFFER
+        received.append(json.loads(raw[:end])["commands"])
+
+    return on_tick
+
+
+def test_large_batches_spill_over_ticks(engine, make_env):
+    env = make_env()
+    env._command_center.max_buffer = SMALL_BUFFER
+    engine.buffer("command_bool", [1], np.bool_)[0] = False
+    received = []
+    engine.on_tick = record_commands(received)
+
+    for i in range(100):
+        env.send_world_command("Command{}".format(i), [i, i + 0.5], ["text"])
+    ticks = env.flush_commands()
+
+    assert ticks == len(received) > 1
+    assert env._command_center.extra_ticks == ticks - 1
+    names = [command["params"][0]["value"] for batch in received for command in batch]
+    assert names == ["Command{}".format(i) for i in range(100)]
+    assert not engine.errors
+
+
+def test_reset_sends_every_batch(engine, make_env):
+    env = make_env()
+    env._command_center.max_buffer = SMALL_BUFFER
+    # Drop the commands the environment sent when it was created
+    engine.buffer("command_bool", [1], np.bool_)[0] = False
+    received = []
+    engine.on_tick = record_commands(received)
+
+    # Agents from the scenario plus enough sensors to need several batches
+    sensors = [
+        {"sensor_type": "LocationSensor", "sensor_name": str(i)} for i in range(30)
+    ]
+    env._scenario["agents"][0]["sensors"] = sensors
+    env.reset()
+
+    types = [command["type"] for batch in received for command in batch]
+    assert types.count("AddSensor") == 30
+    assert env._command_center.queue_size == 0
+    # The extra ticks don't count as ticks of the episode
+    assert env._total_ticks == 0
+    assert not engine.errors
+
+
+def test_oversized_command_is_rejected():
+    group = CommandsGroup()
+    group.add_command(CustomCommand("Huge", string_params=["x" * SMALL_BUFFER]))
+
+    with pytest.raises(HolodeckException):
+        group.split_front(SMALL_BUFFER)
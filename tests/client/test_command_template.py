@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from holodeck.command import CommandTemplate, CustomCommand, decode_binary_commands
+from holodeck.command import CommandsGroup
+from holodeck.exceptions import HolodeckException
+
+
+@pytest.mark.parametrize(
+    "numbers",
+    [
+        [1, 2.5, -3],
+        [7, 0.125, 2**40],
+        np.array([4, 5.5, 6], dtype=np.float32).tolist(),
+    ],
+)
+def test_template_matches_command(numbers):
+    template = CommandTemplate(CustomCommand("Move%d", [0, 0.0, 0], ["100%", "b"]))
+    command = CustomCommand("Move%d", numbers, ["100%", "b"])
+    filled = template.fill(numbers)
+
+    assert filled.to_json() == command.to_json()
+    assert filled.parameters == command.parameters
+
+    if isinstance(numbers[0], int):
+        assert filled.to_binary() == command.to_binary()
+
+
+def test_template_binary_round_trip():
+    template = CommandTemplate(CustomCommand("Move", [0, 0.0, 0.0], ["fast"]))
+    group = CommandsGroup()
+    group.add_command(template.fill([3, 1.5, -2.0]))
+
+    assert decode_binary_commands(group.to_binary()) == [
+        ("CustomCommand", ["Move", 3, 1.5, -2.0, "fast"])
+    ]
+
+
+def test_wrong_number_count_is_rejected():
+    template = CommandTemplate(CustomCommand("Move", [0, 0]))
+
+    assert template.num_numbers == 2
+    with pytest.raises(HolodeckException):
+        template.fill([1])
+
+
+def test_environment_sends_template(make_env, monkeypatch):
+    env = make_env()
+    sent = []
+    monkeypatch.setattr(env._command_center, "_write_to_command_buffer", sent.append)
+
+    template = env.world_command_template("Thrust", [0.0, 0.0], ["engine"])
+    env.send_world_command_template(template, [0.5, 1.5])
+    env.tick()
+
+    expected = CustomCommand("Thrust", [0.5, 1.5], ["engine"]).to_json()
+    assert sent == ['{"commands": [' + expected + "]}"]
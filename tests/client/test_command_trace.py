@@ -0,0 +1,89 @@
+import json
+
+from holodeck.command import RotateSensorCommand
+
+SMALL_BUFFER = 2000
+
+
+def test_trace_is_off_by_default(make_env):
+    env = make_env()
+    env.send_world_command("OpenDoor", [1])
+    env.tick()
+
+    assert env.command_trace is None
+
+
+def test_commands_are_tagged_with_their_tick(make_env):
+    env = make_env()
+    trace = env.enable_command_trace()
+    first_tick = env._client.sequence
+
+    env.send_world_command("OpenDoor", [1], ["left"])
+    env.tick()
+    env.weather.set_weather("rain")
+    env.tick(2)
+
+    open_door, weather = list(trace)
+    assert open_door["name"] == "OpenDoor"
+    assert open_door["type"] == "CustomCommand"
+    assert open_door["status"] == "sent"
+    assert open_door["queued_tick"] == open_door["flushed_tick"] == first_tick
+    assert open_door["size"] > 0
+    assert open_door["latency"] >= 0
+    assert weather["name"] == "SetWeather"
+    assert weather["flushed_tick"] == first_tick + 1
+    assert weather["id"] == open_door["id"] + 1
+
+
+def test_replaced_commands_are_dropped(make_env):
+    env = make_env()
+    trace = env.enable_command_trace()
+
+    env._enqueue_command(RotateSensorCommand("sphere0", "RGBCamera", [0, 0, 0]))
+    env._enqueue_command(RotateSensorCommand("sphere0", "RGBCamera", [0, 0, 90]))
+    env.tick()
+
+    assert [record["status"] for record in trace] == ["dropped", "sent"]
+
+
+def test_spilled_commands_record_later_ticks(engine, make_env):
+    env = make_env()
+    env._command_center.max_buffer = SMALL_BUFFER
+    trace = env.enable_command_trace(capacity=50)
+
+    for i in range(100):
+        env.send_world_command("Command{}".format(i), [i, i + 0.5], ["text"])
+    assert len(trace.pending) == 100
+    ticks = env.flush_commands()
+
+    assert len(trace) == 50
+    assert not trace.pending
+    flushed_ticks = [record["flushed_tick"] for record in trace]
+    assert flushed_ticks == sorted(flushed_ticks)
+    assert flushed_ticks[-1] - trace.records[0]["queued_tick"] == ticks - 1
+    assert [record["id"] for record in trace] == list(range(50, 100))
+
+
+def test_reset_clears_queued_commands(make_env):
+    env = make_env()
+    trace = env.enable_command_trace()
+
+    env.send_world_command("OpenDoor")
+    env._command_center.clear()
+
+    assert [record["status"] for record in trace] == ["cleared"]
+
+
+def test_trace_exports_to_json(make_env, tmp_path):
+    env = make_env()
+    trace = env.enable_command_trace()
+    env.send_world_command("OpenDoor", [1])
+    env.tick()
+    env.send_world_command("CloseDoor", [1])
+
+    path = tmp_path / "trace.json"
+    trace.save(str(path))
+    records = json.loads(path.read_text())
+
+    assert [record["name"] for record in records] == ["OpenDoor", "CloseDoor"]
+    assert [record["status"] for record in records] == ["sent", "queued"]
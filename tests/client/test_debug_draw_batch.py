@@ -0,0 +1,102 @@
+import json
+
+import numpy as np
+import pytest
+
+from holodeck import util
+from holodeck.command import (
+    CommandCenter,
+    CommandsGroup,
+    DebugDrawBatchCommand,
+    DebugDrawCommand,
+    decode_binary_commands,
+)
+
+COMMAND_BUFFER_SIZE = 1048576
+
+
+def _per_call_group(draw_type, params):
+    group = CommandsGroup()
+    for row in params:
+        group.add_command(
+            DebugDrawCommand(
+                draw_type,
+                row[0:3].tolist(),
+                row[3:6].tolist(),
+                row[6:9].tolist(),
+                row[9],
+            )
+        )
+    return group
+
+
+@pytest.mark.parametrize("draw_type", [0, 3])
+def test_batch_matches_per_call_commands(draw_type):
+    params = np.random.uniform(-100, 100, (25, 10))
+    batch = CommandsGroup()
+    batch.add_command(DebugDrawBatchCommand(draw_type, params))
+    expected = _per_call_group(draw_type, params)
+
+    assert json.loads(batch.to_json()) == json.loads(expected.to_json())
+    assert decode_binary_commands(batch.to_binary()) == decode_binary_commands(
+        expected.to_binary()
+    )
+
+
+def test_colors_and_thickness_broadcast(make_env, monkeypatch):
+    env = make_env()
+    sent = []
+    monkeypatch.setattr(env, "_enqueue_command", sent.append)
+
+    starts = np.arange(12).reshape(4, 3)
+    colors = np.array([[1, 2, 3]] * 4)
+    util.draw_lines(env, starts, starts + 1, colors, thickness=[1, 2, 3, 4])
+    util.draw_points(env, starts)
+
+    lines, points = sent
+    assert lines.num_commands == points.num_commands == 4
+    assert lines.parameters[2] == [0, 6, 7, 8, 7, 8, 9, 1, 2, 3, 3]
+    assert points.parameters[2] == [3, 6, 7, 8, 0, 0, 0, 255, 0, 0, 10.0]
+
+
+def test_large_batches_are_chunked(make_env, monkeypatch):
+    env = make_env()
+    sent = []
+    monkeypatch.setattr(env, "_enqueue_command", sent.append)
+
+    util.draw_boxes(env, np.zeros((2500, 3)), [1, 1, 1])
+
+    assert [command.num_commands for command in sent] == [1000, 1000, 500]
+
+
+def test_point_cloud_spills_over_ticks(engine, make_env, monkeypatch):
+    env = make_env()
+    env._command_center.max_buffer = 40000
+    monkeypatch.setattr(util, "DRAW_BATCH_SIZE", 100)
+    engine.buffer("command_bool", [1], np.bool_)[0] = False
+    engine.buffer("command_capabilities", [1], np.uint8)[
+        0
+    ] = CommandCenter.BINARY_CAPABILITY
+    received = []
+
+    def on_tick(engine):
+        flag = engine.buffer("command_bool", [1], np.bool_)
+        if not flag[0]:
+            return
+        flag[0] = False
+        raw = engine.buffer("command_buffer", [COMMAND_BUFFER_SIZE], np.byte).tobytes()
+        received.extend(decode_binary_commands(raw))
+
+    engine.on_tick = on_tick
+    points = np.random.uniform(-10, 10, (2000, 3)).astype(np.float32)
+    util.draw_points(env, points)
+    ticks = env.flush_commands()
+
+    assert env._command_center.uses_binary
+    assert ticks > 1
+    assert len(received) == 2000
+    assert all(command_type == "DebugDraw" for command_type, _ in received)
+    np.testing.assert_array_equal(
+        np.array([params[1:4] for _, params in received], dtype=np.float32), points
+    )
+    assert not engine.errors
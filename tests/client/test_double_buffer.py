@@ -0,0 +1,37 @@
+import numpy as np
+
+
+def publish_next_slot(engine):
+    """Writes the tick count into the back slot, then flips the index like the engine would"""
+    key = "sphere0_LocationSensor"
+    slots = engine.buffer(key + "_sensor_data", [2, 3], np.float32)
+    index = engine.buffer(key + "_sensor_slot", [1], np.uint8)
+    back = 1 - index[0]
+    slots[back] = engine.ticks
+    index[0] = back
+
+
+def test_previous_state_survives_next_tick(engine, make_env):
+    """Validate that a zero-copy view of tick N is untouched while tick N+1 is written"""
+    env = make_env(double_buffer_sensors=True, copy_state=False)
+    engine.on_tick = publish_next_slot
+
+    first, _, _, _ = env.step([0, 0])
+    first_value = np.copy(first["LocationSensor"])
+    second, _, _, _ = env.step([0, 0])
+
+    assert np.all(first["LocationSensor"] == first_value)
+    assert np.all(second["LocationSensor"] == first_value + 1)
+    assert not engine.errors
+
+
+def test_sensor_data_follows_slot_index(engine, make_env):
+    env = make_env(double_buffer_sensors=True)
+    engine.on_tick = publish_next_slot
+    sensor = env.agents["sphere0"].sensors["LocationSensor"]
+
+    assert sensor.double_buffered
+    for _ in range(3):
+        state, _, _, _ = env.step([0, 0])
+        assert np.all(sensor.sensor_data == state["LocationSensor"])
+        assert sensor.sensor_data.shape == (3,)
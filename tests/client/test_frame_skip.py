@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from holodeck.exceptions import HolodeckException
+
+
+def count_ticks(terminal_at=None):
+    """Writes the tick count into the location sensor, cycling through a pattern that
+    max-pooling two ticks can be checked against, with a reward of 1 per tick"""
+
+    def on_tick(engine):
+        location = engine.buffer("sphere0_LocationSensor_sensor_data", [3], np.float32)
+        task = engine.buffer("sphere0_DistanceTask_sensor_data", [2], np.float32)
+        ticks = engine.ticks
+        location[:] = [ticks, -ticks, ticks % 2]
+        task[:] = [1, terminal_at is not None and ticks >= terminal_at]
+
+    return on_tick
+
+
+def test_state_is_only_copied_on_last_tick(engine, make_env, monkeypatch):
+    env = make_env()
+    engine.on_tick = count_ticks()
+    copies = []
+    create_copy = env._create_copy
+    monkeypatch.setattr(
+        env, "_create_copy", lambda obj: copies.append(1) or create_copy(obj)
+    )
+    start = engine.ticks
+
+    state, reward, terminal, info = env.step([0, 0], ticks=4)
+
+    assert len(copies) == 1
+    assert engine.ticks == start + 4
+    assert state["LocationSensor"][0] == start + 3
+    assert reward == 1
+    assert not terminal
+    assert set(info) == {"tick", "last_update_ticks"}
+
+
+def test_frame_skip_sums_rewards(engine, make_env):
+    env = make_env()
+    engine.on_tick = count_ticks()
+
+    _, reward, terminal, _ = env.step([0, 0], ticks=4, frame_skip=True)
+
+    assert reward == 4
+    assert not terminal
+
+
+def test_frame_skip_stops_on_terminal(engine, make_env):
+    env = make_env()
+    start = engine.ticks
+    engine.on_tick = count_ticks(terminal_at=start + 1)
+
+    state, reward, terminal, _ = env.step([0, 0], ticks=4, frame_skip=True)
+
+    assert terminal
+    assert reward == 2
+    assert engine.ticks == start + 2
+    assert state["LocationSensor"][0] == start + 1
+
+
+@pytest.mark.parametrize("copy_state", [True, False])
+def test_max_pool_last_two_ticks(engine, make_env, copy_state):
+    env = make_env(copy_state=copy_state)
+    engine.on_tick = count_ticks()
+    start = engine.ticks
+
+    state, _, _, _ = env.step([0, 0], ticks=3, max_pool=["LocationSensor"])
+
+    np.testing.assert_array_equal(state["LocationSensor"], [start + 2, -(start + 1), 1])
+    live = env.agents["sphere0"].sensors["LocationSensor"].sensor_data
+    np.testing.assert_array_equal(live, [start + 2, -(start + 2), start % 2])
+    assert state["DistanceTask"][0] == 1
+
+
+def test_max_pool_reuses_its_buffer(engine, make_env):
+    env = make_env(copy_state=False)
+    engine.on_tick = count_ticks()
+
+    first, _, _, _ = env.step([0, 0], ticks=2, max_pool=["LocationSensor"])
+    pool = first["LocationSensor"]
+    second, _, _, _ = env.step([0, 0], ticks=2, max_pool=["LocationSensor"])
+
+    assert second["LocationSensor"] is pool
+    assert env._state_dict["sphere0"]["LocationSensor"] is not pool
+
+
+def test_max_pool_needs_two_ticks(engine, make_env):
+    env = make_env()
+    engine.on_tick = count_ticks()
+    start = engine.ticks
+
+    state, _, _, _ = env.step([0, 0], max_pool=["LocationSensor"])
+
+    np.testing.assert_array_equal(state["LocationSensor"], [start, -start, start % 2])
+
+
+def test_max_pool_requires_main_agent(make_env):
+    scenario = {"name": "empty", "world": "TestWorld", "agents": []}
+    env = make_env(scenario)
+    with pytest.raises(HolodeckException):
+        env.step([0, 0], ticks=2, max_pool=["LocationSensor"])
@@ -0,0 +1,62 @@
+"""Tests for holodeck.gc, run against a temporary directory standing in for /dev/shm"""
+import os
+
+from holodeck import gc
+from holodeck.shmem import OWNER_KEY
+
+# No process has this pid, the kernel's pid_max is at most 2^22
+DEAD_PID = 2**22 + 1
+
+
+def _create_group(shm_dir, uuid, owner_pid):
+    paths = [
+        os.path.join(shm_dir, "HOLODECK_MEM" + uuid + "_sphere0_action"),
+        os.path.join(shm_dir, "sem.HOLODECK_SEMAPHORE_SERVER" + uuid),
+        os.path.join(shm_dir, "sem.HOLODECK_SEMAPHORE_CLIENT" + uuid),
+    ]
+    for path in paths:
+        with open(path, "wb") as f:
+            f.write(bytes(4096))
+    owner_path = os.path.join(shm_dir, "HOLODECK_MEM" + uuid + "_" + OWNER_KEY)
+    with open(owner_path, "w") as f:
+        f.write(str(owner_pid))
+    return set(paths + [owner_path])
+
+
+def test_only_dead_owners_are_orphaned(tmp_path):
+    """Resources of a live process are kept, those of a dead one are found"""
+    dead = _create_group(str(tmp_path), "dead-uuid", DEAD_PID)
+    _create_group(str(tmp_path), "live-uuid", os.getpid())
+    (tmp_path / "unrelated").write_bytes(b"")
+
+    orphans = gc.find_orphans(str(tmp_path), min_age=0)
+
+    assert {orphan.path for orphan in orphans} == dead
+    assert {orphan.uuid for orphan in orphans} == {"dead-uuid"}
+
+
+def test_dry_run_keeps_files(tmp_path):
+    dead = _create_group(str(tmp_path), "dead-uuid", DEAD_PID)
+
+    orphans = gc.collect(dry_run=True, shm_dir=str(tmp_path), min_age=0)
+
+    assert len(orphans) == len(dead)
+    assert all(os.path.exists(path) for path in dead)
+
+
+def test_collect_removes_orphans(tmp_path):
+    dead = _create_group(str(tmp_path), "dead-uuid", DEAD_PID)
+    live = _create_group(str(tmp_path), "live-uuid", os.getpid())
+
+    removed = gc.collect(shm_dir=str(tmp_path), min_age=0)
+
+    assert {orphan.path for orphan in removed} == dead
+    assert not any(os.path.exists(path) for path in dead)
+    assert all(os.path.exists(path) for path in live)
+
+
+def test_recent_files_are_kept(tmp_path):
+    """Environments that are still starting up may not have written an owner record yet"""
+    _create_group(str(tmp_path), "dead-uuid", DEAD_PID)
+
+    assert gc.find_orphans(str(tmp_path), min_age=3600) == []
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from holodeck.agents import TeleportFlags
+from holodeck.exceptions import HolodeckException
+from holodeck.vector import InWorldVecEnv, replicate_main_agent
+from tests.client.conftest import stand_in_config
+
+NAMES = ["sphere0", "sphere0_1", "sphere0_2"]
+
+
+def write_copies(engine):
+    """Every copy reports its index as its location and reward, and copy 1 is always done"""
+    for index, name in enumerate(NAMES):
+        location = engine.buffer(name + "_LocationSensor_sensor_data", [3], np.float32)
+        task = engine.buffer(name + "_DistanceTask_sensor_data", [2], np.float32)
+        location[:] = index
+        task[:] = [index * 10, index == 1]
+
+
+def test_replicate_main_agent():
+    scenario, names = replicate_main_agent(stand_in_config, 3, [5, 0, 0])
+
+    assert names == NAMES
+    assert [agent["location"] for agent in scenario["agents"]] == [
+        [0, 0, 0],
+        [5, 0, 0],
+        [10, 0, 0],
+    ]
+    assert scenario["agents"][2]["sensors"] == stand_in_config["agents"][0]["sensors"]
+    assert len(stand_in_config["agents"]) == 1
+
+
+def test_replicate_rejects_wrong_offsets():
+    with pytest.raises(HolodeckException):
+        replicate_main_agent(stand_in_config, 3, [[0, 0, 0], [1, 0, 0]])
+
+
+@pytest.fixture
+def vec_env(engine, make_env):
+    scenario, names = replicate_main_agent(
+        stand_in_config, 3, [[0, 0, 0], [0, 4, 0], [0, 8, 0]]
+    )
+    engine.on_tick = write_copies
+    return InWorldVecEnv(make_env(scenario, copy_state=False), names)
+
+
+def test_steps_are_stacked(vec_env):
+    obs = vec_env.reset()
+    assert obs["LocationSensor"].shape == (3, 3)
+
+    obs, rewards, terminals, infos = vec_env.step(np.zeros((3, 2)))
+
+    np.testing.assert_array_equal(obs["LocationSensor"][:, 0], [0, 1, 2])
+    np.testing.assert_array_equal(rewards, [0, 10, 20])
+    np.testing.assert_array_equal(terminals, [False, True, False])
+    assert infos[0] == {}
+    final = infos[1]["terminal_observation"]
+    np.testing.assert_array_equal(final["LocationSensor"], [1, 1, 1])
+    np.testing.assert_array_equal(final["DistanceTask"], [10, 1])
+
+
+def test_state_is_copied_once(monkeypatch, vec_env):
+    copies = []
+    monkeypatch.setattr(vec_env.env, "_create_copy", copies.append)
+    obs = vec_env.reset()
+    first = obs["LocationSensor"].copy()
+
+    vec_env.step(np.zeros((3, 2)))
+
+    assert copies == []
+    np.testing.assert_array_equal(obs["LocationSensor"], first)
+
+
+def test_rejects_columnar_state(make_env):
+    scenario, names = replicate_main_agent(stand_in_config, 2, [5, 0, 0])
+    with pytest.raises(HolodeckException):
+        InWorldVecEnv(make_env(scenario, columnar_state=True), names)
+
+
+def test_terminal_copies_are_put_back(engine, vec_env):
+    vec_env.reset()
+    agent = vec_env.env.agents["sphere0_1"]
+    agent.teleport([50, 50, 50])
+
+    vec_env.step(np.zeros((3, 2)))
+
+    assert agent._teleport_type_buffer[0] == TeleportFlags.TELEPORT_SET_PHYSICS_STATE
+    np.testing.assert_array_equal(agent._teleport_buffer, [0, 4, 0] + [0] * 9)
+    assert vec_env.env.agents["sphere0_2"]._teleport_type_buffer[0] == 0
+
+
+def test_actions_go_to_their_copy(vec_env):
+    vec_env.reset()
+    actions = np.arange(6).reshape(3, 2)
+    vec_env.step(actions)
+
+    for name, action in zip(NAMES, actions):
+        np.testing.assert_array_equal(vec_env.env.agents[name]._action_buffer, action)
+    with pytest.raises(HolodeckException):
+        vec_env.step(actions[:2])
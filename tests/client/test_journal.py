@@ -0,0 +1,178 @@
+import copy
+
+import numpy as np
+import pytest
+
+from holodeck.agents import AgentDefinition, SphereAgent
+from holodeck.environments import HolodeckEnvironment
+from holodeck.exceptions import HolodeckException
+from holodeck.journal import read_journal, replay
+from tests.client.conftest import stand_in_config
+from tests.utils.stand_in_engine import StandInEngine
+
+COMMAND_BUFFER_SIZE = 1048576
+
+
+def observe(seen):
+    """Returns an on_tick callback that records what the engine was handed every tick, and
+    consumes the command and teleport flags the way the engine does"""
+
+    def on_tick(engine):
+        commands = engine.buffer("command_bool", [1], np.bool_)
+        teleport = engine.buffer("sphere0_teleport_flag", [1], np.uint8)
+        tick = {
+            "reset": bool(engine.buffer("RESET", [1], np.bool_)[0]),
+            "action": engine.buffer("sphere0", [2], np.float32).tolist(),
+            "teleport": int(teleport[0]),
+            "teleport_command": engine.buffer(
+                "sphere0_teleport_command", [12], np.float32
+            ).tolist(),
+            "control_scheme": int(
+                engine.buffer("sphere0_control_scheme", [1], np.uint8)[0]
+            ),
+            "commands": None,
+        }
+        if commands[0]:
+            raw = engine.buffer("command_buffer", [COMMAND_BUFFER_SIZE], np.byte)
+            tick["commands"] = raw[:200].tobytes()
+            commands[0] = False
+        teleport[0] = 0
+        seen.append(tick)
+
+    return on_tick
+
+
+def _make_env(engine):
+    return HolodeckEnvironment(
+        scenario=copy.deepcopy(stand_in_config), start_world=False, uuid=engine.uuid
+    )
+
+
+def run_episode(env):
+    agent = env.agents["sphere0"]
+    env.set_control_scheme("sphere0", 1)
+    for i in range(30):
+        env.step(i % 4 if i > 10 else [i, 1.5])
+        if i == 5:
+            agent.teleport([1, 2, 3], [0, 0, 90])
+        if i == 10:
+            env.set_control_scheme("sphere0", 0)
+            env.send_world_command("OpenDoor", [i], ["left"])
+        if i == 20:
+            env.reset()
+
+
+def test_replay_hands_engine_the_same_ticks(tmp_path):
+    path = str(tmp_path / "episode.journal")
+    recorded = []
+    with StandInEngine() as engine:
+        env = _make_env(engine)
+        env.start_journal(path)
+        engine.on_tick = observe(recorded)
+        run_episode(env)
+        ticks = env.stop_journal()
+        env.__on_exit__()
+        assert not engine.errors
+
+    replayed = []
+    with StandInEngine() as engine:
+        env = _make_env(engine)
+        engine.on_tick = observe(replayed)
+        assert replay(env, path) == ticks
+        env.__on_exit__()
+        assert not engine.errors
+
+    assert ticks == len(recorded) > 30
+    assert replayed == recorded
+    assert any(tick["teleport"] for tick in recorded)
+    assert any(tick["reset"] for tick in recorded)
+
+
+def test_replay_allocates_buffers_the_env_lacks(tmp_path):
+    path = str(tmp_path / "episode.journal")
+    with StandInEngine() as engine:
+        env = _make_env(engine)
+        env.start_journal(path)
+        env.add_agent(AgentDefinition("extra", SphereAgent, max_height=1000))
+        env.set_control_scheme("extra", 1)
+        env.act("extra", [1, 2])
+        env.tick()
+        env.tick()
+        ticks = env.stop_journal()
+        env.__on_exit__()
+
+    assert "extra" in read_journal(path).buffers
+    with StandInEngine() as engine:
+        env = _make_env(engine)
+        seen = []
+        engine.on_tick = lambda e: seen.append(
+            e.buffer("extra", [2], np.float32).tolist()
+        )
+        assert replay(env, path) == ticks
+        assert "extra" not in env.agents
+        env.__on_exit__()
+        assert not engine.errors
+
+    assert seen[-1] == [1, 2]
+
+
+def test_unchanged_buffers_are_not_rewritten(make_env, tmp_path):
+    env = make_env()
+    path = str(tmp_path / "episode.journal")
+    env.start_journal(path)
+    for _ in range(10):
+        env.step([1, 1])
+    env.stop_journal()
+
+    journal = read_journal(path)
+    assert len(journal.ticks) == 10
+    assert journal.buffers["sphere0"] == (np.dtype(np.float32), [2])
+    assert [key for key, _ in journal.ticks[0][0]] == [
+        "RESET",
+        "sphere0",
+        "sphere0_teleport_flag",
+        "sphere0_teleport_command",
+        "sphere0_control_scheme",
+    ]
+    assert all(writes == [] for writes, _ in journal.ticks[1:])
+
+
+def test_flags_cleared_by_the_engine_are_written_again(engine, make_env, tmp_path):
+    env = make_env()
+    seen = []
+    engine.on_tick = observe(seen)
+    path = str(tmp_path / "episode.journal")
+    agent = env.agents["sphere0"]
+    env.start_journal(path)
+    agent.teleport([1, 2, 3])
+    env.tick()
+    agent.teleport([1, 2, 3])
+    env.tick()
+    env.stop_journal()
+    assert not engine.errors
+
+    journal = read_journal(path)
+    flags = [
+        [contents for key, contents in writes if key == "sphere0_teleport_flag"]
+        for writes, _ in journal.ticks
+    ]
+    assert len(flags[0]) == len(flags[1]) == 1
+    assert flags[0] == flags[1]
+    assert seen[-2]["teleport"] == seen[-1]["teleport"] != 0
+
+
+def test_only_one_journal_at_a_time(make_env, tmp_path):
+    env = make_env()
+    env.start_journal(str(tmp_path / "a.journal"))
+    with pytest.raises(HolodeckException):
+        env.start_journal(str(tmp_path / "b.journal"))
+    env.stop_journal()
+    with pytest.raises(HolodeckException):
+        env.stop_journal()
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not.journal"
+    path.write_bytes(b"{}")
+    with pytest.raises(HolodeckException):
+        read_journal(str(path))
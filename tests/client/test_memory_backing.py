@@ -0,0 +1,80 @@
+import os
+import uuid
+
+import numpy as np
+
+from holodeck.shmem import MemoryBacking, Shmem, ShmemArena
+
+CAMERA_SHAPE = [720, 1280, 4]
+
+
+def _resident_bytes(path):
+    return os.stat(path).st_blocks * 512
+
+
+def test_prefault_allocates_pages():
+    shmem = Shmem(
+        "camera",
+        CAMERA_SHAPE,
+        np.uint8,
+        str(uuid.uuid4()),
+        MemoryBacking(prefault=True),
+    )
+    try:
+        assert shmem.backing == [MemoryBacking.PREFAULT]
+        assert _resident_bytes(shmem._mem_path) >= shmem.size_bytes
+        assert not shmem.np_array.any()
+    finally:
+        shmem.unlink()
+
+
+def test_small_buffers_are_not_backed():
+    shmem = Shmem(
+        "flag", [1], np.uint8, str(uuid.uuid4()), MemoryBacking(prefault=True)
+    )
+    try:
+        assert shmem.backing == []
+    finally:
+        shmem.unlink()
+
+
+def test_unsupported_options_are_skipped():
+    """Every option either takes effect or is left out, allocating never fails"""
+    backing = MemoryBacking(huge_pages=True, prefault=True, lock=True)
+    shmem = Shmem("camera", CAMERA_SHAPE, np.uint8, str(uuid.uuid4()), backing)
+    try:
+        assert MemoryBacking.PREFAULT in shmem.backing
+        assert set(shmem.backing) <= {
+            MemoryBacking.HUGE_PAGES,
+            MemoryBacking.PREFAULT,
+            MemoryBacking.LOCK,
+        }
+        shmem.np_array[:] = 1
+    finally:
+        shmem.unlink()
+
+
+def test_arena_slots_are_backed():
+    arena = ShmemArena(64 << 20, str(uuid.uuid4()))
+    try:
+        before = _resident_bytes(arena._mem_path)
+        camera = arena.allocate(
+            "camera", CAMERA_SHAPE, np.uint8, MemoryBacking(prefault=True)
+        )
+        location = arena.allocate(
+            "location", [3], np.float32, MemoryBacking(prefault=True)
+        )
+
+        assert camera.backing == [MemoryBacking.PREFAULT]
+        assert location.backing == []
+        assert _resident_bytes(arena._mem_path) - before >= camera.size_bytes
+    finally:
+        arena.unlink()
+
+
+def test_environment_applies_backing(make_env):
+    env = make_env(memory_backing=MemoryBacking(prefault=True))
+
+    report = {key: mem.backing for key, mem in env._client._memory.items()}
+    assert report["command_buffer"] == [MemoryBacking.PREFAULT]
+    assert report["RESET"] == []
@@ -0,0 +1,51 @@
+import numpy as np
+
+from holodeck.holodeckclient import HolodeckClient
+from holodeck.shmem import TickHeader
+from tests.utils.stand_in_engine import StandInEngine
+
+
+def test_memory_report_breakdown(make_env):
+    """Validate that the report attributes every buffer to its agent, sensor or the
+    environment itself, and that the totals add up
+    """
+    env = make_env()
+    report = env.memory_report()
+
+    agent = report["agents"]["sphere0"]
+    assert agent["action"] == 2 * 4
+    assert agent["teleport_flag"] == 1
+    assert agent["teleport_command"] == 12 * 4
+    assert agent["control_scheme"] == 1
+    assert agent["sensors"] == {"LocationSensor": 3 * 4, "DistanceTask": 2 * 4}
+    assert agent["total"] == 8 + 1 + 48 + 1 + 20
+
+    assert report["internal"]["command_buffer"] == 1048576
+    assert report["internal"]["RESET"] == 1
+    # The tick counter and the stamps of every sensor share one block
+    assert report["internal"]["tick_header"] == TickHeader.size_bytes()
+
+    assert report["total"] == agent["total"] + sum(report["internal"].values())
+    assert report["mapped"] == report["total"]
+    assert report["process_total"] >= report["mapped"]
+
+
+def test_process_total_covers_live_clients(make_env):
+    env = make_env()
+    before = HolodeckClient.process_mapped_bytes()
+
+    with StandInEngine() as other_engine:
+        client = HolodeckClient(other_engine.uuid)
+        client.malloc("extra", [1024], np.float32)
+        assert HolodeckClient.process_mapped_bytes() == before + 4096
+        client.unlink()
+
+    assert env.memory_report()["process_total"] == before
+
+
+def test_arena_memory_report(make_env):
+    env = make_env(arena_size=16 * 1024 * 1024)
+    report = env.memory_report()
+
+    assert report["mapped"] == 16 * 1024 * 1024
+    assert report["agents"]["sphere0"]["sensors"]["LocationSensor"] == 12
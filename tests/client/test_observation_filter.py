@@ -0,0 +1,81 @@
+import copy
+
+import numpy as np
+import pytest
+
+from holodeck.exceptions import HolodeckException
+from tests.client.conftest import stand_in_config
+
+
+def write_task(engine):
+    task = engine.buffer("sphere0_DistanceTask_sensor_data", [2], np.float32)
+    task[:] = [0.5, 1]
+
+
+def test_filter_restricts_state(engine, make_env, monkeypatch):
+    env = make_env()
+    engine.on_tick = write_task
+    env.set_observation_filter({"sphere0": ["LocationSensor"]})
+    copied = []
+    create_copy = env._create_copy
+    monkeypatch.setattr(
+        env, "_create_copy", lambda obj: copied.append(set(obj)) or create_copy(obj)
+    )
+
+    state, reward, terminal, _ = env.step([0, 0])
+
+    assert set(state) == {"LocationSensor"}
+    assert copied == [{"LocationSensor"}]
+    # The reward and terminal still come from the filtered out task sensor
+    assert reward == 0.5
+    assert terminal
+
+
+def test_filter_applies_per_agent(make_env):
+    scenario = copy.deepcopy(stand_in_config)
+    other = copy.deepcopy(scenario["agents"][0])
+    other["agent_name"] = "sphere1"
+    scenario["agents"].append(other)
+    env = make_env(scenario)
+
+    env.set_observation_filter({"sphere1": []})
+    state = env.tick()
+
+    assert set(state["sphere0"]) == {"LocationSensor", "DistanceTask"}
+    assert state["sphere1"] == {}
+
+
+def test_filter_without_copy_keeps_references(make_env):
+    env = make_env(copy_state=False)
+    env.set_observation_filter({"sphere0": ["LocationSensor"]})
+
+    state = env.tick()
+
+    location = env.agents["sphere0"].sensors["LocationSensor"].sensor_data
+    assert state["LocationSensor"] is location
+    assert set(env._state_dict["sphere0"]) == {"LocationSensor", "DistanceTask"}
+
+
+def test_filter_from_scenario(make_env):
+    scenario = copy.deepcopy(stand_in_config)
+    scenario["observation_filter"] = {"sphere0": ["DistanceTask"]}
+    env = make_env(scenario)
+
+    assert set(env.reset()) == {"DistanceTask"}
+
+    env.set_observation_filter(None)
+    assert set(env.tick()) == {"LocationSensor", "DistanceTask"}
+
+
+def test_unknown_sensors_are_rejected(make_env):
+    env = make_env()
+    with pytest.raises(HolodeckException):
+        env.set_observation_filter({"sphere0": ["RGBCamera"]})
+
+
+def test_scenario_filter_is_checked(make_env):
+    scenario = copy.deepcopy(stand_in_config)
+    scenario["observation_filter"] = {"sphere0": ["LocationSensr"]}
+
+    with pytest.raises(HolodeckException):
+        make_env(scenario)
@@ -0,0 +1,99 @@
+import copy
+
+import numpy as np
+import pytest
+
+from holodeck.exceptions import HolodeckException
+from holodeck.sensors import SensorDefinition
+from tests.client.conftest import stand_in_config
+
+
+def imu_config():
+    scenario = copy.deepcopy(stand_in_config)
+    scenario["agents"][0]["sensors"].append({"sensor_type": "IMUSensor"})
+    return scenario
+
+
+def write_sensors(engine):
+    location = engine.buffer("sphere0_LocationSensor_sensor_data", [3], np.float32)
+    imu = engine.buffer("sphere0_IMUSensor_sensor_data", [2, 3], np.float32)
+    location[:] = engine.ticks
+    imu[:] = np.arange(6).reshape(2, 3)
+
+
+def test_packs_sensors_in_order(engine, make_env):
+    env = make_env(imu_config())
+    engine.on_tick = write_sensors
+    agent = env.agents["sphere0"]
+
+    layout = agent.pack_observations(["IMUSensor", "LocationSensor"])
+    env.tick()
+    vector = agent.packed_observation()
+
+    assert len(layout) == 9
+    assert layout.slices == {"IMUSensor": slice(0, 6), "LocationSensor": slice(6, 9)}
+    assert vector.dtype == np.float32
+    assert np.all(vector[:6] == np.arange(6))
+    assert np.all(vector[6:] == engine.ticks - 1)
+    assert layout.sensor_at(5) == "IMUSensor"
+    assert layout.sensor_at(6) == "LocationSensor"
+
+    unpacked = layout.unpack(vector)
+    assert unpacked["IMUSensor"].shape == (2, 3)
+    assert np.shares_memory(unpacked["LocationSensor"], vector)
+
+
+def test_reuses_vector_every_tick(engine, make_env):
+    env = make_env(imu_config())
+    engine.on_tick = write_sensors
+    agent = env.agents["sphere0"]
+    agent.pack_observations(["LocationSensor"])
+
+    env.tick()
+    first = agent.packed_observation()
+    env.tick()
+    second = agent.packed_observation()
+
+    assert first is second
+    assert np.all(second == engine.ticks - 1)
+
+
+def test_casts_to_dtype(engine, make_env):
+    env = make_env(imu_config())
+    engine.on_tick = write_sensors
+    agent = env.agents["sphere0"]
+    agent.pack_observations(dtype=np.float64)
+
+    env.tick()
+    vector = agent.packed_observation()
+
+    assert vector.dtype == np.float64
+    assert agent.packed_layout.sensor_names == [
+        "LocationSensor",
+        "DistanceTask",
+        "IMUSensor",
+    ]
+    assert vector.shape == (11,)
+
+
+def test_layout_follows_sensor_changes(make_env):
+    env = make_env()
+    agent = env.agents["sphere0"]
+    agent.pack_observations()
+    assert len(agent.packed_layout) == 5
+
+    agent.add_sensors(SensorDefinition("sphere0", "SphereAgent", "IMU", "IMUSensor"))
+    assert len(agent.packed_observation()) == 11
+
+    agent.pack_observations(["IMU"])
+    agent.remove_sensors(SensorDefinition("sphere0", "SphereAgent", "IMU", "IMUSensor"))
+    with pytest.raises(HolodeckException):
+        agent.packed_observation()
+
+
+def test_requires_pack_observations(make_env):
+    env = make_env()
+
+    assert env.agents["sphere0"].packed_layout is None
+    with pytest.raises(HolodeckException):
+        env.agents["sphere0"].packed_observation()
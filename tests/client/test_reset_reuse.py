@@ -0,0 +1,77 @@
+import copy
+
+import pytest
+
+from tests.client.conftest import stand_in_config
+
+
+@pytest.fixture
+def sent_commands(monkeypatch):
+    """Returns a function that starts recording the command strings an environment sends"""
+    sent = []
+
+    def _record(env):
+        write = env._command_center._write_to_command_buffer
+
+        def _write(to_write):
+            sent.append(to_write)
+            write(to_write)
+
+        monkeypatch.setattr(env._command_center, "_write_to_command_buffer", _write)
+        return sent
+
+    return _record
+
+
+def test_reset_reuses_agents(make_env, sent_commands):
+    """Agents, sensors and their state stay the same objects, while the spawn commands are
+    still sent every episode
+    """
+    env = make_env()
+    agent = env.agents["sphere0"]
+    state = agent.agent_state_dict
+    location = agent.sensors["LocationSensor"].sensor_data
+    agent.set_control_scheme(0)
+    agent.teleport([1, 2, 3])
+
+    sent = sent_commands(env)
+    env.reset()
+
+    assert env.agents["sphere0"] is agent
+    assert env.get_main_agent() is agent
+    assert agent.agent_state_dict is state
+    assert agent.sensors["LocationSensor"].sensor_data is location
+
+    # Back to the state of a newly built agent before the scenario is applied
+    assert agent._teleport_type_buffer[0] == 0
+    assert agent._current_control_scheme == 1
+
+    commands = "".join(sent)
+    assert commands.count("SpawnAgent") == 1
+    assert commands.count("AddSensor") == 2
+
+
+def test_changed_agents_are_rebuilt(make_env):
+    env = make_env()
+    agent = env.agents["sphere0"]
+
+    scenario = copy.deepcopy(stand_in_config)
+    scenario["agents"][0]["sensors"].append({"sensor_type": "RotationSensor"})
+    env._scenario = scenario
+    env.reset()
+
+    assert env.agents["sphere0"] is not agent
+    assert set(env.agents["sphere0"].sensors) == {
+        "LocationSensor",
+        "DistanceTask",
+        "RotationSensor",
+    }
+
+
+def test_reuse_can_be_disabled(make_env):
+    env = make_env(reuse_agents_on_reset=False)
+    agent = env.agents["sphere0"]
+
+    env.reset()
+
+    assert env.agents["sphere0"] is not agent
@@ -0,0 +1,71 @@
+import os
+
+import numpy as np
+
+from holodeck.shmem import TickHeader
+
+
+def capture_every_other_tick(engine):
+    """Counts ticks like the engine would, and only writes the location on even ticks"""
+    header = TickHeader(
+        engine.buffer(TickHeader.KEY, [TickHeader.size_bytes()], np.uint8)
+    )
+    header.counter[0] += 1
+    tick = header.counter[0]
+    if tick % 2 == 0:
+        location = engine.buffer("sphere0_LocationSensor_sensor_data", [3], np.float32)
+        location[:] = tick
+        header.ticks[header.slot("sphere0_LocationSensor")] = tick
+
+
+def test_step_info_reports_fresh_sensors(engine, make_env):
+    env = make_env()
+    engine.on_tick = capture_every_other_tick
+    sensor = env.agents["sphere0"].sensors["LocationSensor"]
+
+    for _ in range(4):
+        state, _, _, info = env.step([0, 0])
+        tick = info["tick"]
+
+        assert tick == env.engine_tick
+        assert info["last_update_ticks"]["LocationSensor"] == sensor.last_update_tick
+        assert info["last_update_ticks"]["DistanceTask"] == 0
+        if tick % 2 == 0:
+            assert sensor.last_update_tick == tick
+            assert state["LocationSensor"][0] == tick
+        else:
+            assert sensor.last_update_tick == tick - 1
+
+    assert not engine.errors
+
+
+def test_stamps_are_zero_without_engine_support(make_env):
+    env = make_env()
+    _, _, _, info = env.step([0, 0])
+
+    assert info == {
+        "tick": 0,
+        "last_update_ticks": {"LocationSensor": 0, "DistanceTask": 0},
+    }
+
+
+def test_stamps_share_one_block(engine, make_env):
+    make_env()
+
+    header = TickHeader(
+        engine.buffer(TickHeader.KEY, [TickHeader.size_bytes()], np.uint8)
+    )
+    assert header.slot("sphere0_LocationSensor") == 0
+    assert header.slot("sphere0_DistanceTask") == 1
+    assert not any(name.endswith("_sensor_tick") for name in os.listdir("/dev/shm"))
+
+
+def test_rebuilt_sensor_keeps_its_slot(make_env):
+    env = make_env(reuse_agents_on_reset=False)
+    header = env._client.tick_header
+    header.ticks[0] = 5
+
+    env.reset()
+
+    assert header.slot("sphere0_LocationSensor") == 0
+    assert env.agents["sphere0"].sensors["LocationSensor"].last_update_tick == 0
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+
+def write_location(engine):
+    location = engine.buffer("sphere0_LocationSensor_sensor_data", [3], np.float32)
+    location[:] = engine.ticks
+
+
+def test_dlpack_is_zero_copy(engine, make_env):
+    env = make_env()
+    engine.on_tick = write_location
+    env.tick()
+    sensor = env.agents["sphere0"].sensors["LocationSensor"]
+
+    view = sensor.view()
+    tensor = np.from_dlpack(view)
+
+    assert np.shares_memory(tensor, sensor.sensor_data)
+    assert np.all(tensor == sensor.sensor_data)
+    assert view.shape == (3,)
+    assert view.dtype == np.float32
+
+
+def test_view_is_read_only(make_env):
+    env = make_env()
+    view = env.agents["sphere0"].sensors["LocationSensor"].view()
+
+    array = np.asarray(view)
+    assert np.shares_memory(array, view.array)
+    with pytest.raises(ValueError):
+        array[0] = 1
+
+
+def test_view_goes_stale_after_tick(engine, make_env):
+    env = make_env()
+    engine.on_tick = write_location
+
+    views = env.agents["sphere0"].state_views()
+    assert set(views) == {"LocationSensor", "DistanceTask"}
+    assert not any(view.stale for view in views.values())
+
+    sequence = views["LocationSensor"].sequence
+    env.tick()
+
+    assert all(view.stale for view in views.values())
+    assert (
+        env.agents["sphere0"].sensors["LocationSensor"].view().sequence == sequence + 1
+    )
+
+
+def test_double_buffered_view_lives_one_more_tick(make_env):
+    env = make_env(double_buffer_sensors=True)
+    view = env.agents["sphere0"].sensors["LocationSensor"].view()
+
+    env.tick()
+    assert not view.stale
+    env.tick()
+    assert view.stale
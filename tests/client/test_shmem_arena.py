@@ -0,0 +1,136 @@
+import mmap
+
+import numpy as np
+
+from holodeck.holodeckclient import HolodeckClient
+from tests.utils.stand_in_engine import read_arena_manifest
+
+
+def test_arena_offsets_are_aligned_and_disjoint(engine):
+    """Validate that the engine side can find every buffer through the manifest, and that the
+    buffers are aligned and do not overlap.
+    """
+    client = HolodeckClient(engine.uuid, arena_size=64 * 1024 * 1024)
+    buffers = {
+        "command_bool": ([1], np.bool),
+        "command_buffer": ([1048576], np.byte),
+        "uav0": ([4], np.float32),
+        "uav0_teleport_flag": ([1], np.uint8),
+        "uav0_RGBCamera_sensor_data": ([256, 256, 4], np.uint8),
+        "uav0_IMUSensor_sensor_data": ([2, 3], np.float32),
+    }
+    for key, (shape, dtype) in buffers.items():
+        client.malloc(key, shape, dtype)
+
+    manifest = read_arena_manifest("/dev/shm/HOLODECK_MEM" + engine.uuid + "_ARENA")
+    assert set(manifest) == set(buffers)
+
+    spans = []
+    for key, (offset, size_bytes, dtype) in manifest.items():
+        shape, expected_dtype = buffers[key]
+        assert np.dtype(dtype) == np.dtype(expected_dtype)
+        assert size_bytes == np.dtype(expected_dtype).itemsize * np.prod(shape)
+        assert offset % 64 == 0
+        if size_bytes >= mmap.PAGESIZE:
+            assert offset % mmap.PAGESIZE == 0
+        spans.append((offset, offset + size_bytes))
+
+    spans.sort()
+    for (_, end), (start, _) in zip(spans, spans[1:]):
+        assert end <= start
+
+    client.unlink()
+
+
+def test_arena_buffers_are_shared_with_engine(engine):
+    """Validate that writes from the engine side show up in the client's arrays"""
+    client = HolodeckClient(engine.uuid, arena_size=4 * 1024 * 1024)
+    imu = client.malloc("uav0_IMUSensor_sensor_data", [2, 3], np.float32)
+    action = client.malloc("uav0", [4], np.float32)
+
+    engine.buffer("uav0_IMUSensor_sensor_data", [2, 3], np.float32)[:] = 7
+    action[:] = [1, 2, 3, 4]
+
+    assert np.all(imu == 7)
+    assert np.all(engine.buffer("uav0", [4], np.float32) == [1, 2, 3, 4])
+
+    client.unlink()
+
+
+def test_arena_reallocation_updates_manifest(engine):
+    """Validate that growing a buffer moves it and points the manifest entry at the new slice"""
+    client = HolodeckClient(engine.uuid, arena_size=4 * 1024 * 1024)
+    path = "/dev/shm/HOLODECK_MEM" + engine.uuid + "_ARENA"
+
+    client.malloc("sensor", [8], np.float32)
+    client.malloc("action", [4], np.float32)
+    small_offset = read_arena_manifest(path)["sensor"][0]
+
+    client.malloc("sensor", [4], np.float32)
+    assert read_arena_manifest(path)["sensor"][0] == small_offset
+
+    client.malloc("sensor", [4096], np.float32)
+    manifest = read_arena_manifest(path)
+    assert len(manifest) == 2
+    assert manifest["sensor"][0] != small_offset
+    assert manifest["sensor"][1] == 4096 * 4
+
+    client.unlink()
+
+
+def test_arena_reuses_outgrown_slices(engine):
+    """Validate that reallocating buffers at larger sizes doesn't use up the arena"""
+    client = HolodeckClient(engine.uuid, arena_size=4 * 1024 * 1024)
+    arena = client._arena
+    path = "/dev/shm/HOLODECK_MEM" + engine.uuid + "_ARENA"
+
+    client.malloc("sensor", [16], np.float32)
+    client.malloc("action", [4], np.float32)
+    old_offset = read_arena_manifest(path)["sensor"][0]
+    client.malloc("sensor", [32], np.float32)
+    used = arena.used_bytes
+
+    # The outgrown slice is handed to the next buffer that fits in it, zeroed
+    arena_view = np.frombuffer(arena._mem_pointer, dtype=np.uint8)
+    arena_view[old_offset : old_offset + 64] = 1
+    teleport = client.malloc("teleport", [8], np.float32)
+    assert read_arena_manifest(path)["teleport"][0] == old_offset
+    assert np.all(teleport == 0)
+    assert arena.used_bytes == used
+
+    # The last slice grows in place
+    for size in range(64, 4096, 64):
+        client.malloc("sensor", [size], np.float32)
+    assert arena.used_bytes <= used + size * 4 + mmap.PAGESIZE
+
+    client.unlink()
+
+
+def test_arena_survives_shrink_grow_cycles(engine):
+    """Validate that a buffer reallocated smaller keeps the capacity of its slice, and that
+    freed slices are merged"""
+    client = HolodeckClient(engine.uuid, arena_size=1024 * 1024)
+    arena = client._arena
+
+    client.malloc("camera", [64, 64, 4], np.uint8)
+    client.malloc("after", [4], np.float32)
+    used = arena.used_bytes
+    for _ in range(200):
+        client.malloc("camera", [32, 32, 4], np.uint8)
+        client.malloc("camera", [64, 64, 4], np.uint8)
+    assert arena.used_bytes == used
+
+    # Neighbouring slices freed one after the other are merged, and given back to the end
+    client.malloc("first", [8, 1024], np.uint8)
+    client.malloc("second", [8, 1024], np.uint8)
+    before = arena.used_bytes
+    client.malloc("first", [64, 1024], np.uint8)
+    client.malloc("second", [64, 1024], np.uint8)
+    client.malloc("first", [96, 1024], np.uint8)
+    client.malloc("second", [96, 1024], np.uint8)
+    # The second buffer fits in the merged slices of the first two sizes
+    assert arena.used_bytes <= before + (64 + 64 + 96) * 1024
+    assert arena._entries["second"][1] < arena._entries["first"][1]
+    assert arena._free_slices == sorted(arena._free_slices)
+
+    client.unlink()
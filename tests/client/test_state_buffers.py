@@ -0,0 +1,69 @@
+import copy
+
+import numpy as np
+import pytest
+
+from holodeck.exceptions import HolodeckException
+from tests.client.conftest import stand_in_config
+
+
+def write_tick_count(engine):
+    location = engine.buffer("sphere0_LocationSensor_sensor_data", [3], np.float32)
+    location[:] = engine.ticks
+
+
+def test_step_copies_into_out(engine, make_env):
+    env = make_env()
+    engine.on_tick = write_tick_count
+    out = env.allocate_state()
+    location = out["LocationSensor"]
+
+    state, _, _, _ = env.step([0, 0], out=out)
+    first = state["LocationSensor"][0]
+    state, _, _, _ = env.step([0, 0], out=out)
+
+    assert state is out
+    assert state["LocationSensor"] is location
+    assert state["LocationSensor"][0] == first + 1
+    assert not np.shares_memory(location, env._state_dict["sphere0"]["LocationSensor"])
+
+
+def test_tick_copies_into_out(make_env):
+    scenario = copy.deepcopy(stand_in_config)
+    other = copy.deepcopy(scenario["agents"][0])
+    other["agent_name"] = "sphere1"
+    scenario["agents"].append(other)
+    env = make_env(scenario, copy_state=False)
+    out = env.allocate_state()
+
+    assert set(out) == {"sphere0", "sphere1"}
+    assert env.tick(out=out) is out
+
+
+def test_out_must_match_state(make_env):
+    env = make_env()
+    out = env.allocate_state()
+    del out["DistanceTask"]
+
+    with pytest.raises(HolodeckException):
+        env.step([0, 0], out=out)
+
+
+def test_pool_recycles_states(engine, make_env):
+    env = make_env(state_pool_size=2)
+    engine.on_tick = write_tick_count
+
+    states = [env.step([0, 0])[0] for _ in range(4)]
+
+    assert states[0] is states[2]
+    assert states[1] is states[3]
+    assert states[0] is not states[1]
+    assert states[3]["LocationSensor"][0] == states[2]["LocationSensor"][0] + 1
+
+
+def test_pool_follows_observation_filter(make_env):
+    env = make_env(state_pool_size=1)
+    env.tick()
+
+    env.set_observation_filter({"sphere0": ["LocationSensor"]})
+    assert set(env.tick()) == {"LocationSensor"}
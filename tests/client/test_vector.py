@@ -0,0 +1,129 @@
+import copy
+import functools
+import os
+
+import numpy as np
+import pytest
+
+from holodeck.environments import HolodeckEnvironment
+from holodeck.exceptions import HolodeckException
+from holodeck.vector import VecEnv
+from tests.client.conftest import stand_in_config
+from tests.utils.stand_in_engine import StandInEngine
+
+EPISODE_LENGTH = 6
+
+
+def play_episodes(offset, engine):
+    """Writes the number of the episode into the location sensor, and ends an episode every
+    EPISODE_LENGTH ticks. The engine takes back the reset flag when it resets"""
+    reset = engine.buffer("RESET", [1], np.bool_)
+    task = engine.buffer("sphere0_DistanceTask_sensor_data", [2], np.float32)
+    location = engine.buffer("sphere0_LocationSensor_sensor_data", [3], np.float32)
+    engine.ticks_since_reset = getattr(engine, "ticks_since_reset", 0) + 1
+    if reset[0]:
+        reset[0] = False
+        engine.episode = getattr(engine, "episode", 0) + 1
+        engine.ticks_since_reset = 0
+    location[:] = [offset, engine.episode, os.getpid()]
+    task[:] = [offset + 0.5, engine.ticks_since_reset % EPISODE_LENGTH == 0]
+
+
+def make_stand_in_env(offset, sensors=None):
+    scenario = copy.deepcopy(stand_in_config)
+    if sensors is not None:
+        scenario["agents"][0]["sensors"] = sensors
+    engine = StandInEngine(on_tick=functools.partial(play_episodes, offset)).start()
+    return HolodeckEnvironment(
+        scenario=scenario, start_world=False, uuid=engine.uuid, pre_start_steps=0
+    )
+
+
+@pytest.fixture
+def vec_env():
+    envs = []
+
+    def _vec_env(num_envs, **kwargs):
+        env_fns = [functools.partial(make_stand_in_env, i) for i in range(num_envs)]
+        envs.append(VecEnv(env_fns, **kwargs))
+        return envs[-1]
+
+    yield _vec_env
+
+    for env in envs:
+        env.close()
+
+
+def test_steps_are_stacked(vec_env):
+    envs = vec_env(3)
+    obs = envs.reset()
+
+    assert set(obs) == {"LocationSensor", "DistanceTask"}
+    assert obs["LocationSensor"].shape == (3, 3)
+    assert len(set(obs["LocationSensor"][:, 2])) == 3  # One process per environment
+
+    obs, rewards, terminals, infos = envs.step(np.zeros((3, 2)))
+    np.testing.assert_array_equal(obs["LocationSensor"][:, 0], [0, 1, 2])
+    np.testing.assert_array_equal(rewards, [0.5, 1.5, 2.5])
+    assert rewards.dtype == np.float32
+    assert not terminals.any()
+    assert len(infos) == 3
+    assert {"tick", "last_update_ticks"} <= set(infos[0])
+
+
+def test_auto_reset_keeps_final_observation(vec_env):
+    envs = vec_env(2)
+    episodes = envs.reset()["LocationSensor"][:, 1]
+
+    for _ in range(EPISODE_LENGTH * 2):
+        obs, _, terminals, infos = envs.step(np.zeros((2, 2)))
+        if terminals.all():
+            break
+
+    assert terminals.all()
+    for index, info in enumerate(infos):
+        assert info["terminal_observation"]["LocationSensor"][1] == episodes[index]
+    # The returned observation is the first of the next episode
+    np.testing.assert_array_equal(obs["LocationSensor"][:, 1], episodes + 1)
+
+
+def test_observations_are_views_without_copy(vec_env):
+    envs = vec_env(2, copy_obs=False)
+    obs = envs.reset()
+    obs["LocationSensor"][:] = -1
+
+    envs.step(np.zeros((2, 2)))
+    assert (obs["LocationSensor"][:, 0] == [0, 1]).all()
+
+
+def test_wrong_number_of_actions(vec_env):
+    envs = vec_env(2)
+    envs.reset()
+    with pytest.raises(HolodeckException):
+        envs.step(np.zeros((3, 2)))
+
+
+def test_mismatched_environments_are_rejected():
+    env_fns = [
+        functools.partial(make_stand_in_env, 0),
+        functools.partial(make_stand_in_env, 1, [{"sensor_type": "DistanceTask"}]),
+    ]
+    with pytest.raises(HolodeckException):
+        VecEnv(env_fns)
+
+
+def test_worker_errors_are_raised(vec_env):
+    envs = vec_env(2)
+    envs.reset()
+    with pytest.raises(HolodeckException, match="Environment 0"):
+        envs.step([np.zeros(100), np.zeros(2)])
+
+
+def test_close_frees_shared_memory(vec_env):
+    envs = vec_env(2)
+    path = envs._shmem._mem_path
+    assert os.path.exists(path)
+
+    envs.close()
+    assert not os.path.exists(path)
+    assert not any(process.is_alive() for process in envs._processes)
@@ -0,0 +1,149 @@
+"""A stand-in for the Holodeck engine, for testing the client side of the shared memory
+protocol without a world binary.
+
+The stand-in creates the semaphores that the engine would normally create, and services ticks
+on a background thread (or process): every time the client releases the server semaphore it
+runs an optional ``on_tick`` callback and releases the client semaphore again.
+"""
+import multiprocessing
+import os
+import struct
+import threading
+import uuid as uuid_module
+
+import numpy as np
+import posix_ipc
+
+
+class StandInEngine:
+    """Minimal engine double.
+
+    Args:
+        uuid (:obj:`str`, optional): UUID to create the semaphores for. A random one is used if
+            not given.
+        on_tick (callable, optional): Called with the engine as its only argument on every tick,
+            while the engine owns the shared memory.
+        use_process (:obj:`bool`, optional): Service ticks from a separate process instead of a
+            thread, so the engine does not compete with the client for the GIL.
+    """
+
+    def __init__(self, uuid=None, on_tick=None, use_process=False):
+        self.uuid = str(uuid_module.uuid4()) if uuid is None else uuid
+        self.on_tick = on_tick
+        self._server = posix_ipc.Semaphore(
+            "/HOLODECK_SEMAPHORE_SERVER" + self.uuid, os.O_CREAT, initial_value=0
+        )
+        self._client = posix_ipc.Semaphore(
+            "/HOLODECK_SEMAPHORE_CLIENT" + self.uuid, os.O_CREAT, initial_value=1
+        )
+        self._use_process = use_process
+        if use_process:
+            self._stop = multiprocessing.Event()
+            self._ticks = multiprocessing.Value("q", 0, lock=False)
+        else:
+            self._stop = threading.Event()
+            self._ticks = None
+        self._tick_count = 0
+        self._runner = None
+        self.errors = []
+
+    @property
+    def ticks(self):
+        """Number of ticks serviced so far"""
+        return self._ticks.value if self._use_process else self._tick_count
+
+    def start(self):
+        if self._use_process:
+            self._runner = multiprocessing.get_context("fork").Process(
+                target=self._run, daemon=True
+            )
+        else:
+            self._runner = threading.Thread(target=self._run, daemon=True)
+        self._runner.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._runner is not None:
+            self._runner.join(5)
+        for sem in (self._server, self._client):
+            try:
+                sem.unlink()
+            except posix_ipc.ExistentialError:
+                pass  # Already unlinked by the client
+            sem.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._server.acquire(0.05)
+            except posix_ipc.BusyError:
+                continue
+            try:
+                if self.on_tick is not None:
+                    self.on_tick(self)
+            except Exception as error:  # pylint: disable=broad-except
+                # Keep ticking so that the client doesn't hang, the test can check errors
+                self.errors.append(error)
+            finally:
+                if self._use_process:
+                    self._ticks.value += 1
+                else:
+                    self._tick_count += 1
+                self._client.release()
+
+    def has_buffer(self, key):
+        """Whether the client has allocated a buffer for ``key`` yet"""
+        arena_path = "/dev/shm/HOLODECK_MEM" + self.uuid + "_ARENA"
+        if os.path.exists(arena_path):
+            return key in read_arena_manifest(arena_path)
+        return os.path.exists("/dev/shm/HOLODECK_MEM" + self.uuid + "_" + key)
+
+    def buffer(self, key, shape, dtype):
+        """Maps the buffer the client allocated for ``key``, the way the engine would.
+
+        Looks the key up in the arena manifest if the client uses an arena, otherwise maps the
+        block of shared memory with that key.
+        """
+        arena_path = "/dev/shm/HOLODECK_MEM" + self.uuid + "_ARENA"
+        if os.path.exists(arena_path):
+            offset = read_arena_manifest(arena_path)[key][0]
+            return np.memmap(
+                arena_path, dtype=dtype, mode="r+", offset=offset, shape=tuple(shape)
+            )
+
+        return np.memmap(
+            "/dev/shm/HOLODECK_MEM" + self.uuid + "_" + key,
+            dtype=dtype,
+            mode="r+",
+            shape=tuple(shape),
+        )
+
+
+def read_arena_manifest(path):
+    """Parses an arena manifest independently of the client code.
+
+    Returns:
+        :obj:`dict`: key -> (offset, size in bytes, dtype string)
+    """
+    with open(path, "rb") as f:
+        header = f.read(64)
+        magic, version, count, size, max_entries = struct.unpack_from("<8sIIQI", header)
+        assert magic == b"HOLOAREN"
+        assert version == 1
+
+        entries = dict()
+        for _ in range(count):
+            key, offset, size_bytes, dtype = struct.unpack("<96sQQ8s8x", f.read(128))
+            entries[key.rstrip(b"\0").decode("utf-8")] = (
+                offset,
+                size_bytes,
+                dtype.rstrip(b"\0").decode("ascii"),
+            )
+        return entries